@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Lightning Explorer
+Times the scanner, search, sort, hint and rendering hot paths on synthetic trees
+
+    python bench.py                            # 1k/10k/100k, wide and deep
+    python bench.py --sizes 1m --shapes wide   # opt-in large tree
+    python bench.py --out baseline.json        # record a baseline
+    python bench.py --baseline baseline.json   # exit 1 on regressions
+
+Trees are generated once under --root and reused by later runs.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from cli import walk_entries
+from core.file_scanner import LISTING_CACHE_RACY_SECONDS, SORT_MODES, FileScanner, Listing
+from core.indexer import TreeIndexer
+from ui.hints import hint_labels, hint_trie
+
+
+BENCH_ROOT = Path(tempfile.gettempdir()) / 'lightning-bench'
+BENCH_SIZES = '1k,10k,100k'    # 1m is supported but slow to generate
+BENCH_SHAPES = ('wide', 'deep')
+BENCH_REPEAT = 5
+BENCH_TOLERANCE = 0.25         # Slowdown (fraction of baseline) flagged as a regression
+BENCH_MIN_DELTA_MS = 1.0       # Ignore differences below this (timer noise)
+
+DEEP_FANOUT = 3                # Subdirectories per directory in a deep tree
+DEEP_FILES = 10                # Files per directory in a deep tree
+RENDER_ROWS = 40               # Visible rows assumed by the render stub
+
+# Name parts for synthetic entries (mixed case, separators and extensions,
+# so fuzzy bonuses and extension sort have something to work with)
+STEMS = ('report', 'main_window', 'IMG', 'notes', 'config', 'data-export',
+         'Backup', 'README', 'test_utils', 'invoice')
+EXTENSIONS = ('py', 'txt', 'jpg', 'md', 'json', 'csv', 'log', '')
+QUERIES = ('rep', 'mwin', 'cfgjs', "'_0042")
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000"""
+    text = text.strip().lower()
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(text.rstrip('km')) * scale
+
+
+def entry_name(i: int) -> str:
+    stem = STEMS[i % len(STEMS)]
+    ext = EXTENSIONS[(i // len(STEMS)) % len(EXTENSIONS)]
+    return f"{stem}_{i:06d}.{ext}" if ext else f"{stem}_{i:06d}"
+
+
+def make_file(path: str, i: int):
+    with open(path, 'wb') as f:
+        f.truncate((i * 7919) % 1000000)  # Sparse, so sizes differ without writing data
+
+
+def generate_tree(root: Path, shape: str, count: int) -> Path:
+    """
+    Create (or reuse) a synthetic tree of about ``count`` entries
+    
+    'wide' is a single directory (every tenth entry a subdirectory);
+    'deep' fills directories of DEEP_FILES files and DEEP_FANOUT
+    subdirectories breadth-first until count entries exist.
+    """
+    path = root / f"{shape}-{count}"
+    marker = root / f"{shape}-{count}.done"
+    if marker.exists():
+        return path
+    print(f"Generating {path} ...", file=sys.stderr)
+    path.mkdir(parents=True, exist_ok=True)
+    
+    if shape == 'wide':
+        for i in range(count):
+            name = os.path.join(path, entry_name(i))
+            if i % 10 == 9:
+                os.makedirs(name, exist_ok=True)
+            else:
+                make_file(name, i)
+    else:
+        queue = [str(path)]
+        made = 0
+        while made < count:
+            directory = queue.pop(0)
+            for j in range(DEEP_FILES):
+                make_file(os.path.join(directory, entry_name(made)), made)
+                made += 1
+            for j in range(DEEP_FANOUT):
+                child = os.path.join(directory, f"dir_{made:06d}")
+                os.makedirs(child, exist_ok=True)
+                queue.append(child)
+                made += 1
+    
+    # Fresh directories have racy mtimes the listing cache won't trust;
+    # backdate them so scan_cached measures a hit from the first run
+    past = time.time() - 2 * LISTING_CACHE_RACY_SECONDS
+    for directory, _, _ in os.walk(path):
+        os.utime(directory, (past, past))
+    marker.touch()
+    return path
+
+
+def measure(fn: Callable, repeat: int, setup: Optional[Callable] = None) -> Dict[str, float]:
+    """Time fn() repeat times (setup() runs untimed before each call)"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': round(min(times), 3), 'median_ms': round(statistics.median(times), 3)}
+
+
+class _NullWidget:
+    """Accepts any widget call and does nothing"""
+    
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def render_stub():
+    """
+    A LightningExplorer that runs update_display() without a display
+    
+    The window is made without Tk.__init__ and its state set up by the
+    real init_state(), so row formatting, hint assignment and the status
+    line run for real; the widgets are stand-ins that drop every call.
+    """
+    from ui.main_window import LightningExplorer
+    
+    class RenderStub(LightningExplorer):
+        def visible_row_count(self):
+            return RENDER_ROWS
+        
+        def schedule_prefetch(self):
+            pass
+        
+        def update_idletasks(self):
+            pass
+        
+        def destroy(self):
+            pass
+    
+    window = LightningExplorer.__new__(RenderStub)
+    window.init_state()
+    widget = _NullWidget()
+    window.path_label = window.status_label = window.file_listbox = widget
+    window.scrollbar = window.hint_label = window.typing_display = widget
+    return window
+
+
+def render_target(mode: str):
+    """(backend name, window) for the render benchmarks"""
+    if mode in ('auto', 'tk'):
+        try:
+            from ui.main_window import LightningExplorer
+            app = LightningExplorer()
+            app.withdraw()
+            app.update_idletasks()
+            return 'tk', app
+        except Exception as e:  # No display (TclError), or no tkinter at all
+            if mode == 'tk':
+                raise
+            print(f"⚠️ Tk unavailable ({e}); rendering against a stub", file=sys.stderr)
+    return 'stub', render_stub()
+
+
+def bench_wide(path: Path, repeat: int, window) -> Dict[str, dict]:
+    """Single-directory paths: scan, search, sort, hints and redraw"""
+    results = {}
+    scanner = FileScanner()
+    results['scan'] = measure(lambda: scanner.scan(path, use_cache=False), repeat)
+    results['scan_names_only'] = measure(
+        lambda: scanner.scan(path, with_stat=False, use_cache=False), repeat)
+    scanner.scan(path)
+    if path not in scanner.cache:
+        print(f"⚠️ {path} was not cached; scan_cached times full scans", file=sys.stderr)
+    results['scan_cached'] = measure(lambda: scanner.scan(path), repeat)
+    listing: Listing = scanner.scan(path, use_cache=False)
+    
+    for query in QUERIES:
+        # One keystroke at a time, as typed into the search box
+        def type_query(query=query):
+            for end in range(1, len(query) + 1):
+                scanner.search(query[:end])
+        results[f"search:{query}"] = measure(type_query, repeat)
+    
+    for mode in SORT_MODES:
+        results[f"sort:{mode}"] = measure(lambda: listing.sort(mode), repeat,
+                                          setup=listing.sort_keys.clear)
+    listing.sort_default()
+    
+    def clear_hint_caches():
+        hint_labels.cache_clear()
+        hint_trie.cache_clear()
+    results['hints'] = measure(lambda: hint_trie(len(listing)), repeat, setup=clear_hint_caches)
+    
+    window.scanner.current_path = path
+    window.filtered_files = listing
+    
+    def redraw_at(fraction):
+        window.view_top = int(len(listing) * fraction)
+        window.update_display()
+        window.update_idletasks()
+    results['render:top'] = measure(lambda: redraw_at(0.0), repeat)
+    results['render:middle'] = measure(lambda: redraw_at(0.5), repeat)
+    return results
+
+
+def bench_deep(path: Path, repeat: int) -> Dict[str, dict]:
+    """Whole-tree paths: recursive walk, index build and global search"""
+    results = {}
+    results['walk'] = measure(lambda: sum(1 for _ in walk_entries(path, True)), repeat)
+    results['walk_names_only'] = measure(lambda: sum(1 for _ in walk_entries(path, False)), repeat)
+    indexer = TreeIndexer(path, index_file=Path(os.devnull))
+    results['index'] = measure(indexer.build, repeat)
+    index = indexer.build()
+    for query in QUERIES:
+        results[f"global_search:{query}"] = measure(lambda: index.search(query), repeat)
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Names of benchmarks slower than baseline by more than tolerance"""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        delta = result['min_ms'] - old['min_ms']
+        if delta > BENCH_MIN_DELTA_MS and delta > old['min_ms'] * tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def print_table(results: Dict[str, dict], baseline: Dict[str, dict], regressions: List[str]):
+    width = max(len(name) for name in results) if results else 0
+    print(f"{'benchmark':<{width}}  {'min ms':>10}  {'median ms':>10}  {'baseline':>10}  change")
+    for name, result in results.items():
+        line = f"{name:<{width}}  {result['min_ms']:>10.2f}  {result['median_ms']:>10.2f}"
+        old = baseline.get(name)
+        if old is not None and old['min_ms']:
+            change = (result['min_ms'] - old['min_ms']) / old['min_ms'] * 100
+            line += f"  {old['min_ms']:>10.2f}  {change:+.0f}%"
+            if name in regressions:
+                line += "  ⚠️ REGRESSION"
+        print(line)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lightning Explorer benchmarks")
+    parser.add_argument('--sizes', default=BENCH_SIZES,
+                        help=f"Comma-separated entry counts (default: {BENCH_SIZES})")
+    parser.add_argument('--shapes', default=','.join(BENCH_SHAPES),
+                        help="wide (one directory), deep (nested tree) or both")
+    parser.add_argument('--root', type=Path, default=BENCH_ROOT,
+                        help=f"Where generated trees are kept (default: {BENCH_ROOT})")
+    parser.add_argument('--repeat', type=int, default=BENCH_REPEAT)
+    parser.add_argument('--render', choices=('auto', 'tk', 'stub'), default='auto',
+                        help="Redraw against a real (withdrawn) window or a stub")
+    parser.add_argument('--out', type=Path, help="Write results as JSON")
+    parser.add_argument('--baseline', type=Path, help="Results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE)
+    args = parser.parse_args(argv)
+    
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    shapes = [shape for shape in args.shapes.split(',') if shape in BENCH_SHAPES]
+    backend, window = render_target(args.render) if 'wide' in shapes else (None, None)
+    
+    results = {}
+    for shape in shapes:
+        for count in sizes:
+            path = generate_tree(args.root, shape, count)
+            print(f"Running {shape}-{count} ...", file=sys.stderr)
+            if shape == 'wide':
+                tree = bench_wide(path, args.repeat, window)
+            else:
+                tree = bench_deep(path, args.repeat)
+            for name, result in tree.items():
+                results[f"{shape}-{count}/{name}"] = result
+    if window is not None:
+        window.destroy()
+    
+    baseline = {}
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline.read_text())['results']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Cannot read baseline {args.baseline}: {e}", file=sys.stderr)
+            return 2
+    regressions = compare(results, baseline, args.tolerance)
+    print_table(results, baseline, regressions)
+    
+    if args.out:
+        report = {
+            'meta': {
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'render': backend,
+                'repeat': args.repeat,
+            },
+            'results': results,
+        }
+        args.out.write_text(json.dumps(report, indent=2) + '\n')
+    
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regression(s) beyond {args.tolerance:.0%} of baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
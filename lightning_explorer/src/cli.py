@@ -0,0 +1,232 @@
+"""
+Headless command line for Lightning Explorer
+Scan and search without Tk, streaming NDJSON (or JSON) records to stdout,
+and run the resident daemon that windows get warm listings from
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, Optional, TextIO, Tuple
+
+from core.file_scanner import SORT_MODES, FileEntry, FileScanner
+from core.fuzzy import folded_bonuses, fuzzy_score
+
+
+FLUSH_EVERY = 512  # Records between flushes, so consumers see results promptly
+
+
+class RecordWriter:
+    """Writes one record at a time, as NDJSON lines or a streamed JSON array"""
+    
+    def __init__(self, out: TextIO, as_array: bool = False):
+        self.out = out
+        self.as_array = as_array
+        self.count = 0
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    
+    def write(self, record: dict):
+        line = self._encode(record)
+        if self.as_array:
+            line = ('[' if self.count == 0 else ',') + line
+        self.out.write(line + '\n')
+        self.count += 1
+        if self.count % FLUSH_EVERY == 0:
+            self.out.flush()
+    
+    def close(self):
+        if self.as_array:
+            self.out.write('[]\n' if self.count == 0 else ']\n')
+        self.out.flush()
+
+
+def entry_record(entry: FileEntry, path: str, with_stat: bool) -> dict:
+    """JSON-ready fields for one FileEntry"""
+    record = {
+        'path': path,
+        'name': entry.name,
+        'type': 'dir' if entry.is_dir else 'file' if entry.is_file else 'other',
+    }
+    if with_stat:
+        record['size'] = entry.size
+        record['mtime'] = entry.modified
+    return record
+
+
+def walk_entries(root: Path, with_stat: bool) -> Iterator[Tuple[str, FileEntry]]:
+    """
+    Yield (path relative to root, FileEntry) for everything under root
+    
+    Depth-first over a stack of open scandir() iterators, so memory grows
+    with the depth of the tree, not its size. Symlinked directories are
+    listed but not entered.
+    """
+    stack = []
+    try:
+        stack.append(('', os.scandir(root)))
+    except OSError as e:
+        print(f"⚠️ Cannot list {root}: {e}", file=sys.stderr)
+        return
+    try:
+        while stack:
+            prefix, it = stack[-1]
+            entry = next(it, None)
+            if entry is None:
+                it.close()
+                stack.pop()
+                continue
+            path = prefix + entry.name
+            yield path, FileEntry.from_dir_entry(entry, with_stat)
+            try:
+                descend = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                descend = False
+            if descend:
+                try:
+                    stack.append((path + os.sep, os.scandir(entry.path)))
+                except OSError as e:
+                    print(f"⚠️ Cannot list {entry.path}: {e}", file=sys.stderr)
+    finally:
+        for _, it in stack:
+            it.close()
+
+
+def name_matcher(query: str):
+    """
+    Score function for names against a search query (None = no match)
+    
+    Same rules as the search box: a leading ``'`` asks for an exact
+    substring, otherwise the query characters must appear in order.
+    """
+    query = query.lower()
+    if query.startswith("'"):
+        needle = query[1:]
+        return lambda name: 0 if needle in name.lower() else None
+    
+    def score(name: str) -> Optional[int]:
+        folded = name.lower()
+        return fuzzy_score(folded, query, folded_bonuses(name, folded))
+    return score
+
+
+def scan_command(args, writer: RecordWriter) -> int:
+    """List a directory (sorted), or a whole tree (streamed, unsorted)"""
+    root = Path(args.path).resolve()
+    with_stat = not args.no_stat
+    score = name_matcher(args.search) if args.search else None
+    
+    if args.recursive:
+        # Matches are written as they are found; ranking would mean
+        # holding the whole tree in memory
+        for path, entry in walk_entries(root, with_stat):
+            if score is None:
+                writer.write(entry_record(entry, path, with_stat))
+                continue
+            match = score(entry.name)
+            if match is not None:
+                record = entry_record(entry, path, with_stat)
+                record['score'] = match
+                writer.write(record)
+        return 0
+    
+    scanner = FileScanner()
+    scanner.sort_mode = args.sort
+    if not root.is_dir():
+        print(f"⚠️ Not a directory: {root}", file=sys.stderr)
+        return 2
+    listing = scanner.scan(root, with_stat=with_stat, use_cache=False)
+    if args.search:
+        listing = scanner.search(args.search, budget_ms=float('inf'))  # Fully ranked
+    for entry in listing:
+        record = entry_record(entry, entry.name, with_stat)
+        if score is not None:
+            record['score'] = score(entry.name)
+        writer.write(record)
+    return 0
+
+
+def daemon_command(args) -> int:
+    """Run the daemon in the foreground, or query / stop a running one"""
+    from core.daemon import DaemonClient, ExplorerDaemon
+    client = DaemonClient.connect()
+    if args.status or args.stop:
+        if client is None:
+            print("No daemon running", file=sys.stderr)
+            return 1
+        if args.stop:
+            client.request('stop', timeout=5)
+            return 0
+        status = client.request('status', timeout=5)
+        if status is None:
+            print("⚠️ Daemon did not answer", file=sys.stderr)
+            return 1
+        print(json.dumps(status, indent=2))
+        return 0
+    if client is not None:
+        print("⚠️ A daemon is already running", file=sys.stderr)
+        return 1
+    ExplorerDaemon().serve()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='main.py',
+        description="Lightning Explorer headless mode: scan or search a path and "
+                    "write one JSON record per entry to stdout, or run the "
+                    "daemon that keeps listings warm for windows. Run without "
+                    "arguments to open the window.",
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    scan = commands.add_parser('scan', help="List a directory or tree")
+    scan.add_argument('path', nargs='?', default='.', help="Directory (default: current)")
+    search = commands.add_parser('search', help="Find entries whose name matches a query")
+    search.add_argument('search', metavar='query',
+                        help="Fuzzy query, or 'text for an exact substring")
+    search.add_argument('path', nargs='?', default='.', help="Directory (default: current)")
+    
+    for command in (scan, search):
+        command.add_argument('-r', '--recursive', action='store_true',
+                             help="Walk the whole tree (streamed in walk order)")
+        command.add_argument('--no-stat', action='store_true',
+                             help="Names and types only (skips one stat() per entry)")
+        command.add_argument('--sort', choices=SORT_MODES, default='name',
+                             help="Order of a single directory's listing")
+        command.add_argument('--json', action='store_true',
+                             help="One JSON array instead of NDJSON lines")
+        command.add_argument('--stats', action='store_true',
+                             help="Print record count and time to stderr")
+    scan.set_defaults(search=None)
+    
+    daemon = commands.add_parser('daemon', help="Keep listings, indexes and watches warm "
+                                                "for windows (runs until stopped)")
+    action = daemon.add_mutually_exclusive_group()
+    action.add_argument('--status', action='store_true', help="Show a running daemon's state")
+    action.add_argument('--stop', action='store_true', help="Stop a running daemon")
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point for the headless mode"""
+    args = build_parser().parse_args(argv)
+    if args.command == 'daemon':
+        return daemon_command(args)
+    start = time.perf_counter()
+    writer = RecordWriter(sys.stdout, as_array=args.json)
+    try:
+        status = scan_command(args, writer)
+        writer.close()
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head): stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    if args.stats:
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{writer.count} records in {elapsed:.0f}ms", file=sys.stderr)
+    return status
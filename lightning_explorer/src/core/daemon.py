@@ -0,0 +1,454 @@
+"""
+Resident daemon for Lightning Explorer
+Keeps listings, recursive indexes and directory watches warm for new windows
+"""
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from core.file_scanner import Listing, ListingCache, ScanJob
+from core.indexer import INDEX_MAX_AGE, TreeIndex, TreeIndexer, index_path_for
+from core.paths import index_dir
+from core.snapshot import pack_listing, unpack_listing
+from core.watcher import DirectoryWatcher, watch_directory
+
+
+DAEMON_CACHE_BYTES = 256 * 1024 * 1024  # Listing cache (a window keeps 64MB)
+DAEMON_CACHE_ENTRIES = 1024
+DAEMON_MAX_ROWS = 1000000      # Bigger listings are left to the window to scan
+DAEMON_WATCHES = 64            # Most recently served directories kept watched
+DAEMON_INDEX_ROOTS = 4         # Global search roots whose indexes are kept fresh
+DAEMON_TICK = 0.5              # Seconds between watch/index maintenance passes
+DAEMON_REPLY_TIMEOUT = 0.25    # Seconds before an unanswered request is given up
+
+
+def daemon_address() -> Tuple[str, str]:
+    """(address, family) the daemon listens on: a named pipe or a Unix socket"""
+    if sys.platform == 'win32':
+        user = os.environ.get('USERNAME', 'user')
+        return rf'\\.\pipe\lightning-explorer-{user}', 'AF_PIPE'
+    return str(index_dir() / 'daemon.sock'), 'AF_UNIX'
+
+
+def _key_path() -> Path:
+    return index_dir() / 'daemon.key'
+
+
+def _read_key() -> Optional[bytes]:
+    try:
+        return _key_path().read_bytes()
+    except OSError:
+        return None
+
+
+def _create_key() -> bytes:
+    """New shared secret, readable only by this user"""
+    path = _key_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    key = secrets.token_bytes(32)
+    tmp = path.with_suffix('.tmp')
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    os.replace(tmp, path)
+    return key
+
+
+class ExplorerDaemon:
+    """
+    Long-running backend shared by every explorer window
+    
+    Windows connect over a local socket (named pipe on Windows) and ask
+    for directory listings and global-search indexes. The daemon answers
+    listings from a large ListingCache, and keeps it warm: each directory
+    it serves stays watched (up to DAEMON_WATCHES), and a directory that
+    changes is rescanned straight away rather than on the next request.
+    Indexes are built by TreeIndexer into the usual index files, so a
+    window only has to map them; roots asked for recently are rebuilt
+    once they are older than INDEX_MAX_AGE.
+    
+    Connections are authenticated with a per-user key file (HMAC
+    challenge), so only processes that can read it get answers.
+    Directories are scanned outside the lock, so a slow one (a network
+    mount, say) holds up only the window that asked for it.
+    """
+    
+    def __init__(self):
+        self.cache = ListingCache(DAEMON_CACHE_BYTES, DAEMON_CACHE_ENTRIES)
+        self.started_at = time.time()
+        self.requests = 0
+        self._lock = threading.Lock()  # Cache, watches and indexes
+        self._watches: 'OrderedDict[Path, DirectoryWatcher]' = OrderedDict()
+        self._dirty = set()  # Watched directories changed and not yet re-cached
+        self._indexers: Dict[Path, TreeIndexer] = {}  # Builds in progress
+        self._built_at: Dict[Path, float] = {}  # Age of each root's index file
+        self._index_roots: 'OrderedDict[Path, None]' = OrderedDict()
+        self._stop = threading.Event()
+        self._listener = None
+    
+    def serve(self):
+        """Accept windows until stop() (or Ctrl-C)"""
+        from multiprocessing.connection import Listener
+        address, family = daemon_address()
+        if family == 'AF_UNIX' and os.path.exists(address):
+            if DaemonClient.connect() is not None:
+                raise RuntimeError(f"A daemon is already listening on {address}")
+            os.unlink(address)  # Left behind by a daemon that died
+        self._listener = Listener(address, family, authkey=_create_key())
+        threading.Thread(target=self._maintain, name="daemon-maintain", daemon=True).start()
+        print(f"⚡ Lightning Explorer daemon listening on {address} (pid {os.getpid()})", file=sys.stderr)
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn = self._listener.accept()
+                except (OSError, EOFError) as e:
+                    if not self._stop.is_set():
+                        print(f"⚠️ Rejected connection: {e}", file=sys.stderr)
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), name="daemon-client",
+                                 daemon=True).start()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            self._listener.close()  # Also removes the socket file
+            with self._lock:
+                for watcher in self._watches.values():
+                    watcher.stop()
+                for indexer in self._indexers.values():
+                    indexer.cancel()
+    
+    def stop(self):
+        """Stop accepting; wakes the accept() call with a throwaway connection"""
+        self._stop.set()
+        client = DaemonClient.connect()
+        if client is not None:
+            client.close()
+    
+    def _handle(self, conn):
+        """Answer one window's requests until it disconnects"""
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                self.requests += 1
+                try:
+                    reply = self._dispatch(*request)
+                except Exception as e:  # Never let one bad request kill the connection
+                    reply = ('error', repr(e))
+                try:
+                    conn.send(reply)
+                except OSError:
+                    return  # The window gave up waiting
+                if request[0] == 'stop':
+                    self.stop()
+                    return
+    
+    def _dispatch(self, command: str, *args):
+        if command == 'list':
+            return ('ok', self.listing(Path(args[0]), args[1]))
+        if command == 'index':
+            return ('ok', self.index(Path(args[0])))
+        if command == 'status':
+            return ('ok', {'pid': os.getpid(), 'uptime': time.time() - self.started_at,
+                           'requests': self.requests, 'cached': len(self.cache),
+                           'cache_bytes': self.cache.bytes,
+                           'watched': len(self._watches),
+                           'indexes': [str(root) for root in self._index_roots]})
+        if command == 'stop':
+            return ('ok', None)
+        return ('error', f"unknown request {command!r}")
+    
+    def listing(self, path: Path, with_stat: bool) -> Optional[bytes]:
+        """Packed listing of path (see pack_listing), scanned unless cached"""
+        with self._lock:
+            listing = self.cache.get(path, with_stat)
+            self._watch(path)
+        if listing is None:
+            listing = self._scan(path, with_stat)
+        return pack_listing(listing, with_stat, max_rows=DAEMON_MAX_ROWS)
+    
+    def _scan(self, path: Path, with_stat: bool = True) -> Listing:
+        """List path (without the lock) and cache the listing if it is complete"""
+        job = ScanJob(path, with_stat).start()
+        job.wait()
+        job.poll()
+        if job.error is None:
+            with self._lock:
+                self.cache.put(path, job.listing, with_stat, job.dir_mtime, job.started_at)
+        return job.listing
+    
+    def index(self, root: Path) -> bool:
+        """Make sure root's index file is fresh; True while it is being (re)built"""
+        with self._lock:
+            self._index_roots.pop(root, None)
+            self._index_roots[root] = None
+            while len(self._index_roots) > DAEMON_INDEX_ROOTS:
+                old, _ = self._index_roots.popitem(last=False)
+                self._built_at.pop(old, None)
+                indexer = self._indexers.pop(old, None)
+                if indexer is not None:
+                    indexer.cancel()
+            return self._refresh_index(root)
+    
+    def _refresh_index(self, root: Path) -> bool:
+        """Start a rebuild of root's index if it is missing or old (lock held)"""
+        indexer = self._indexers.get(root)
+        if indexer is not None:
+            if not indexer.done:
+                return True
+            # Windows map the saved file; the daemon keeps only its age
+            del self._indexers[root]
+            if indexer.index is not None:
+                self._built_at[root] = indexer.index.built_at
+        if root not in self._built_at:
+            index = TreeIndex.load(index_path_for(root))
+            self._built_at[root] = index.built_at if index is not None else 0.0
+            if index is not None:
+                index.close()
+        if time.time() - self._built_at[root] <= INDEX_MAX_AGE:
+            return False
+        self._indexers[root] = TreeIndexer(root).start()
+        return True
+    
+    def _watch(self, path: Path):
+        """Keep path watched, dropping the least recently served (lock held)"""
+        watcher = self._watches.pop(path, None)
+        if watcher is None or watcher.stopped:
+            watcher = watch_directory(path)
+        self._watches[path] = watcher
+        while len(self._watches) > DAEMON_WATCHES:
+            old, watcher = self._watches.popitem(last=False)
+            watcher.stop()
+            self._dirty.discard(old)
+    
+    def _maintain(self):
+        """Re-cache changed directories and keep indexes fresh"""
+        while not self._stop.wait(DAEMON_TICK):
+            with self._lock:
+                for path, watcher in self._watches.items():
+                    changed = watcher.drain()
+                    if changed is None or changed:
+                        self._dirty.add(path)
+                        self.cache.discard(path)
+                dirty = list(self._dirty)
+            # A directory changed a moment ago is not cacheable yet (its
+            # mtime is racy), so it stays dirty and is retried next pass
+            for path in dirty:
+                self._scan(path)
+                with self._lock:
+                    if path in self.cache or not path.is_dir():
+                        self._dirty.discard(path)
+            with self._lock:
+                for root in self._index_roots:
+                    self._refresh_index(root)
+
+
+class DaemonClient:
+    """
+    A window's connection to the daemon
+    
+    request() waits at most DAEMON_REPLY_TIMEOUT; a slow or missing daemon
+    yields None and the caller falls back to doing the work itself. The Tk
+    thread uses send() and reply() instead, which never wait (nor reopen a
+    dropped connection). One request is outstanding at a time: send()
+    refuses another until the reply is read, and a connection whose reply
+    never arrived is dropped, since a late reply would be read as the
+    answer to the next request.
+    """
+    
+    def __init__(self, key: bytes):
+        self.key = key
+        self._conn = None
+        self.pending = False  # A sent request's reply is still to be read
+    
+    @classmethod
+    def connect(cls) -> Optional['DaemonClient']:
+        """Client for a running daemon, or None if there is none"""
+        address, family = daemon_address()
+        key = _read_key()
+        if key is None or (family == 'AF_UNIX' and not os.path.exists(address)):
+            return None  # Checked first: no daemon costs no imports
+        client = cls(key)
+        return client if client._open() else None
+    
+    @property
+    def connected(self) -> bool:
+        """False once the connection was dropped (the next request reopens it)"""
+        return self._conn is not None
+    
+    def _open(self) -> bool:
+        from multiprocessing import AuthenticationError
+        from multiprocessing.connection import Client
+        address, family = daemon_address()
+        try:
+            self._conn = Client(address, family, authkey=self.key)
+        except (OSError, EOFError, AuthenticationError):
+            self._conn = None
+        return self._conn is not None
+    
+    def send(self, *message) -> bool:
+        """
+        Send a request without waiting for its reply
+        
+        Returns:
+            False if it was not sent: another request is awaiting its reply,
+            or the connection was dropped (reconnect with connect())
+        """
+        if self.pending or self._conn is None:
+            return False
+        try:
+            self._conn.send(message)
+        except OSError:
+            self.close()
+            return False
+        self.pending = True
+        return True
+    
+    def reply(self, timeout: float = 0) -> Tuple[bool, Any]:
+        """
+        The sent request's reply, if it has arrived within timeout
+        
+        Returns:
+            (False, None) while still waiting, else (True, value) where
+            value is None if the request failed
+        """
+        if not self.pending:
+            return True, None
+        try:
+            if not self._conn.poll(timeout):
+                return False, None
+            status, value = self._conn.recv()
+        except (OSError, EOFError):
+            self.close()
+            return True, None
+        self.pending = False
+        return True, value if status == 'ok' else None
+    
+    def request(self, *message, timeout: float = DAEMON_REPLY_TIMEOUT):
+        """
+        Send a request and return the reply's value (None on any failure)
+        
+        Blocks for up to timeout, and reopens a dropped connection: not for
+        the Tk thread.
+        """
+        if self.pending:
+            self.close()  # Abandoned request: its reply must not be read as this one's
+        if self._conn is None and not self._open():
+            return None
+        if not self.send(*message):
+            return None
+        ready, value = self.reply(timeout)
+        if not ready:
+            self.close()
+        return value
+    
+    def send_listing(self, path: Path, with_stat: bool = True) -> bool:
+        """Ask for path's listing; collect it with listing_reply()"""
+        return self.send('list', str(path), with_stat)
+    
+    def listing_reply(self, path: Path,
+                      sort_mode: str = 'name') -> Tuple[bool, Optional[Tuple[Listing, bool, int]]]:
+        """
+        The daemon's listing of path (see unpack_listing), once it arrived
+        
+        Returns:
+            (False, None) while still waiting, else (True, listing or None)
+        """
+        ready, data = self.reply()
+        if data is None:
+            return ready, None
+        return True, unpack_listing(data, path, sort_mode)
+    
+    def build_index(self, root: Path, stale: bool = True) -> 'RemoteIndexer':
+        """Have the daemon keep root's index fresh (see RemoteIndexer)"""
+        return RemoteIndexer(self, root, stale)
+    
+    def close(self):
+        self.pending = False
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class RemoteIndexer:
+    """
+    Stands in for a TreeIndexer whose walk runs in the daemon
+    
+    ``done`` asks the daemon whether the build finished, without waiting:
+    each call sends the question or checks for its answer, so it is meant
+    to be polled (e.g. from an after() loop). ``index`` then maps the index
+    file the daemon wrote. If the daemon stops answering, a stale index is
+    rebuilt here instead.
+    """
+    
+    def __init__(self, client: DaemonClient, root: Path, stale: bool = True):
+        self.client = client
+        self.root = root
+        self.stale = stale  # Whether the window's own copy needs a rebuild
+        self.built = False  # The daemon was rebuilding it while asked
+        self._index: Optional[TreeIndex] = None
+        self._local: Optional[TreeIndexer] = None  # Fallback once the daemon is gone
+        self._deadline: Optional[float] = None  # Set while a question is unanswered
+        self._done = False
+    
+    @property
+    def asking(self) -> bool:
+        """A question is awaiting the daemon's answer (worth polling soon)"""
+        return self._deadline is not None
+    
+    @property
+    def done(self) -> bool:
+        if not self._done:
+            self._poll()
+        if self._local is not None:
+            return self._local.done
+        return self._done
+    
+    def _poll(self):
+        if self._deadline is None:
+            if not self.client.send('index', str(self.root)):
+                if not self.client.connected:
+                    self._give_up()
+                return  # Otherwise busy with another request: ask next time
+            self._deadline = time.perf_counter() + DAEMON_REPLY_TIMEOUT
+        ready, building = self.client.reply()
+        if not ready:
+            if time.perf_counter() < self._deadline:
+                return
+            self.client.close()  # Too slow: a late reply would answer the next request
+        self._deadline = None
+        if building is None:
+            self._give_up()
+        elif building:
+            self.built = True  # Ask again on the next poll
+        else:
+            self._done = True
+    
+    def _give_up(self):
+        self._done = True
+        if self.stale:
+            self._local = TreeIndexer(self.root).start()
+    
+    @property
+    def index(self) -> Optional[TreeIndex]:
+        if self._local is not None:
+            return self._local.index
+        if self._index is None and self._done and (self.built or self.stale):
+            self._index = TreeIndex.load(index_path_for(self.root))
+        return self._index
+    
+    def cancel(self):
+        if self._deadline is not None:
+            self.client.close()  # Nobody will read the answer now
+            self._deadline = None
+        if self._local is not None:
+            self._local.cancel()
+        self._done = True  # The daemon finishes anyway, for the next window
@@ -0,0 +1,244 @@
+"""
+Directory sizes for Lightning Explorer
+du-style recursive size aggregation with per-directory caching
+"""
+import os
+import queue
+import stat
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.file_scanner import LISTING_CACHE_RACY_SECONDS
+
+
+DIR_SIZE_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+DIR_SIZE_CACHE_ENTRIES = 200000  # Directories remembered (own totals and aggregates each)
+
+
+class DirSizeCache:
+    """
+    Remembered directory totals, shared by every DirSizeJob
+    
+    Each directory's *own* totals (bytes and file count of its direct
+    entries, plus its subdirectory names) are keyed by (device, inode) and
+    reused while the directory's mtime is unchanged, so re-walking a tree
+    that was measured before costs one lstat() per directory instead of a
+    scandir() plus one lstat() per file. As with the ListingCache, a file
+    rewritten in place does not bump its directory's mtime, so its growth
+    is only noticed once the directory changes or the cache is cleared.
+    
+    Aggregates from the last completed walk are also kept by path, so
+    rows can show totals immediately when a directory is re-entered while
+    a new walk revalidates them.
+    """
+    
+    def __init__(self, max_entries: int = DIR_SIZE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()  # Workers store concurrently
+        self._own: Dict[tuple, tuple] = {}  # (dev, ino) -> (mtime_ns, bytes, files, children)
+        self._totals: Dict[str, Tuple[int, int]] = {}  # path -> (bytes, files)
+    
+    def own(self, key: tuple, mtime_ns: int) -> Optional[tuple]:
+        """(bytes, files, children) for a directory if unchanged since cached"""
+        entry = self._own.get(key)
+        if entry is not None and entry[0] == mtime_ns:
+            return entry[1:]
+        return None
+    
+    def store_own(self, key: tuple, mtime_ns: int, result: tuple):
+        if mtime_ns / 1e9 > time.time() - LISTING_CACHE_RACY_SECONDS:
+            return  # Changed too recently to trust the mtime
+        with self._lock:
+            _bounded_put(self._own, key, (mtime_ns,) + result, self.max_entries)
+    
+    def total(self, path: Path) -> Optional[Tuple[int, int]]:
+        """(bytes, files) from the last walk that covered path, or None"""
+        return self._totals.get(str(path))
+    
+    def store_total(self, path: str, total: int, files: int):
+        with self._lock:
+            _bounded_put(self._totals, path, (total, files), self.max_entries)
+    
+    def clear(self):
+        with self._lock:
+            self._own.clear()
+            self._totals.clear()
+    
+    def __len__(self):
+        return len(self._own)
+
+
+def _bounded_put(table: dict, key, value, limit: int):
+    """Insert, dropping the oldest quarter of the table when over limit"""
+    table.pop(key, None)  # Re-inserting moves the key to the young end
+    table[key] = value
+    if len(table) > limit:
+        for old in list(table)[:max(1, limit // 4)]:
+            del table[old]
+
+
+class _Node:
+    """A directory being measured; totals flow up to parent when complete"""
+    
+    __slots__ = ('path', 'parent', 'bytes', 'files', 'waiting')
+    
+    def __init__(self, path: str, parent: Optional['_Node']):
+        self.path = path
+        self.parent = parent
+        self.bytes = 0
+        self.files = 0
+        self.waiting = 0  # Subdirectories not yet complete
+
+
+class DirSizeJob:
+    """
+    Background recursive size calculation for a set of directories
+    
+    A coordinator thread hands one directory at a time to a thread pool
+    (as TreeIndexer does), so independent subtrees are listed in parallel.
+    When a directory and all of its subdirectories are done, its total is
+    added to its parent; a requested directory's total is posted as soon
+    as its own subtree completes, so small directories report first and
+    the caller can update rows progressively from an after() loop.
+    
+    Symlinked directories are not followed and walks stay on the device of
+    the requested directory (like ``du -x``). Sizes are apparent sizes
+    (st_size); hard-linked files are counted once per link.
+    """
+    
+    def __init__(self, paths: Iterable[Path], cache: DirSizeCache,
+                 workers: int = DIR_SIZE_WORKERS):
+        self.paths = list(paths)
+        self.cache = cache
+        self.workers = workers
+        self.dirs_scanned = 0
+        self.errors = 0
+        self.elapsed_ms = 0.0
+        self.done = False
+        self._results = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="dir-sizes", daemon=True)
+    
+    def start(self) -> 'DirSizeJob':
+        self._thread.start()
+        return self
+    
+    def cancel(self):
+        """Stop walking (directories in flight finish, nothing new starts)"""
+        self._cancel.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def poll(self) -> List[Tuple[Path, int, int]]:
+        """
+        Take the totals completed since the last call
+        
+        Returns:
+            List of (directory, total bytes, file count)
+        """
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self._thread.join(timeout)
+        return self.done
+    
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self._walk()
+        finally:
+            self.elapsed_ms = (time.perf_counter() - start) * 1000
+            self.done = True
+    
+    def _walk(self):
+        cache = self.cache
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {}
+            for path in self.paths:
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    node = _Node(str(path), None)
+                    pending[pool.submit(_measure_dir, node.path, st.st_dev, cache)] = (node, st.st_dev)
+            
+            while pending and not self._cancel.is_set():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node, device = pending.pop(future)
+                    try:
+                        own_bytes, own_files, children = future.result()
+                    except OSError:
+                        self.errors += 1
+                        own_bytes, own_files, children = 0, 0, ()
+                    self.dirs_scanned += 1
+                    node.bytes += own_bytes
+                    node.files += own_files
+                    node.waiting = len(children)
+                    for name in children:
+                        child = _Node(os.path.join(node.path, name), node)
+                        pending[pool.submit(_measure_dir, child.path, device, cache)] = (child, device)
+                    if not children:
+                        self._complete(node)
+            
+            for future in pending:
+                future.cancel()
+    
+    def _complete(self, node: _Node):
+        """Record a finished subtree and fold it into its ancestors"""
+        while True:
+            self.cache.store_total(node.path, node.bytes, node.files)
+            parent = node.parent
+            if parent is None:
+                self._results.put((Path(node.path), node.bytes, node.files))
+                return
+            parent.bytes += node.bytes
+            parent.files += node.files
+            parent.waiting -= 1
+            if parent.waiting:
+                return
+            node = parent
+
+
+def _measure_dir(path: str, device: int, cache: DirSizeCache) -> tuple:
+    """
+    Own totals of one directory (runs on a pool thread)
+    
+    Returns:
+        (bytes, files, subdirectory names); a mount point or an entry that
+        is no longer a directory counts as empty
+    """
+    st = os.lstat(path)
+    if st.st_dev != device or not stat.S_ISDIR(st.st_mode):
+        return 0, 0, ()
+    key = (st.st_dev, st.st_ino)
+    cached = cache.own(key, st.st_mtime_ns)
+    if cached is not None:
+        return cached
+    
+    total = files = 0
+    children = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    children.append(entry.name)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+                    files += 1
+            except OSError:
+                pass  # Vanished while listing
+    result = (total, files, tuple(children))
+    cache.store_own(key, st.st_mtime_ns, result)
+    return result
@@ -0,0 +1,350 @@
+"""
+Duplicate finder for Lightning Explorer
+Staged size -> partial hash -> full hash detection of identical files
+"""
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from hashlib import blake2b
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.file_scanner import FLAG_FILE, Listing
+from core.paths import index_dir
+
+
+DUPLICATE_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+PARTIAL_BYTES = 4096          # Hashed from each end of a file in the partial stage
+HASH_CHUNK = 8 * 1024 * 1024  # mmap slice fed to the hash at a time
+DIGEST_SIZE = 16
+
+HASH_CACHE_MAGIC = b'LEHASH01'
+HASH_CACHE_ENTRIES = 1000000  # ~64MB on disk; older entries are dropped beyond this
+# device, inode, size, mtime_ns, partial hash, full hash (zeros when not computed)
+HASH_RECORD = struct.Struct('<QQQq16s16s')
+NO_HASH = bytes(DIGEST_SIZE)
+
+
+def hash_cache_path() -> Path:
+    """Where content hashes are kept between runs"""
+    return index_dir() / 'hashes.bin'
+
+
+class HashCache:
+    """
+    Content hashes by (device, inode), valid while size and mtime match
+    
+    A DuplicateJob holds ``lock`` while it runs and only touches the
+    cache from its coordinator thread. Saved as fixed-size records so
+    loading is a single read and unpack.
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[tuple, list] = {}  # (dev, ino) -> [size, mtime_ns, partial, full]
+        self.dirty = False
+        self._touched = set()
+    
+    def lookup(self, key: tuple, size: int, mtime_ns: int) -> Optional[list]:
+        """[size, mtime_ns, partial, full] if the file is unchanged, else None"""
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+            self._touched.add(key)
+            return entry
+        return None
+    
+    def store(self, key: tuple, size: int, mtime_ns: int,
+              partial: bytes = NO_HASH, full: bytes = NO_HASH):
+        entry = self.lookup(key, size, mtime_ns)
+        if entry is None:
+            entry = self.entries[key] = [size, mtime_ns, NO_HASH, NO_HASH]
+            self._touched.add(key)
+        if partial != NO_HASH:
+            entry[2] = partial
+        if full != NO_HASH:
+            entry[3] = full
+        self.dirty = True
+    
+    @classmethod
+    def load(cls, path: Path) -> 'HashCache':
+        """Read a saved cache (an empty one if missing or unreadable)"""
+        cache = cls(path)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return cache
+        if data[:len(HASH_CACHE_MAGIC)] != HASH_CACHE_MAGIC:
+            return cache
+        body = memoryview(data)[len(HASH_CACHE_MAGIC):]
+        body = body[:len(body) - len(body) % HASH_RECORD.size]
+        for dev, ino, size, mtime_ns, partial, full in HASH_RECORD.iter_unpack(body):
+            cache.entries[(dev, ino)] = [size, mtime_ns, partial, full]
+        return cache
+    
+    def save(self):
+        """Write the cache atomically if it changed"""
+        if self.path is None or not self.dirty:
+            return
+        entries = self.entries
+        if len(entries) > HASH_CACHE_ENTRIES:
+            # Keep what this session used; the rest is likely from elsewhere
+            self.entries = entries = {key: entries[key] for key in self._touched}
+        pack = HASH_RECORD.pack
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(HASH_CACHE_MAGIC)
+            f.write(b''.join(pack(dev, ino, *entry) for (dev, ino), entry in entries.items()))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class DuplicateJob:
+    """
+    Background search for files with identical contents under a directory
+    
+    Each stage only looks at what survived the one before:
+    
+    1. Walk the tree in parallel and group regular files by size
+       (empty files, symlinks and extra hard links are ignored)
+    2. Hash the first and last PARTIAL_BYTES of same-size files
+    3. Fully hash files whose size and partial hash both collide,
+       reading through mmap on a thread pool (hashlib drops the GIL)
+    
+    Hashes are cached by (device, inode, size, mtime), so running again
+    over the same tree only reads files that changed.
+    """
+    
+    def __init__(self, root: Path, cache: Optional[HashCache] = None,
+                 workers: int = DUPLICATE_WORKERS):
+        self.root = root
+        self.cache = cache
+        self.workers = workers
+        self.stage = 'scanning'  # -> 'comparing' -> 'hashing' -> 'done'
+        self.files_scanned = 0
+        self.files_hashed = 0
+        self.bytes_hashed = 0
+        self.errors = 0
+        self.elapsed_ms = 0.0
+        # (size, [(relative path, mtime), ...]) per group, most space wasted first
+        self.groups: List[Tuple[int, List[Tuple[str, float]]]] = []
+        self.done = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="duplicates", daemon=True)
+    
+    def start(self) -> 'DuplicateJob':
+        self._thread.start()
+        return self
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self._thread.join(timeout)
+        return self.done
+    
+    @property
+    def wasted_bytes(self) -> int:
+        """Space that removing every copy but one would free"""
+        return sum(size * (len(paths) - 1) for size, paths in self.groups)
+    
+    def summary(self) -> str:
+        if not self.done:
+            return f"Finding duplicates: {self.stage} ({self.files_scanned} files, {self.files_hashed} hashed)"
+        return (f"{len(self.groups)} duplicate groups, {self.wasted_bytes / 1e6:.1f} MB reclaimable "
+                f"({self.files_scanned} files, {self.files_hashed} hashed in {self.elapsed_ms:.0f}ms)")
+    
+    def listing(self) -> Tuple[Listing, array]:
+        """
+        Groups as one Listing, copies of a file on adjacent rows
+        
+        Returns:
+            (listing with names relative to root, group number of each row)
+        """
+        listing = Listing(self.root)
+        group_of = array('I')
+        for group, (size, paths) in enumerate(self.groups):
+            for name, modified in paths:
+                listing.append(name, FLAG_FILE, size, modified)
+                group_of.append(group)
+        return listing, group_of
+    
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            if self.cache is None:
+                self.cache = HashCache.load(hash_cache_path())
+            with self.cache.lock, ThreadPoolExecutor(max_workers=self.workers) as pool:
+                by_size = self._walk(pool)
+                if not self._cancel.is_set():
+                    self.stage = 'comparing'
+                    candidates = self._refine(pool, by_size, full=False)
+                if not self._cancel.is_set():
+                    self.stage = 'hashing'
+                    candidates = self._refine(pool, candidates, full=True)
+                if not self._cancel.is_set():
+                    self._collect(candidates)
+                try:
+                    self.cache.save()
+                except OSError as e:
+                    print(f"⚠️ Could not save hash cache: {e}", file=sys.stderr)
+        finally:
+            self.elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stage = 'done'
+            self.done = True
+    
+    def _walk(self, pool: ThreadPoolExecutor) -> List[list]:
+        """Stage 1: same-size groups of regular files under root"""
+        by_size = defaultdict(list)
+        inodes = set()
+        pending = {pool.submit(_list_files, str(self.root))}
+        while pending and not self._cancel.is_set():
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs, errors = future.result()
+                self.errors += errors
+                for path in subdirs:
+                    pending.add(pool.submit(_list_files, path))
+                for record in files:
+                    key = record[1]
+                    if key not in inodes:  # Hard links share their contents
+                        inodes.add(key)
+                        by_size[record[2]].append(record)
+                self.files_scanned += len(files)
+        for future in pending:
+            future.cancel()
+        return [group for group in by_size.values() if len(group) > 1]
+    
+    def _refine(self, pool: ThreadPoolExecutor, groups: List[list], full: bool) -> List[list]:
+        """
+        Split each group by partial (or full) hash, keeping sub-groups of 2+
+        
+        Cached hashes are used as-is; the rest are computed on the pool
+        and stored into the cache here, on the coordinator thread.
+        """
+        cache = self.cache
+        slot = 3 if full else 2
+        hash_file = _full_hash if full else _partial_hash
+        keyed = defaultdict(list)
+        pending = {}
+        for number, group in enumerate(groups):
+            for record in group:
+                path, key, size, mtime_ns, _ = record
+                entry = cache.lookup(key, size, mtime_ns)
+                if full and size <= 2 * PARTIAL_BYTES:
+                    slot_hash = entry[2] if entry is not None else NO_HASH  # Partial read it all
+                else:
+                    slot_hash = entry[slot] if entry is not None else NO_HASH
+                if slot_hash != NO_HASH:
+                    keyed[number, slot_hash].append(record)
+                else:
+                    pending[pool.submit(hash_file, path, size, mtime_ns)] = (number, record)
+        
+        while pending and not self._cancel.is_set():
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                number, record = pending.pop(future)
+                path, key, size, mtime_ns, _ = record
+                try:
+                    digest = future.result()
+                except (OSError, ValueError):
+                    self.errors += 1  # Unreadable, or changed while hashing
+                    continue
+                self.files_hashed += 1
+                self.bytes_hashed += min(size, 2 * PARTIAL_BYTES) if not full else size
+                if full:
+                    cache.store(key, size, mtime_ns, full=digest)
+                else:
+                    cache.store(key, size, mtime_ns, partial=digest)
+                keyed[number, digest].append(record)
+        for future in pending:
+            future.cancel()
+        
+        return [group for group in keyed.values() if len(group) > 1]
+    
+    def _collect(self, groups: List[list]):
+        """Final groups, biggest waste first, paths relative to root"""
+        root = str(self.root)
+        result = []
+        for group in groups:
+            size = group[0][2]
+            paths = sorted((os.path.relpath(path, root), modified) for path, _, _, _, modified in group)
+            result.append((size, paths))
+        result.sort(key=lambda item: (-item[0] * (len(item[1]) - 1), item[1][0][0]))
+        self.groups = result
+
+
+def _list_files(path: str) -> tuple:
+    """
+    Regular files and subdirectories of one directory (runs on a pool thread)
+    
+    Returns:
+        ([(path, (dev, ino), size, mtime_ns, mtime), ...], [subdir paths], error count)
+    """
+    files = []
+    subdirs = []
+    errors = 0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        if st.st_size:
+                            files.append((entry.path, (st.st_dev, st.st_ino), st.st_size,
+                                          st.st_mtime_ns, st.st_mtime))
+                except OSError:
+                    errors += 1
+    except OSError:
+        errors += 1
+    return files, subdirs, errors
+
+
+def _check_unchanged(f, size: int, mtime_ns: int):
+    """Raise ValueError if the open file no longer matches the walk's stat"""
+    st = os.fstat(f.fileno())
+    if st.st_size != size or st.st_mtime_ns != mtime_ns:
+        raise ValueError('file changed since it was listed')
+
+
+def _partial_hash(path: str, size: int, mtime_ns: int) -> bytes:
+    """Hash of the first and last PARTIAL_BYTES (the whole file if it is small)"""
+    digest = blake2b(digest_size=DIGEST_SIZE)
+    with open(path, 'rb') as f:
+        _check_unchanged(f, size, mtime_ns)
+        digest.update(f.read(PARTIAL_BYTES))
+        if size > PARTIAL_BYTES:
+            f.seek(max(PARTIAL_BYTES, size - PARTIAL_BYTES))
+            digest.update(f.read(PARTIAL_BYTES))
+    return digest.digest()
+
+
+def _full_hash(path: str, size: int, mtime_ns: int) -> bytes:
+    """Hash of the whole file, read through a memory map"""
+    digest = blake2b(digest_size=DIGEST_SIZE)
+    with open(path, 'rb') as f:
+        _check_unchanged(f, size, mtime_ns)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mm)
+            try:
+                for offset in range(0, size, HASH_CHUNK):
+                    digest.update(view[offset:offset + HASH_CHUNK])
+            finally:
+                view.release()
+    return digest.digest()
@@ -0,0 +1,476 @@
+"""
+File operations for Lightning Explorer
+Background copy/move/delete jobs with progress, cancellation and worker pools
+"""
+import errno
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from core.file_scanner import format_size
+
+
+COPY_CHUNK = 8 * 1024 * 1024     # Bytes per kernel copy call / progress step
+USER_COPY_BUFFER = 1024 * 1024   # Read/write fallback buffer
+SMALL_FILE = 1024 * 1024         # Files below this are copied in parallel
+COPY_WORKERS = 4                 # Parallel small-file copies / deletes per job
+
+# Errors meaning "this kernel copy method can't handle these files"
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF,
+                    errno.EOPNOTSUPP, errno.ENOTSUP, errno.EPERM, errno.EIO}
+
+# Rename errors that a copy and delete can work around
+_COPY_INSTEAD_ERRNOS = {errno.EXDEV, errno.ENOTEMPTY, errno.EEXIST}
+
+
+class OperationCancelled(Exception):
+    """Raised inside a running operation once cancel() was called"""
+
+
+class FileOperation:
+    """
+    One copy, move or delete of a batch of paths
+    
+    run() executes on a worker thread; the UI reads the progress counters
+    (and summary()) from its own thread and may call cancel() at any time.
+    Moves within a filesystem are a single rename; everything else is a
+    chunked copy (kernel-side copy_file_range/sendfile where available),
+    with small files copied in parallel. Deletes run on a worker pool.
+    """
+    
+    VERBS = {'copy': ('Copying', 'Copied'), 'move': ('Moving', 'Moved'),
+             'delete': ('Deleting', 'Deleted')}
+    
+    def __init__(self, kind: str, sources: Sequence[Path], dest_dir: Optional[Path] = None):
+        if kind not in self.VERBS:
+            raise ValueError(f"Unknown file operation: {kind}")
+        if dest_dir is None and kind != 'delete':
+            raise ValueError(f"A {kind} needs a destination directory")
+        self.kind = kind
+        self.sources = [Path(source) for source in sources]
+        self.dest_dir = Path(dest_dir) if dest_dir is not None else None
+        self.state = 'queued'  # queued, running, done, failed, cancelled
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self.total_files = 0
+        self.done_files = 0
+        self.current = ''  # Name being copied
+        self.errors: List[str] = []
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    @property
+    def finished(self) -> bool:
+        return self.state in ('done', 'failed', 'cancelled')
+    
+    def check(self):
+        """Raise OperationCancelled if cancel() was called"""
+        if self._cancel.is_set():
+            raise OperationCancelled()
+    
+    def advance(self, nbytes: int, files: int = 0):
+        """Count copied bytes/files (thread-safe)"""
+        with self._lock:
+            self.done_bytes += nbytes
+            self.done_files += files
+    
+    @property
+    def rate(self) -> float:
+        """Average throughput in bytes per second"""
+        end = self.finished_at or time.perf_counter()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return self.done_bytes / elapsed if elapsed > 0 else 0.0
+    
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left at the current rate (None if unknown)"""
+        rate = self.rate
+        if not rate or self.total_bytes <= self.done_bytes:
+            return None
+        return (self.total_bytes - self.done_bytes) / rate
+    
+    def summary(self) -> str:
+        """One-line progress for the status bar"""
+        verb, past = self.VERBS[self.kind]
+        if self.state == 'queued':
+            return f"{verb} {self._names()} (queued)"
+        if self.finished:
+            verb = {'done': past,
+                    'failed': f"{verb} failed for",
+                    'cancelled': f"{verb} cancelled for"}[self.state]
+            return f"{verb} {self._names()}"
+        
+        text = f"{verb} {self.done_files}/{self.total_files} files"
+        if self.kind == 'delete':
+            return text
+        text += f", {format_size(self.done_bytes)} of {format_size(self.total_bytes)}"
+        rate = self.rate
+        if rate:
+            text += f" ({format_size(int(rate))}/s"
+            eta = self.eta
+            if eta is not None:
+                text += f", {int(eta) // 60}:{int(eta) % 60:02d} left"
+            text += ")"
+        return text
+    
+    def _names(self) -> str:
+        if len(self.sources) == 1:
+            return self.sources[0].name
+        return f"{len(self.sources)} items"
+    
+    # Execution (worker thread)
+    
+    def run(self):
+        self.state = 'running'
+        self.started_at = time.perf_counter()
+        try:
+            if self.kind == 'delete':
+                self._delete()
+            else:
+                self._transfer()
+            self.state = 'failed' if self.errors else 'done'
+        except OperationCancelled:
+            self.state = 'cancelled'
+        except OSError as e:
+            self.errors.append(str(e))
+            self.state = 'failed'
+        finally:
+            self.finished_at = time.perf_counter()
+    
+    def _transfer(self):
+        """Copy or move every source into dest_dir"""
+        for source in self.sources:
+            self.check()
+            target = self.dest_dir / source.name
+            if _same_path(source, target):
+                self.errors.append(f"{source.name}: source and destination are the same")
+                continue
+            if _dest_in_source(source, self.dest_dir):
+                self.errors.append(f"{source.name}: cannot {self.kind} a folder into itself")
+                continue
+            if self.kind == 'move':
+                try:
+                    if self._rename(source, target):
+                        continue
+                except OSError as e:
+                    self.errors.append(str(e))
+                    continue
+            failures = len(self.errors)
+            self._copy_tree(source, target)
+            if self.kind == 'move' and len(self.errors) == failures:
+                self.check()
+                _remove(source)  # Only once everything arrived intact
+    
+    def _rename(self, source: Path, target: Path) -> bool:
+        """
+        Same-filesystem fast path
+        
+        Returns:
+            False if a copy and delete is needed instead (another filesystem,
+            or merging into a non-empty directory)
+        
+        Raises:
+            OSError: any other failure, which a copy would not fix
+        """
+        try:
+            if target.is_dir() and not target.is_symlink():
+                os.rename(source, target)  # Only succeeds onto an empty directory
+            else:
+                os.replace(source, target)
+        except OSError as e:
+            if e.errno in _COPY_INSTEAD_ERRNOS:
+                return False
+            raise
+        with self._lock:
+            self.total_files += 1
+            self.done_files += 1
+        return True
+    
+    def _copy_tree(self, source: Path, target: Path):
+        """Copy a file, symlink or directory tree (merging into existing dirs)"""
+        files = []  # (source, target, size)
+        dirs = []
+        links = []
+        if source.is_symlink():
+            links.append((source, target))
+        elif source.is_dir():
+            stack = [(source, target)]
+            while stack:
+                src_dir, dst_dir = stack.pop()
+                dirs.append((src_dir, dst_dir))
+                try:
+                    with os.scandir(src_dir) as it:
+                        for entry in it:
+                            self.check()
+                            dst = dst_dir / entry.name
+                            if entry.is_symlink():
+                                links.append((Path(entry.path), dst))
+                            elif entry.is_dir():
+                                stack.append((Path(entry.path), dst))
+                            else:
+                                files.append((entry.path, dst, entry.stat().st_size))
+                except OSError as e:
+                    self.errors.append(str(e))
+        else:
+            files.append((str(source), target, source.stat().st_size))
+        
+        with self._lock:
+            self.total_files += len(files) + len(links)
+            self.total_bytes += sum(size for _, _, size in files)
+        
+        for _, dst_dir in dirs:
+            os.makedirs(dst_dir, exist_ok=True)
+        for src, dst in links:
+            self._copy_link(src, dst)
+        
+        # Per-file overhead (open, close, metadata) dominates small files,
+        # so overlap it; large files are streamed one at a time meanwhile
+        small = [item for item in files if item[2] < SMALL_FILE]
+        large = [item for item in files if item[2] >= SMALL_FILE]
+        self._parallel(self._copy_file, small, alongside=large)
+        
+        # Directory times last, after their contents stopped changing them
+        import shutil
+        for src_dir, dst_dir in reversed(dirs):
+            try:
+                shutil.copystat(src_dir, dst_dir)
+            except OSError:
+                pass
+    
+    def _delete(self):
+        with self._lock:
+            self.total_files += len(self.sources)
+        self._parallel(self._delete_one, [(source,) for source in self.sources])
+    
+    def _delete_one(self, path: Path):
+        self.check()
+        self.current = path.name
+        try:
+            _remove(path)
+        except OSError as e:
+            self.errors.append(str(e))
+        self.advance(0, files=1)
+    
+    def _parallel(self, func: Callable, items: List[tuple], alongside: Iterable[tuple] = ()):
+        """
+        Run func(*item) for items on a worker pool (and alongside on this thread)
+        
+        Raises:
+            OperationCancelled: once every worker has stopped, if cancelled
+        """
+        if len(items) <= 1:
+            for item in list(items) + list(alongside):
+                func(*item)
+            return
+        
+        from concurrent.futures import ThreadPoolExecutor, wait  # Deferred to keep startup light
+        with ThreadPoolExecutor(COPY_WORKERS, thread_name_prefix=self.kind) as pool:
+            futures = [pool.submit(func, *item) for item in items]
+            try:
+                for item in alongside:
+                    func(*item)
+            finally:
+                if self.cancelled:
+                    for future in futures:
+                        future.cancel()
+                wait(futures)
+            for future in futures:
+                error = None if future.cancelled() else future.exception()
+                if error is not None and not isinstance(error, OperationCancelled):
+                    raise error
+        self.check()
+    
+    def _copy_link(self, source: Path, target: Path):
+        try:
+            if target.is_symlink() or target.is_file():
+                target.unlink()
+            os.symlink(os.readlink(source), target)
+        except OSError as e:
+            self.errors.append(str(e))
+        self.advance(0, files=1)
+    
+    def _copy_file(self, source: str, target: Path, size: int):
+        self.check()
+        self.current = os.path.basename(source)
+        copied = 0
+        
+        def report(nbytes):
+            nonlocal copied
+            copied += nbytes
+            self.advance(nbytes)
+        
+        import shutil
+        try:
+            with open(source, 'rb') as fsrc, open(target, 'wb') as fdst:
+                copy_data(fsrc, fdst, self.check, report)
+            shutil.copystat(source, target)
+        except OperationCancelled:
+            _unlink_quietly(target)  # Never leave a truncated file behind
+            raise
+        except OSError as e:
+            self.errors.append(str(e))
+            _unlink_quietly(target)
+        # Count the file as done either way; settle the planned size against
+        # what was actually copied (the file may have changed, or failed)
+        with self._lock:
+            self.total_bytes += copied - size
+            self.done_files += 1
+
+
+class OperationQueue:
+    """
+    File operations run one after another on a background thread
+    
+    Jobs are serialised so two big copies don't fight over the same disk;
+    each job parallelises its own small files.
+    """
+    
+    def __init__(self):
+        self.jobs: List[FileOperation] = []  # Submitted, oldest first
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+    
+    def submit(self, job: FileOperation) -> FileOperation:
+        self.jobs.append(job)
+        self._queue.put(job)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="file-ops", daemon=True)
+            self._thread.start()
+        return job
+    
+    def active(self) -> List[FileOperation]:
+        """Queued and running jobs"""
+        return [job for job in self.jobs if not job.finished]
+    
+    def take_finished(self) -> List[FileOperation]:
+        """Remove and return jobs that finished since the last call"""
+        finished = [job for job in self.jobs if job.finished]
+        if finished:
+            self.jobs = [job for job in self.jobs if not job.finished]
+        return finished
+    
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+    
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job.cancelled:
+                job.state = 'cancelled'
+                continue
+            job.run()
+
+
+def copy_data(fsrc, fdst, check: Callable[[], None], report: Callable[[int], None]):
+    """
+    Copy an open file's contents in chunks
+    
+    Tries copy_file_range (in-kernel, may share extents on CoW filesystems),
+    then sendfile, then a plain read/write loop.
+    
+    Args:
+        fsrc: Source file, opened for binary reading
+        fdst: Destination file, opened for binary writing
+        check: Called before every chunk; raises to abort the copy
+        report: Called with the byte count of every chunk copied
+    """
+    if _kernel_copy(fsrc.fileno(), fdst.fileno(), check, report):
+        return
+    
+    buffer = bytearray(USER_COPY_BUFFER)
+    view = memoryview(buffer)
+    while True:
+        check()
+        n = fsrc.readinto(buffer)
+        if not n:
+            return
+        fdst.write(view[:n])
+        report(n)
+
+
+def _kernel_copy(fd_in: int, fd_out: int, check: Callable[[], None],
+                 report: Callable[[int], None]) -> bool:
+    """Copy with copy_file_range/sendfile; False if neither applies"""
+    methods = []
+    if hasattr(os, 'copy_file_range'):
+        methods.append(lambda: os.copy_file_range(fd_in, fd_out, COPY_CHUNK))
+    if hasattr(os, 'sendfile'):
+        methods.append(lambda: os.sendfile(fd_out, fd_in, None, COPY_CHUNK))
+    
+    for method in methods:
+        copied = 0
+        try:
+            while True:
+                check()
+                n = method()
+                if n == 0:
+                    return True
+                copied += n
+                report(n)
+        except OSError as e:
+            if copied or e.errno not in _FALLBACK_ERRNOS:
+                raise
+    return False
+
+
+def find_conflicts(sources: Iterable[Path], dest_dir: Path,
+                   existing_names: Optional[Iterable[str]] = None) -> List[Path]:
+    """
+    Sources whose name is already taken in dest_dir, checked in one pass
+    
+    Args:
+        sources: Paths about to be copied or moved into dest_dir
+        dest_dir: Destination directory
+        existing_names: Names known to be in dest_dir (e.g. its listing);
+            saves a stat() per source when given
+    """
+    if existing_names is not None:
+        taken = set(existing_names)
+        return [source for source in sources if source.name in taken]
+    return [source for source in sources if os.path.lexists(dest_dir / source.name)]
+
+
+def _same_path(a: Path, b: Path) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def _dest_in_source(source: Path, dest_dir: Path) -> bool:
+    """True if dest_dir is the folder source or inside it (as shutil.move checks)"""
+    if source.is_symlink() or not source.is_dir():
+        return False
+    try:
+        source, dest_dir = source.resolve(), dest_dir.resolve()
+    except OSError:
+        return False
+    return dest_dir == source or source in dest_dir.parents
+
+
+def _remove(path: Path):
+    if path.is_dir() and not path.is_symlink():
+        import shutil
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+def _unlink_quietly(path: Path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
@@ -3,26 +3,131 @@ File scanner module for Lightning Explorer
 Fast directory scanning and file listing
 """
 import os
+import queue
+import re
+import stat
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, Iterator, Optional, Tuple
 import time
 
+from core.fuzzy import FuzzyIndex, SEARCH_BUDGET_MS
+from core.perf import perf
+
+
+# Listing flag bits
+FLAG_DIR = 1
+FLAG_FILE = 2
+FLAG_SIZED = 4  # Directory row whose size column holds its aggregate total
+
+# Listing sort modes; all but 'size' list directories first
+SORT_MODES = ('name', 'natural', 'extension', 'mtime', 'size')
+
+# Listing cache bounds (whichever is reached first evicts)
+LISTING_CACHE_BYTES = 64 * 1024 * 1024
+LISTING_CACHE_ENTRIES = 64
+# Directory mtimes this close to the scan may hide a same-tick change
+# (coarse timestamps, e.g. 2s on FAT), so such scans are not cached
+LISTING_CACHE_RACY_SECONDS = 2.0
+
+
+def format_size(size: int, is_dir: bool = False) -> str:
+    """Human-readable file size"""
+    if is_dir:
+        return "<DIR>"
+    
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024.0:
+            return f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} TB"
+
+
+_DIGIT_RUNS = re.compile(r'(\d+)')
+
+
+def natural_key(text: str) -> tuple:
+    """Sort key comparing digit runs by value ("file2" sorts before "file10")"""
+    parts = _DIGIT_RUNS.split(text)
+    parts[1::2] = map(int, parts[1::2])  # Odd positions are always the digit runs
+    return tuple(parts)
+
 
 class FileEntry:
     """Represents a file or directory entry"""
     
+    __slots__ = ('name', 'is_dir', 'is_file', 'size', 'modified', '_parent', '_path')
+    
     def __init__(self, path: Path):
-        self.path = path
+        self._path = path
+        self._parent = None
         self.name = path.name
-        self.is_dir = path.is_dir()
-        self.is_file = path.is_file()
         
+        # One stat() gives us type, size and mtime together
         try:
-            self.size = path.stat().st_size if self.is_file else 0
-            self.modified = path.stat().st_mtime
+            st = path.stat()
         except (OSError, PermissionError):
+            # Broken symlink or entry vanished since listing
+            self.is_dir = False
+            self.is_file = False
             self.size = 0
             self.modified = 0
+            return
+        
+        self.is_dir = stat.S_ISDIR(st.st_mode)
+        self.is_file = stat.S_ISREG(st.st_mode)
+        self.size = st.st_size if self.is_file else 0
+        self.modified = st.st_mtime
+    
+    @classmethod
+    def from_fields(cls, parent: Path, name: str, is_dir: bool, is_file: bool,
+                    size: int, modified: float) -> 'FileEntry':
+        """Build a FileEntry from already-known fields (no syscalls, lazy path)"""
+        self = cls.__new__(cls)
+        self._parent = parent
+        self._path = None
+        self.name = name
+        self.is_dir = is_dir
+        self.is_file = is_file
+        self.size = size
+        self.modified = modified
+        return self
+    
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry, with_stat: bool = True,
+                       stats: Optional['ScanStats'] = None) -> 'FileEntry':
+        """
+        Build a FileEntry from an os.scandir() result
+        
+        Type information comes from the DirEntry's cached d_type, so no
+        syscall is needed for names/types. With with_stat=True exactly one
+        stat() is made (and DirEntry caches it for symlinks that is_dir()
+        already had to follow).
+        
+        Args:
+            entry: DirEntry yielded by os.scandir()
+            with_stat: Fetch size and mtime (one stat per entry)
+            stats: Optional ScanStats to record syscall counts into
+        
+        Returns:
+            FileEntry for the directory entry
+        """
+        flags, size, modified = probe_dir_entry(entry, with_stat, stats)
+        self = cls.from_fields(None, entry.name, bool(flags & FLAG_DIR),
+                               bool(flags & FLAG_FILE), size, modified)
+        self._path = Path(entry.path)
+        return self
+    
+    @property
+    def path(self) -> Path:
+        """Full path (created on first access)"""
+        if self._path is None:
+            self._path = self._parent / self.name
+        return self._path
     
     def __repr__(self):
         return f"FileEntry({self.name}, dir={self.is_dir})"
@@ -30,15 +135,565 @@ class FileEntry:
     @property
     def size_str(self):
         """Human-readable file size"""
-        if self.is_dir:
-            return "<DIR>"
+        return format_size(self.size, self.is_dir)
+
+
+def probe_dir_entry(entry: os.DirEntry, with_stat: bool,
+                     stats: Optional['ScanStats']) -> tuple:
+    """Return (flags, size, mtime) for a DirEntry using at most one stat()"""
+    try:
+        if entry.is_dir():
+            flags = FLAG_DIR
+        elif entry.is_file():
+            flags = FLAG_FILE
+        else:
+            flags = 0
+    except OSError:
+        flags = 0
+    
+    size = 0
+    modified = 0.0
+    if with_stat:
+        try:
+            st = entry.stat()
+            if stats is not None:
+                stats.stat_calls += 1
+            if flags & FLAG_FILE:
+                size = st.st_size
+            modified = st.st_mtime
+        except OSError:
+            if stats is not None:
+                stats.stat_errors += 1
+    
+    return flags, size, modified
+
+
+def probe_path(path: Path, with_stat: bool = True) -> Optional[tuple]:
+    """
+    Return (flags, size, mtime) for a path, like probe_dir_entry()
+    
+    Returns:
+        The tuple, or None if nothing exists at path any more
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        try:
+            os.lstat(path)  # Still listed, e.g. a broken symlink
+        except OSError:
+            return None
+        return 0, 0, 0.0
+    
+    if stat.S_ISDIR(st.st_mode):
+        flags = FLAG_DIR
+    elif stat.S_ISREG(st.st_mode):
+        flags = FLAG_FILE
+    else:
+        flags = 0
+    if not with_stat:
+        return flags, 0, 0.0
+    return flags, st.st_size if flags & FLAG_FILE else 0, st.st_mtime
+
+
+class Listing:
+    """
+    Columnar directory listing
+    
+    Names, type flags, sizes and mtimes are stored in parallel compact
+    columns instead of one Python object per entry. A Listing also carries
+    an ``order`` array of row numbers, so sorted and filtered views share
+    the same columns and cost 4 bytes per visible row.
+    
+    Indexing (``listing[i]``) and iteration materialise lightweight
+    FileEntry objects on demand; hot paths should use the per-column
+    accessors (``name(i)``, ``is_dir(i)``, ...) instead.
+    """
+    
+    __slots__ = ('root', 'names', 'folded', 'flags', 'sizes', 'mtimes', 'order',
+                 'sort_mode', 'sort_keys')
+    
+    def __init__(self, root: Path):
+        self.root = root
+        self.names = []
+        self.folded = []  # Lowercased names, filled by sort_default()/folded_names()
+        self.flags = array('B')
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.order = array('I')
+        self.sort_mode = 'name'  # Last sort applied (one of SORT_MODES)
+        self.sort_keys = {}  # Mode -> per-row sort keys, built on first use
+    
+    def append(self, name: str, flags: int, size: int = 0, modified: float = 0.0) -> int:
+        """Append a row and return its row number (also added to order)"""
+        row = len(self.names)
+        self.names.append(name)
+        self.flags.append(flags)
+        self.sizes.append(size)
+        self.mtimes.append(modified)
+        self.order.append(row)
+        return row
+    
+    def append_dir_entry(self, entry: os.DirEntry, with_stat: bool = True,
+                         stats: Optional['ScanStats'] = None) -> int:
+        """Append an os.scandir() result using at most one stat()"""
+        flags, size, modified = probe_dir_entry(entry, with_stat, stats)
+        return self.append(entry.name, flags, size, modified)
+    
+    def set_row(self, row: int, flags: int, size: int = 0, modified: float = 0.0):
+        """Update a row's columns in place (e.g. the file was modified)"""
+        self.flags[row] = flags
+        self.sizes[row] = size
+        self.mtimes[row] = modified
+        self._update_keys(row)
+    
+    def set_dir_size(self, row: int, total: int):
+        """Record a directory row's aggregate size (shown instead of <DIR>)"""
+        self.flags[row] |= FLAG_SIZED
+        self.sizes[row] = total
+        self._update_keys(row)
+    
+    def drop_rows(self, rows: set):
+        """
+        Remove rows, renumbering the rest
+        
+        Columns are rebuilt, so views taken with select() before the call
+        are stale and must be re-derived.
+        """
+        if not rows:
+            return
+        total = len(self.names)
+        keep = [row for row in range(total) if row not in rows]
+        remap = array('q', [-1]) * total
+        for new, old in enumerate(keep):
+            remap[old] = new
+        
+        names = self.names
+        folded = self.folded
+        self.names = [names[row] for row in keep]
+        self.folded = [folded[row] for row in keep if row < len(folded)]
+        self.flags = array('B', map(self.flags.__getitem__, keep))
+        self.sizes = array('q', map(self.sizes.__getitem__, keep))
+        self.mtimes = array('d', map(self.mtimes.__getitem__, keep))
+        self.order = array('I', [remap[row] for row in self.order if remap[row] >= 0])
+        self.sort_keys = {mode: [keys[row] for row in keep if row < len(keys)]
+                          for mode, keys in self.sort_keys.items()}
+    
+    def memory_size(self) -> int:
+        """Approximate bytes held by the columns (for cache accounting)"""
+        columns = (self.flags, self.sizes, self.mtimes, self.order)
+        size = sum(len(column) * column.itemsize for column in columns)
+        for names in (self.names, self.folded):
+            size += sys.getsizeof(names) + sum(map(len, names)) + len(names) * sys.getsizeof('')
+        for keys in self.sort_keys.values():
+            size += sys.getsizeof(keys) + len(keys) * 64  # Rough: a small tuple or string each
+        return size
+    
+    def select(self, rows: Iterable[int]) -> 'Listing':
+        """Return a view over the same columns showing only ``rows``"""
+        view = Listing.__new__(Listing)
+        view.root = self.root
+        view.names = self.names
+        view.folded = self.folded
+        view.flags = self.flags
+        view.sizes = self.sizes
+        view.mtimes = self.mtimes
+        view.order = array('I', rows)
+        view.sort_mode = self.sort_mode
+        view.sort_keys = self.sort_keys
+        return view
+    
+    def folded_names(self) -> list:
+        """Lowercased names for every row (extends the cache for new rows)"""
+        folded = self.folded
+        if len(folded) < len(self.names):
+            folded.extend(name.lower() for name in self.names[len(folded):])
+        return folded
+    
+    def sort(self, mode: str = 'name'):
+        """
+        Sort order in place by one of SORT_MODES
+        
+        Keys are computed once per row and kept in ``sort_keys``, so sorting
+        again (e.g. switching modes back and forth) only compares.
+        """
+        keys = self.row_keys(mode)
+        self.order = array('I', sorted(self.order, key=keys.__getitem__))
+        self.sort_mode = mode
+    
+    def sort_default(self):
+        """Sort order in place: directories first, then case-insensitive name"""
+        self.sort('name')
+    
+    def resort(self):
+        """Re-apply the last sort"""
+        self.sort(self.sort_mode)
+    
+    def place(self, row: int):
+        """
+        Move one row to its position in the current sort order
+        
+        For a row just appended or changed (see set_row()); the rest of
+        order must already be sorted. A bisection plus one array insert,
+        instead of sorting everything again.
+        """
+        order = self.order
+        if order and order[-1] == row:
+            order.pop()
+        else:
+            try:
+                order.remove(row)
+            except ValueError:
+                pass
+        keys = self.row_keys(self.sort_mode)
+        order.insert(bisect_right(order, keys[row], key=keys.__getitem__), row)
+    
+    def row_keys(self, mode: str) -> list:
+        """Sort keys for every row in mode (extends the cache for new rows)"""
+        keys = self.sort_keys.get(mode)
+        if keys is None:
+            keys = self.sort_keys[mode] = []
+        if len(keys) < len(self.names):
+            keys.extend(self._make_keys(mode, range(len(keys), len(self.names))))
+        return keys
+    
+    def _make_keys(self, mode: str, rows: range) -> list:
+        folded = self.folded_names()
+        flags = self.flags
+        if mode == 'size':
+            sizes = self.sizes
+            return [(-sizes[r], folded[r]) for r in rows]
+        groups = ['1' if not flags[r] & FLAG_DIR else '0' for r in rows]
+        if mode == 'name':
+            return [group + folded[r] for group, r in zip(groups, rows)]
+        if mode == 'extension':
+            # '\0' ends the extension, so "py" sorts before "pyc"
+            extensions = (folded[r].rpartition('.') for r in rows)
+            return [f"{group}{ext if stem else ''}\0{folded[r]}"
+                    for group, (stem, _, ext), r in zip(groups, extensions, rows)]
+        if mode == 'natural':
+            return [(group, natural_key(folded[r]), folded[r]) for group, r in zip(groups, rows)]
+        if mode == 'mtime':
+            mtimes = self.mtimes
+            return [(group, -mtimes[r], folded[r]) for group, r in zip(groups, rows)]
+        raise ValueError(f"Unknown sort mode: {mode}")
+    
+    def _update_keys(self, row: int):
+        """Recompute cached keys for a changed row"""
+        for mode, keys in self.sort_keys.items():
+            if row < len(keys):
+                keys[row] = self._make_keys(mode, range(row, row + 1))[0]
+    
+    # Per-row accessors (i is a position in display order)
+    
+    def row(self, i: int) -> int:
+        return self.order[i]
+    
+    def name(self, i: int) -> str:
+        return self.names[self.order[i]]
+    
+    def is_dir(self, i: int) -> bool:
+        return bool(self.flags[self.order[i]] & FLAG_DIR)
+    
+    def is_file(self, i: int) -> bool:
+        return bool(self.flags[self.order[i]] & FLAG_FILE)
+    
+    def size(self, i: int) -> int:
+        return self.sizes[self.order[i]]
+    
+    def modified(self, i: int) -> float:
+        return self.mtimes[self.order[i]]
+    
+    def size_str(self, i: int) -> str:
+        row = self.order[i]
+        flags = self.flags[row]
+        return format_size(self.sizes[row], flags & (FLAG_DIR | FLAG_SIZED) == FLAG_DIR)
+    
+    def path(self, i: int) -> Path:
+        return self.root / self.names[self.order[i]]
+    
+    def dir_count(self) -> int:
+        """Number of directories in this view"""
+        flags = self.flags
+        return sum(1 for r in self.order if flags[r] & FLAG_DIR)
+    
+    def entry_for_row(self, row: int) -> FileEntry:
+        """Materialise a FileEntry for a row number"""
+        flags = self.flags[row]
+        return FileEntry.from_fields(self.root, self.names[row], bool(flags & FLAG_DIR),
+                                     bool(flags & FLAG_FILE), self.sizes[row], self.mtimes[row])
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def __getitem__(self, i: int) -> FileEntry:
+        return self.entry_for_row(self.order[i])
+    
+    def __iter__(self) -> Iterator[FileEntry]:
+        for row in self.order:
+            yield self.entry_for_row(row)
+    
+    def __repr__(self):
+        return f"Listing({self.root}, {len(self)} of {len(self.names)} rows)"
+
+
+class ScanStats:
+    """Syscall and timing breakdown for a single directory scan"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = 0
+        self.scandir_calls = 0
+        self.stat_calls = 0
+        self.stat_errors = 0
+        self.list_ms = 0.0   # scandir() iteration + column appends
+        self.sort_ms = 0.0
+        self.total_ms = 0.0
+        self.cached = False  # Served from the ListingCache, not scanned
+    
+    @property
+    def syscalls(self) -> int:
+        """Approximate syscall count (one scandir + one stat per entry)"""
+        return self.scandir_calls + self.stat_calls + self.stat_errors
+    
+    def summary(self) -> str:
+        """One-line human-readable breakdown"""
+        if self.cached:
+            return f"{self.entries} entries from cache in {self.total_ms:.1f}ms"
+        return (f"{self.entries} entries in {self.total_ms:.1f}ms "
+                f"(list {self.list_ms:.1f}ms, sort {self.sort_ms:.1f}ms, "
+                f"{self.syscalls} syscalls: {self.scandir_calls} scandir, "
+                f"{self.stat_calls} stat)")
+    
+    def record(self):
+        """Add this scan to the performance counters"""
+        perf.count('scans')
+        if self.cached:
+            perf.count('cache_hits')
+            return
+        perf.count('entries', self.entries)
+        perf.count('syscalls', self.syscalls)
+    
+    def __repr__(self):
+        return f"ScanStats({self.summary()})"
+
+
+def directory_mtime(path: Path) -> Optional[int]:
+    """Directory mtime in ns (bumped by adds, removes and renames), or None"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ListingCache:
+    """
+    Recently scanned listings by path, least recently used evicted first
+    
+    An entry is reused only while its directory's mtime is unchanged, which
+    costs one stat() per lookup. Entries added, removed or renamed bump the
+    directory mtime; a file rewritten in place does not, so its size may be
+    stale until the directory is rescanned (F5) - live watching covers the
+    directory on screen.
+    """
+    
+    def __init__(self, max_bytes: int = LISTING_CACHE_BYTES,
+                 max_entries: int = LISTING_CACHE_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # path -> (listing, with_stat, directory mtime_ns, bytes)
+        self._entries = OrderedDict()
+    
+    def get(self, path: Path, with_stat: bool = True) -> Optional[Listing]:
+        """Cached listing for path if the directory is unchanged, else None"""
+        entry = self._entries.get(path)
+        if entry is not None:
+            listing, has_stat, mtime_ns, _ = entry
+            if directory_mtime(path) != mtime_ns:
+                self.discard(path)  # Directory changed since
+            elif has_stat or not with_stat:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return listing
+        self.misses += 1
+        return None
+    
+    def put(self, path: Path, listing: Listing, with_stat: bool,
+            mtime_ns: Optional[int], scanned_at: float):
+        """
+        Remember a complete listing
+        
+        Args:
+            path: Directory the listing is for
+            listing: The listing (kept by reference, not copied)
+            with_stat: Whether sizes and mtimes were fetched
+            mtime_ns: Directory mtime taken before the scan started
+            scanned_at: time.time() when the scan started
+        """
+        self.discard(path)
+        if mtime_ns is None or mtime_ns / 1e9 > scanned_at - LISTING_CACHE_RACY_SECONDS:
+            return  # Changed too recently to trust the mtime
+        size = listing.memory_size()
+        if size > self.max_bytes:
+            return
+        self._entries[path] = (listing, with_stat, mtime_ns, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            _, (_, _, _, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+    
+    def discard(self, path: Path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.bytes -= entry[3]
+    
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, path: Path) -> bool:
+        return path in self._entries
+
+
+class ScanJob:
+    """
+    Directory scan running on a worker thread
+    
+    The worker pushes batches of (name, flags, size, mtime) tuples onto a
+    queue; the owning (Tk) thread calls poll() - e.g. from an after() loop -
+    to fold them into ``listing``. Rows are appended in arrival order so
+    hints already on screen stay put while the scan streams in; the final
+    directories-first sort happens once, when the worker finishes.
+    """
+    
+    def __init__(self, path: Path, with_stat: bool = True,
+                 scanner: Optional['FileScanner'] = None,
+                 first_batch: int = 64, batch_size: int = 2000):
+        self.path = path
+        self.with_stat = with_stat
+        self.scanner = scanner
+        self.first_batch = first_batch
+        self.batch_size = batch_size
+        self.listing = Listing(path)
+        self.stats = ScanStats(path)
+        self.error: Optional[OSError] = None
+        self.done = False
+        self.dir_mtime: Optional[int] = None  # Directory mtime_ns before listing
+        self.started_at = 0.0  # time.time() at start, for the ListingCache
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._start_time = 0.0
+        self._thread = threading.Thread(target=self._run, name=f"scan:{path}", daemon=True)
+    
+    def start(self) -> 'ScanJob':
+        self._start_time = time.perf_counter()
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+    
+    @classmethod
+    def completed(cls, path: Path, listing: Listing,
+                  scanner: Optional['FileScanner'] = None) -> 'ScanJob':
+        """An already finished job over an existing listing (cache hit)"""
+        job = cls(path, scanner=scanner)
+        job.listing = listing
+        job.stats.cached = True
+        job.stats.entries = len(listing)
+        job.done = True
+        job._finished.set()
+        return job
+    
+    def cancel(self):
+        """Stop the worker at its next entry; poll() will report nothing more"""
+        self._cancel.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the worker has listed everything (or timeout)"""
+        return self._finished.wait(timeout)
+    
+    def _run(self):
+        stats = self.stats
+        batch = []
+        limit = self.first_batch
+        try:
+            self.dir_mtime = directory_mtime(self.path)
+            stats.stat_calls += 1
+            stats.scandir_calls += 1
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if self._cancel.is_set():
+                        return
+                    batch.append((entry.name,) + probe_dir_entry(entry, self.with_stat, stats))
+                    if len(batch) >= limit:
+                        self._queue.put(batch)
+                        batch = []
+                        limit = self.batch_size
+        except OSError as e:
+            # Can't access the directory, or listing it failed part way
+            # (EIO, ELOOP, a stale NFS handle...): the rows so far are
+            # shown, but never cached as if complete
+            self.error = e
+        finally:
+            if batch:
+                self._queue.put(batch)
+            stats.list_ms = (time.perf_counter() - self._start_time) * 1000
+            self._queue.put(None)
+            self._finished.set()
+    
+    def poll(self) -> int:
+        """
+        Fold queued batches into the listing (call from the owning thread)
         
-        size = self.size
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} TB"
+        Returns:
+            Number of rows added by this call
+        """
+        if self.done or self.cancelled:
+            return 0
+        
+        added = 0
+        listing = self.listing
+        while True:
+            try:
+                batch = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None:
+                self._complete()
+                break
+            for name, flags, size, modified in batch:
+                listing.append(name, flags, size, modified)
+            added += len(batch)
+        return added
+    
+    def _complete(self):
+        sort_start = time.perf_counter()
+        self.listing.sort(self.scanner.sort_mode if self.scanner is not None else 'name')
+        stats = self.stats
+        stats.sort_ms = (time.perf_counter() - sort_start) * 1000
+        stats.entries = len(self.listing)
+        stats.total_ms = (time.perf_counter() - self._start_time) * 1000
+        self.done = True
+        perf.record('scan', int(self._start_time * 1e9))
+        stats.record()
+        
+        if self.scanner is not None:
+            self.scanner.files = self.listing
+            self.scanner.last_stats = stats
+            if self.error is None:
+                self.scanner.cache.put(self.path, self.listing, self.with_stat,
+                                       self.dir_mtime, self.started_at)
+            if self.scanner.active_job is self:
+                self.scanner.active_job = None
 
 
 class FileScanner:
@@ -46,52 +701,153 @@ class FileScanner:
     
     def __init__(self):
         self.current_path = Path.cwd()
-        self.files: List[FileEntry] = []
+        self.files = Listing(self.current_path)
+        self.last_stats: Optional[ScanStats] = None
+        self.active_job: Optional[ScanJob] = None
+        self.cache = ListingCache()  # Recent listings, for instant revisits
+        self.sort_mode = 'name'  # Applied to every new listing (see SORT_MODES)
+        self._fuzzy: Optional[FuzzyIndex] = None
+        # Previous search, kept so a longer query can narrow its matches
+        self._last_query = ''
+        self._last_matches = []
+        self._last_rows = 0
+        # Name -> row of the listing it was built for (see apply_changes)
+        self._row_names = {}
+        self._row_names_for = None
     
-    def scan(self, path: Optional[Path] = None) -> List[FileEntry]:
+    @perf.timed('scan')
+    def scan(self, path: Optional[Path] = None, with_stat: bool = True,
+             use_cache: bool = True) -> Listing:
         """
-        Scan directory and return list of files
+        Scan directory and return its listing
+        
+        Uses os.scandir() so file types come from the directory listing
+        itself; at most one stat() is made per entry for size/mtime.
+        Entries go straight into a columnar Listing, no per-file objects.
         
         Args:
             path: Directory to scan (uses current_path if None)
+            with_stat: Fetch size and modified time. Pass False when only
+                names and types are needed (no per-entry syscalls).
+            use_cache: Reuse a cached listing if the directory is unchanged
         
         Returns:
-            List of FileEntry objects
+            Listing sorted directories first, then alphabetically
         """
         if path:
             self.current_path = Path(path)
         
-        start_time = time.time()
-        files = []
+        stats = ScanStats(self.current_path)
+        start_time = time.perf_counter()
+        
+        if use_cache:
+            cached = self.cache.get(self.current_path, with_stat)
+            if cached is not None:
+                stats.cached = True
+                stats.entries = len(cached)
+                stats.total_ms = (time.perf_counter() - start_time) * 1000
+                self.files = cached
+                self.last_stats = stats
+                stats.record()
+                return cached
+        
+        files = Listing(self.current_path)
+        scanned_at = time.time()
         
         try:
-            # Get all entries
-            entries = list(self.current_path.iterdir())
-            
-            # Create FileEntry objects
-            for entry in entries:
-                try:
-                    files.append(FileEntry(entry))
-                except (OSError, PermissionError):
-                    # Skip files we can't access
-                    continue
+            dir_mtime = directory_mtime(self.current_path)
+            stats.stat_calls += 1
+            stats.scandir_calls += 1
+            with os.scandir(self.current_path) as it:
+                for entry in it:
+                    files.append_dir_entry(entry, with_stat, stats)
             
-            # Sort: directories first, then alphabetically
-            files.sort(key=lambda x: (not x.is_dir, x.name.lower()))
+            list_done = time.perf_counter()
+            stats.list_ms = (list_done - start_time) * 1000
             
-        except PermissionError:
-            # Can't access directory
-            files = []
+            # Sort: directories first, then by sort_mode (name by default)
+            files.sort(self.sort_mode)
+            stats.sort_ms = (time.perf_counter() - list_done) * 1000
+            self.cache.put(self.current_path, files, with_stat, dir_mtime, scanned_at)
+        
+        except OSError:
+            # Can't access directory (or listing it failed part way)
+            files = Listing(self.current_path)
         
         self.files = files
-        scan_time = (time.time() - start_time) * 1000  # Convert to ms
+        stats.entries = len(files)
+        stats.total_ms = (time.perf_counter() - start_time) * 1000
+        self.last_stats = stats
+        stats.record()
         
         # Performance target: < 50ms for 10,000 files
-        if len(files) > 1000 and scan_time > 50:
-            print(f"⚠️ Scan time: {scan_time:.1f}ms for {len(files)} files (consider C++ optimization)")
+        if len(files) > 1000 and stats.total_ms > 50:
+            print(f"⚠️ Scan time: {stats.summary()}", file=sys.stderr)  # stdout carries CLI records
         
         return files
     
+    def scan_async(self, path: Optional[Path] = None, with_stat: bool = True,
+                   use_cache: bool = True) -> ScanJob:
+        """
+        Start scanning a directory on a worker thread
+        
+        Any scan still running is cancelled first. The caller polls the
+        returned job; once it completes ``files`` is sorted and
+        ``last_stats`` is updated, just as scan() would. An unchanged
+        cached listing comes back as an already completed job.
+        
+        Args:
+            path: Directory to scan (uses current_path if None)
+            with_stat: Fetch size and modified time
+            use_cache: Reuse a cached listing if the directory is unchanged
+        
+        Returns:
+            The started ScanJob
+        """
+        if path:
+            self.current_path = Path(path)
+        
+        if self.active_job is not None:
+            self.active_job.cancel()
+            self.active_job = None
+        
+        if use_cache:
+            start_time = time.perf_counter()
+            cached = self.cache.get(self.current_path, with_stat)
+            if cached is not None:
+                job = ScanJob.completed(self.current_path, cached, scanner=self)
+                job.stats.total_ms = (time.perf_counter() - start_time) * 1000
+                self.files = cached
+                self.last_stats = job.stats
+                job.stats.record()
+                return job
+        
+        # files points at the (growing) listing straight away so search()
+        # works over partial results while the scan streams in
+        self.active_job = ScanJob(self.current_path, with_stat, scanner=self).start()
+        self.files = self.active_job.listing
+        return self.active_job
+    
+    def adopt_listing(self, listing: Listing, with_stat: bool,
+                      mtime_ns: Optional[int], scanned_at: float) -> ScanJob:
+        """
+        Use a complete listing of current_path made elsewhere (the daemon's)
+        
+        The scan in flight, if any, is cancelled, and the listing is cached
+        as if it had been scanned here.
+        
+        Returns:
+            An already completed ScanJob over the listing
+        """
+        if self.active_job is not None:
+            self.active_job.cancel()
+            self.active_job = None
+        self.cache.put(self.current_path, listing, with_stat, mtime_ns, scanned_at)
+        job = ScanJob.completed(self.current_path, listing, scanner=self)
+        self.files = listing
+        self.last_stats = job.stats
+        return job
+    
     def navigate_up(self) -> bool:
         """
         Navigate to parent directory
@@ -120,25 +876,112 @@ class FileScanner:
             return True
         return False
     
-    def search(self, query: str) -> List[FileEntry]:
+    def row_of(self, name: str) -> Optional[int]:
+        """Row number of name in the current listing, or None"""
+        return self._row_index().get(name)
+    
+    def _row_index(self) -> dict:
+        """Name -> row map for the current listing (rebuilt when rows renumber)"""
+        files = self.files
+        if self._row_names_for is not files.names:
+            self._row_names = {name: row for row, name in enumerate(files.names)}
+            self._row_names_for = files.names
+        return self._row_names
+    
+    def apply_changes(self, names: Iterable[str], with_stat: bool = True) -> Tuple[int, int, int]:
         """
-        Simple fuzzy search through current files
+        Patch the current listing for names reported by a DirectoryWatcher
+        
+        Each name is re-probed with one stat(): rows that disappeared are
+        dropped, new and changed rows are moved into place by bisection -
+        no rescan and no full re-sort of the directory.
+        
+        Args:
+            names: Names (in current_path) that may have changed
+            with_stat: Fetch size and modified time
+        
+        Returns:
+            (added, removed, updated) row counts
+        """
+        files = self.files
+        rows = self._row_index()
+        
+        added = updated = 0
+        gone = set()
+        for name in names:
+            info = probe_path(files.root / name, with_stat)
+            row = rows.get(name)
+            if row is None:
+                if info is not None:
+                    row = rows[name] = files.append(name, *info)
+                    files.place(row)
+                    added += 1
+            elif info is None:
+                gone.add(row)
+                del rows[name]
+            elif info != (files.flags[row], files.sizes[row], files.mtimes[row]):
+                files.set_row(row, *info)
+                files.place(row)  # Its size, mtime or type may have moved it
+                updated += 1
+        
+        if gone:
+            files.drop_rows(gone)
+        if added or gone:
+            self._last_query = ''  # Previous matches are no longer valid rows
+        return added, len(gone), updated
+    
+    def fuzzy_index(self) -> FuzzyIndex:
+        """Search cache for the current listing (rebuilt when files changes)"""
+        folded = self.files.folded_names()
+        if self._fuzzy is None or self._fuzzy.names is not self.files.names:
+            self._fuzzy = FuzzyIndex(self.files.names, folded)
+            self._last_query = ''
+        return self._fuzzy
+    
+    @perf.timed('search')
+    def search(self, query: str, budget_ms: float = SEARCH_BUDGET_MS) -> Listing:
+        """
+        Fuzzy search through current files, best matches first
+        
+        Every name containing the query characters in order matches
+        (e.g. "mwin" finds "main_window.py"); results are ranked fzf-style,
+        favouring matches at word boundaries and consecutive runs.
+        
+        A leading ``'`` asks for an exact substring match instead.
+        
+        When the query extends the previous one (a character was typed),
+        only the previous matches are re-tested; deletions or a changed
+        listing fall back to a full search.
         
         Args:
             query: Search string
+            budget_ms: Time allowed for scoring; matches beyond it are
+                still returned, unranked, after the ranked ones
         
         Returns:
-            Filtered list of FileEntry objects
+            Ranked view of the current Listing
         """
         if not query:
             return self.files
         
-        query_lower = query.lower()
-        results = []
+        query = query.lower()
+        needle = query[1:] if query.startswith("'") else query
+        if not needle:
+            self._last_query = ''
+            return self.files
+        
+        index = self.fuzzy_index()
+        rows = len(self.files.names)
+        
+        if self._last_query and query.startswith(self._last_query) and rows == self._last_rows:
+            matches = index.candidates(query, within=self._last_matches)
+        else:
+            matches = index.candidates(query)
         
-        for file in self.files:
-            # Simple substring matching (can be enhanced with fuzzy matching later)
-            if query_lower in file.name.lower():
-                results.append(file)
+        self._last_query = query
+        self._last_matches = matches
+        self._last_rows = rows
         
-        return results
+        ranked, _ = index.rank(needle, matches, budget_ms=budget_ms)
+        return self.files.select(ranked)
+        
\ No newline at end of file
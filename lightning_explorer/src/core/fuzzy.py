@@ -0,0 +1,285 @@
+"""
+Fuzzy matching module for Lightning Explorer
+fzf-style subsequence scoring with boundary/camelCase/consecutive bonuses
+"""
+import re
+import time
+from bisect import bisect_right
+from itertools import compress
+from typing import List, Optional, Sequence, Tuple
+
+
+# Scoring constants (same shape as fzf's v1 algorithm)
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_BOUNDARY = SCORE_MATCH // 2
+BONUS_NON_WORD = SCORE_MATCH // 2
+BONUS_CAMEL = BONUS_BOUNDARY + SCORE_GAP_EXTENSION
+BONUS_CONSECUTIVE = -(SCORE_GAP_START + SCORE_GAP_EXTENSION)
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+BONUS_BOUNDARY_WHITE = BONUS_BOUNDARY + 2
+BONUS_BOUNDARY_DELIMITER = BONUS_BOUNDARY + 1
+
+# Default scoring budget per search: leaves room in a 16ms frame for redraw
+SEARCH_BUDGET_MS = 10.0
+
+# Character classes, ordered so that "> CHAR_NON_WORD" means word-like
+CHAR_WHITE, CHAR_NON_WORD, CHAR_DELIMITER, CHAR_LOWER, CHAR_UPPER, CHAR_LETTER, CHAR_NUMBER = range(7)
+DELIMITERS = '/,:;|\\'
+
+
+def _char_class(char: str) -> int:
+    if char.islower():
+        return CHAR_LOWER
+    if char.isupper():
+        return CHAR_UPPER
+    if char.isdigit():
+        return CHAR_NUMBER
+    if char.isalpha():
+        return CHAR_LETTER
+    if char.isspace():
+        return CHAR_WHITE
+    if char in DELIMITERS:
+        return CHAR_DELIMITER
+    return CHAR_NON_WORD
+
+
+def _bonus_for(prev_class: int, char_class: int) -> int:
+    if char_class > CHAR_NON_WORD:
+        if prev_class == CHAR_WHITE:
+            return BONUS_BOUNDARY_WHITE
+        if prev_class == CHAR_DELIMITER:
+            return BONUS_BOUNDARY_DELIMITER
+        if prev_class == CHAR_NON_WORD:
+            return BONUS_BOUNDARY
+    if (prev_class == CHAR_LOWER and char_class == CHAR_UPPER) or \
+            (prev_class != CHAR_NUMBER and char_class == CHAR_NUMBER):
+        return BONUS_CAMEL
+    if char_class in (CHAR_NON_WORD, CHAR_DELIMITER):
+        return BONUS_NON_WORD
+    if char_class == CHAR_WHITE:
+        return BONUS_BOUNDARY_WHITE
+    return 0
+
+
+def position_bonuses(name: str) -> bytes:
+    """Per-character bonus for matching at each position of ``name``"""
+    bonuses = bytearray(len(name))
+    prev_class = CHAR_WHITE  # Start of name counts as a word boundary
+    for i, char in enumerate(name):
+        char_class = _char_class(char)
+        bonuses[i] = _bonus_for(prev_class, char_class)
+        prev_class = char_class
+    return bytes(bonuses)
+
+
+def folded_bonuses(name: str, folded: str) -> bytes:
+    """
+    position_bonuses() to score against ``folded`` (``name.lower()``)
+    
+    Bonuses come from the original name so camelCase still counts, unless
+    lower() changed the length (rare Unicode, e.g. 'İ'), in which case
+    the positions would no longer line up and the folded name is used.
+    """
+    return position_bonuses(name if len(name) == len(folded) else folded)
+
+
+def fuzzy_score(folded: str, query: str, bonuses: bytes) -> Optional[int]:
+    """
+    Score ``query`` as a subsequence of ``folded``
+    
+    Finds the first occurrence going forwards, then shrinks the span going
+    backwards (fzf v1), and scores it: every matched char earns
+    SCORE_MATCH plus its position bonus, gaps are penalised, and a run of
+    consecutive matches keeps the bonus of the boundary it started on.
+    
+    Args:
+        folded: Lowercased candidate name
+        query: Lowercased query
+        bonuses: position_bonuses() of the original (unfolded) name
+    
+    Returns:
+        Score (higher is better), or None if query is not a subsequence
+    """
+    # Forward pass: end of the first complete occurrence
+    pos = -1
+    for char in query:
+        pos = folded.find(char, pos + 1)
+        if pos < 0:
+            return None
+    end = pos + 1
+    
+    # Backward pass: latest start that still matches the whole query
+    qi = len(query) - 1
+    start = pos
+    while qi >= 0:
+        if folded[start] == query[qi]:
+            qi -= 1
+            if qi < 0:
+                break
+        start -= 1
+    
+    score = 0
+    qi = 0
+    in_gap = False
+    consecutive = 0
+    first_bonus = 0
+    for i in range(start, end):
+        if folded[i] == query[qi]:
+            bonus = bonuses[i]
+            if consecutive == 0:
+                first_bonus = bonus
+            else:
+                # A consecutive run keeps the bonus of the boundary it began on
+                if bonus >= BONUS_BOUNDARY and bonus > first_bonus:
+                    first_bonus = bonus
+                bonus = max(bonus, first_bonus, BONUS_CONSECUTIVE)
+            score += SCORE_MATCH + (bonus * BONUS_FIRST_CHAR_MULTIPLIER if qi == 0 else bonus)
+            in_gap = False
+            consecutive += 1
+            qi += 1
+            if qi == len(query):
+                break
+        else:
+            score += SCORE_GAP_EXTENSION if in_gap else SCORE_GAP_START
+            in_gap = True
+            consecutive = 0
+            first_bonus = 0
+    return score
+
+
+class FuzzyIndex:
+    """
+    Search-side cache for one listing's names
+    
+    Holds the lowercased names, a newline-joined haystack for the regex
+    prefilter (so the subsequence test over every name runs in C), and the
+    per-name bonus tables, computed the first time a name is scored.
+    """
+    
+    def __init__(self, names: List[str], folded: List[str]):
+        self.names = names
+        self.folded = folded
+        self._bonuses = {}
+        self._haystack = ''
+        self._line_starts: List[int] = []
+        self._line_rows: List[int] = []  # Row of each haystack line
+        self._multiline: List[int] = []  # Rows left out of the haystack
+        self._indexed = -1
+    
+    def _refresh(self):
+        """(Re)build the haystack if rows were appended since last time"""
+        if self._indexed == len(self.folded):
+            return
+        starts = []
+        rows = []
+        lines = []
+        multiline = []
+        offset = 0
+        for row, name in enumerate(self.folded):
+            if '\n' in name:
+                # Names may legally contain newlines; such a row would span
+                # lines of the haystack, so it is tested on its own
+                multiline.append(row)
+                continue
+            starts.append(offset)
+            rows.append(row)
+            lines.append(name)
+            offset += len(name) + 1
+        self._line_starts = starts
+        self._line_rows = rows
+        self._multiline = multiline
+        self._haystack = '\n'.join(lines) + '\n'
+        self._indexed = len(self.folded)
+    
+    def bonuses(self, row: int) -> bytes:
+        cached = self._bonuses.get(row)
+        if cached is None:
+            cached = self._bonuses[row] = folded_bonuses(self.names[row], self.folded[row])
+        return cached
+    
+    def substring_candidates(self, needle: str, within: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Rows (in row order) whose lowercased name contains ``needle``
+        
+        A single directory is cheap to scan linearly; the recursive
+        TreeIndex answers the same query from trigram posting lists.
+        """
+        folded = self.folded
+        if within is not None:
+            return [row for row in within if needle in folded[row]]
+        return [row for row, name in enumerate(folded) if needle in name]
+    
+    def candidates(self, query: str, within: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Rows (in row order) matching ``query``
+        
+        A leading ``'`` asks for an exact substring match; otherwise the
+        query characters must appear in order.
+        
+        Args:
+            query: Lowercased query (non-empty)
+            within: Only test these rows, e.g. the matches of a shorter
+                query that ``query`` extends (all rows if None)
+        """
+        if query.startswith("'"):
+            return self.substring_candidates(query[1:], within)
+        
+        if within is not None:
+            pattern = re.compile('.*?'.join(map(re.escape, query)), re.DOTALL)
+            names = map(self.folded.__getitem__, within)
+            return list(compress(within, map(pattern.search, names)))
+        
+        if len(query) == 1:
+            # Plain containment beats building a match object per hit
+            return [row for row, name in enumerate(self.folded) if query in name]
+        
+        self._refresh()
+        gap = '[^\n]*?'
+        pattern = re.compile(gap.join(re.escape(char) for char in query) + '[^\n]*')
+        starts = self._line_starts
+        rows = self._line_rows
+        matches = [rows[bisect_right(starts, m.start()) - 1] for m in pattern.finditer(self._haystack)]
+        if self._multiline:
+            pattern = re.compile('.*?'.join(map(re.escape, query)), re.DOTALL)
+            matches.extend(row for row in self._multiline if pattern.search(self.folded[row]))
+            matches.sort()
+        return matches
+    
+    def rank(self, query: str, candidates: Sequence[int],
+             budget_ms: float = SEARCH_BUDGET_MS) -> Tuple[List[int], int]:
+        """
+        Rank matching rows by fuzzy score, best first
+        
+        Scoring stops once ``budget_ms`` is spent; rows not scored by then
+        still match (they passed the subsequence test) and follow the
+        ranked ones in their original order.
+        
+        Args:
+            query: Lowercased query (non-empty)
+            candidates: Rows from candidates(query)
+            budget_ms: Time allowed for scoring
+        
+        Returns:
+            (ranked rows, number of candidates scored before the budget ran out)
+        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        folded = self.folded
+        scored = []
+        done = len(candidates)
+        for n, row in enumerate(candidates):
+            if (n & 63) == 0 and time.perf_counter() > deadline:
+                done = n
+                break
+            score = fuzzy_score(folded[row], query, self.bonuses(row))
+            if score is None:
+                continue  # Not a match after all (a prefilter false positive)
+            # Best score first, then shorter names, then original position
+            scored.append((-score, len(folded[row]), n, row))
+        scored.sort()
+        
+        ranked = [row for _, _, _, row in scored]
+        ranked.extend(candidates[done:])
+        return ranked, done
+
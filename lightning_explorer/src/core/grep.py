@@ -0,0 +1,256 @@
+"""
+Content search for Lightning Explorer
+Parallel grep over a directory tree using a process pool and mmap reads
+"""
+import mmap
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+GREP_WORKERS = max(2, min(8, os.cpu_count() or 2))
+GREP_BATCH_FILES = 64              # Files per task, so cancelling is quick
+GREP_BATCH_BYTES = 16 * 1024 * 1024
+GREP_MAX_RESULTS = 5000            # Stop after this many matching files
+GREP_BINARY_PROBE = 8192           # A NUL byte in this prefix marks a binary file
+GREP_LINE_CHARS = 200              # Matched line is trimmed to this for display
+GREP_COUNT_CHUNK = 1024 * 1024     # Bytes copied at a time to count lines
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def grep_pool() -> ProcessPoolExecutor:
+    """
+    Worker processes shared by every GrepJob (started on first use)
+    
+    Uses 'spawn' so workers never inherit a forked copy of the UI's
+    threads and Tk state; they import only this module.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=GREP_WORKERS,
+                                    mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def _reset_pool():
+    """Forget a pool whose worker died; the next job starts a new one"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+class GrepJob:
+    """
+    Background search for files under root whose contents contain a string
+    
+    A walker thread lists the tree (skipping hidden directories and not
+    following symlinks) and hands batches of files to the process pool.
+    Each worker memory-maps a file, skips it if it looks binary, and
+    reports the first matching line. Results stream back through a queue
+    as batches finish; poll() them from an after() loop.
+    
+    The match is a plain substring, case-insensitive unless the query
+    contains an uppercase letter (smart case; ASCII folding only).
+    """
+    
+    def __init__(self, root: Path, query: str, max_results: int = GREP_MAX_RESULTS):
+        self.root = root
+        self.query = query
+        self.ignore_case = query == query.lower()
+        self.max_results = max_results
+        self.files_listed = 0
+        self.files_searched = 0
+        self.matches = 0
+        self.errors = 0
+        self.truncated = False  # Stopped at max_results
+        self.elapsed_ms = 0.0
+        self.done = False
+        self._results = queue.Queue()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._outstanding = 0  # Batches submitted and not yet finished
+        self._futures = set()
+        self._walked = False
+        self._start_time = 0.0
+        self._thread = threading.Thread(target=self._walk, name="grep", daemon=True)
+    
+    def start(self) -> 'GrepJob':
+        self._start_time = time.perf_counter()
+        self._thread.start()
+        return self
+    
+    def cancel(self):
+        """Stop listing and drop batches not started (running ones finish)"""
+        self._cancel.set()
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def poll(self) -> List[Tuple[str, int, float, int, str]]:
+        """
+        Take the matches found since the last call
+        
+        Returns:
+            List of (path relative to root, size, mtime, line number, line)
+        """
+        results = []
+        while True:
+            try:
+                results.extend(self._results.get_nowait())
+            except queue.Empty:
+                return results
+    
+    def summary(self) -> str:
+        found = f"{self.matches}{'+' if self.truncated else ''} files contain '{self.query}'"
+        if not self.done:
+            return f"Searching contents: {found} ({self.files_searched}/{self.files_listed} files read)"
+        return f"{found} ({self.files_searched} files read in {self.elapsed_ms:.0f}ms)"
+    
+    def _walk(self):
+        needle = self.query.encode('utf-8')
+        batch = []
+        batch_bytes = 0
+        stack = [str(self.root)]
+        try:
+            while stack and not self._cancel.is_set():
+                try:
+                    with os.scandir(stack.pop()) as it:
+                        for entry in it:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    if not entry.name.startswith('.'):
+                                        stack.append(entry.path)
+                                elif entry.is_file(follow_symlinks=False):
+                                    size = entry.stat(follow_symlinks=False).st_size
+                                    if size:
+                                        batch.append(entry.path)
+                                        batch_bytes += size
+                            except OSError:
+                                self.errors += 1
+                except OSError:
+                    self.errors += 1
+                if len(batch) >= GREP_BATCH_FILES or batch_bytes >= GREP_BATCH_BYTES:
+                    self._submit(batch, needle)
+                    batch = []
+                    batch_bytes = 0
+            if batch and not self._cancel.is_set():
+                self._submit(batch, needle)
+        finally:
+            with self._lock:
+                self._walked = True
+                self._check_done()
+    
+    def _submit(self, paths: List[str], needle: bytes):
+        try:
+            future = grep_pool().submit(_grep_batch, paths, needle, self.ignore_case)
+        except BrokenProcessPool:
+            _reset_pool()
+            future = grep_pool().submit(_grep_batch, paths, needle, self.ignore_case)
+        self.files_listed += len(paths)
+        with self._lock:
+            self._outstanding += 1
+            self._futures.add(future)
+        future.add_done_callback(lambda done: self._collect(done, len(paths)))
+    
+    def _collect(self, future, count: int):
+        """Fold a finished batch in (runs on the pool's callback thread)"""
+        try:
+            if future.cancelled() or self._cancel.is_set():
+                return
+            try:
+                found, errors = future.result()
+            except BrokenProcessPool:
+                _reset_pool()
+                self.errors += count
+                return
+            self.files_searched += count
+            self.errors += errors
+            if found:
+                root = str(self.root)
+                found = [(os.path.relpath(match[0], root),) + match[1:] for match in found]
+                room = self.max_results - self.matches
+                if len(found) > room:
+                    found = found[:room]
+                    self.truncated = True
+                    self.cancel()
+                if found:
+                    self.matches += len(found)
+                    self._results.put(found)
+        finally:
+            with self._lock:
+                self._futures.discard(future)
+                self._outstanding -= 1
+                self._check_done()
+    
+    def _check_done(self):
+        """Mark the job finished once listing and every batch are done (lock held)"""
+        if self._walked and self._outstanding == 0 and not self.done:
+            self.elapsed_ms = (time.perf_counter() - self._start_time) * 1000
+            self.done = True
+
+
+def _count_lines(mm: mmap.mmap, start: int, end: int) -> int:
+    """
+    Newlines in mm[start:end]
+    
+    Counted a GREP_COUNT_CHUNK at a time, so a match deep in a big file
+    never copies everything before it.
+    """
+    count = 0
+    for pos in range(start, end, GREP_COUNT_CHUNK):
+        count += mm[pos:min(pos + GREP_COUNT_CHUNK, end)].count(b'\n')
+    return count
+
+
+def _grep_batch(paths: List[str], needle: bytes, ignore_case: bool) -> tuple:
+    """
+    Search a batch of files (runs in a worker process)
+    
+    Returns:
+        ([(path, size, mtime, line number, line), ...], error count)
+    """
+    pattern = re.compile(re.escape(needle), re.IGNORECASE) if ignore_case else None
+    found = []
+    errors = 0
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if not st.st_size:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(b'\0', 0, GREP_BINARY_PROBE) >= 0:
+                        continue  # Binary file
+                    if pattern is not None:
+                        match = pattern.search(mm)
+                        pos = match.start() if match else -1
+                    else:
+                        pos = mm.find(needle)
+                    if pos < 0:
+                        continue
+                    start = mm.rfind(b'\n', 0, pos) + 1
+                    end = mm.find(b'\n', pos)
+                    if end < 0:
+                        end = len(mm)
+                    line_no = _count_lines(mm, 0, start) + 1
+                    line = mm[start:min(end, start + GREP_LINE_CHARS * 4)]
+        except (OSError, ValueError):
+            errors += 1
+            continue
+        text = line.decode('utf-8', 'replace').strip()[:GREP_LINE_CHARS]
+        found.append((path, st.st_size, st.st_mtime, line_no, text))
+    return found, errors
@@ -0,0 +1,577 @@
+"""
+Recursive filename index for Lightning Explorer
+Parallel tree walk, compact memory-mapped on-disk index, global search
+"""
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.file_scanner import FLAG_DIR, Listing, probe_dir_entry, probe_path
+from core.fuzzy import SEARCH_BUDGET_MS, folded_bonuses, fuzzy_score
+from core.paths import index_dir
+from core.trigram import TrigramIndex
+
+
+INDEX_MAGIC = b'LEIDX001'
+# magic, entry count, names length, folded length, root length, built-at
+INDEX_HEADER = struct.Struct('<8sQQQQd')
+INDEX_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+SEARCH_RESULT_LIMIT = 2000
+INDEX_MAX_AGE = 3600  # seconds before a loaded index is rebuilt in the background
+INDEX_PATCH_MAX_ROWS = 10000  # Bigger changes (a large folder moved in) are re-indexed
+
+
+def index_path_for(root: Path) -> Path:
+    """Index file location for a root directory"""
+    import hashlib  # Deferred: only global search needs it
+    digest = hashlib.sha1(str(root).encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    return index_dir() / f"index-{digest}.lei"
+
+
+def trigram_path_for(index_file: Path) -> Path:
+    """Sidecar file holding an index's trigram posting lists"""
+    return index_file.with_suffix('.tri')
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class TreeIndex:
+    """
+    Columnar index of every entry under a root directory
+    
+    Row 0 is the root itself; every other row stores its parent's row
+    number, so full paths are rebuilt by walking up. Names are kept as one
+    NUL-separated string (plus a lowercased copy for searching) with char
+    offsets per row instead of one Python str per entry.
+    
+    Indexes loaded from disk keep their numeric columns as zero-copy
+    memoryviews over an mmap; the name blobs are decoded on first search.
+    
+    apply_changes() patches a built or loaded index in memory: new rows
+    are appended (their names kept outside the blobs), removed rows are
+    tombstoned. The saved file is only replaced by the next walk.
+    """
+    
+    def __init__(self, root: Path):
+        self.root = root
+        self.parents = array('i')
+        self.flags = array('B')
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.built_at = 0.0
+        self._names: List[str] = []
+        self._names_blob: Optional[str] = None
+        self._name_offsets = array('I')
+        self._folded_blob: Optional[str] = None
+        self._folded_offsets = array('I')
+        self._mmap: Optional[mmap.mmap] = None
+        self._raw_names = None
+        self._raw_folded = None
+        self.trigrams: Optional[TrigramIndex] = None
+        self.removed = set()  # Tombstoned rows (deleted since the walk)
+        self._added_names: List[str] = []  # Rows appended after freezing
+        self._added_folded: List[str] = []
+        self._child_rows: Dict[int, Dict[str, int]] = {}  # Directory row -> {name: row}
+    
+    def __len__(self):
+        return len(self.parents)
+    
+    # Building
+    
+    def append(self, parent: int, name: str, flags: int, size: int, modified: float) -> int:
+        row = len(self.parents)
+        self.parents.append(parent)
+        self._names.append(name)
+        self.flags.append(flags)
+        self.sizes.append(size)
+        self.mtimes.append(modified)
+        return row
+    
+    def _freeze(self):
+        """Pack appended names into the blob/offset form used for search"""
+        if self._names_blob is not None:
+            return
+        if self._raw_names is not None:
+            self._names_blob = bytes(self._raw_names).decode('utf-8', 'surrogateescape')
+            self._folded_blob = bytes(self._raw_folded).decode('utf-8', 'surrogateescape')
+            self._raw_names = self._raw_folded = None
+            return
+        
+        names = self._names
+        folded = [name.lower() for name in names]
+        self._names_blob = '\0'.join(names) + '\0'
+        self._folded_blob = '\0'.join(folded) + '\0'
+        self._name_offsets = _offsets(names)
+        self._folded_offsets = _offsets(folded)
+        self._names = []
+    
+    # Accessors
+    
+    def name(self, row: int) -> str:
+        self._freeze()
+        offsets = self._name_offsets
+        if row >= len(offsets) - 1:
+            return self._added_names[row - len(offsets) + 1]
+        return self._names_blob[offsets[row]:offsets[row + 1] - 1]
+    
+    def folded_name(self, row: int) -> str:
+        self._freeze()
+        offsets = self._folded_offsets
+        if row >= len(offsets) - 1:
+            return self._added_folded[row - len(offsets) + 1]
+        return self._folded_blob[offsets[row]:offsets[row + 1] - 1]
+    
+    def build_trigrams(self) -> TrigramIndex:
+        """Index every name's trigrams (slow for big trees - run off the UI thread)"""
+        self._freeze()
+        blob = self._folded_blob
+        offsets = self._folded_offsets
+        index = TrigramIndex.build(blob[offsets[row]:offsets[row + 1] - 1] for row in range(len(self)))
+        self.trigrams = index
+        return index
+    
+    def relative_path(self, row: int) -> str:
+        """Path of a row relative to the root"""
+        parts = []
+        parents = self.parents
+        while row > 0:
+            parts.append(self.name(row))
+            row = parents[row]
+        return os.sep.join(reversed(parts))
+    
+    # Incremental updates
+    
+    def apply_changes(self, directory: Path,
+                      names: Optional[Iterable[str]] = None) -> Optional[Tuple[int, int]]:
+        """
+        Patch the index for names reported by a DirectoryWatcher
+        
+        Each name is re-probed: entries that disappeared are tombstoned
+        along with everything under them, new ones are appended (a new
+        folder's contents are walked) and changed ones updated in place,
+        trigram posting lists included.
+        
+        Args:
+            directory: Directory the names are in; ignored unless indexed
+            names: Changed names, or None to resync every name in directory
+                (the watcher lost track)
+        
+        Returns:
+            (added, removed) row counts, or None if more than
+            INDEX_PATCH_MAX_ROWS rows were added (re-index instead)
+        """
+        directory = Path(directory)
+        parent = self.dir_row(directory)
+        if parent is None:
+            return 0, 0
+        children = self._children(parent)
+        if names is None:
+            try:
+                names = set(os.listdir(directory)) | set(children)
+            except OSError:
+                names = set(children)
+        
+        added = removed = 0
+        for name in names:
+            info = probe_path(directory / name)
+            row = children.get(name)
+            if row is not None:
+                if info is not None and (info[0] & FLAG_DIR) == (self.flags[row] & FLAG_DIR):
+                    self.flags[row], self.sizes[row], self.mtimes[row] = info
+                    continue
+                removed += self._remove(row)
+                del children[name]
+            if info is not None:
+                added += self._add_tree(parent, directory / name, info,
+                                        INDEX_PATCH_MAX_ROWS - added)
+                if added > INDEX_PATCH_MAX_ROWS:
+                    return None
+        return added, removed
+    
+    def dir_row(self, directory: Path) -> Optional[int]:
+        """Row of a directory under the root (None if outside it or not indexed)"""
+        try:
+            parts = directory.relative_to(self.root).parts
+        except ValueError:
+            return None
+        row = 0
+        for part in parts:
+            row = self._children(row).get(part)
+            if row is None or not self.flags[row] & FLAG_DIR:
+                return None
+        return row
+    
+    def _children(self, parent: int) -> Dict[str, int]:
+        """{name: row} of a directory's live entries (found once, then kept up to date)"""
+        children = self._child_rows.get(parent)
+        if children is not None:
+            return children
+        self._freeze()
+        self._thaw()
+        parents = self.parents
+        walked = len(self._name_offsets) - 1
+        try:
+            row = parents.index(parent)
+        except ValueError:
+            row = walked
+        # The walk appends each directory's entries together
+        rows = []
+        while row < walked and parents[row] == parent:
+            rows.append(row)
+            row += 1
+        rows.extend(row for row in range(walked, len(parents)) if parents[row] == parent)
+        children = {self.name(row): row for row in rows if row not in self.removed}
+        self._child_rows[parent] = children
+        return children
+    
+    def _thaw(self):
+        """Copy mapped columns into arrays, so rows can be added and changed"""
+        if not isinstance(self.parents, memoryview):
+            return
+        columns = []
+        for typecode, view in (('i', self.parents), ('B', self.flags),
+                               ('q', self.sizes), ('d', self.mtimes)):
+            column = array(typecode)
+            column.frombytes(view.cast('B'))
+            columns.append(column)
+        self.parents, self.flags, self.sizes, self.mtimes = columns
+    
+    def _add(self, parent: int, name: str, flags: int, size: int, modified: float) -> int:
+        """Append a row to a frozen index (see append() for building)"""
+        row = len(self.parents)
+        folded = name.lower()
+        self.parents.append(parent)
+        self.flags.append(flags)
+        self.sizes.append(size)
+        self.mtimes.append(modified)
+        self._added_names.append(name)
+        self._added_folded.append(folded)
+        if self.trigrams is not None:
+            self.trigrams.add(row, folded)
+        children = self._child_rows.get(parent)
+        if children is not None:
+            children[name] = row
+        return row
+    
+    def _add_tree(self, parent: int, path: Path, info: tuple, limit: int) -> int:
+        """Add path, and everything under it if it is a folder; stops past limit rows"""
+        row = self._add(parent, path.name, *info)
+        added = 1
+        if not info[0] & FLAG_DIR or path.is_symlink():
+            return added  # Directory symlinks are never followed, as in the walk
+        stack = [(row, str(path))]
+        while stack and added <= limit:
+            parent, parent_path = stack.pop()
+            for name, flags, size, modified, recurse in _list_dir(parent_path):
+                row = self._add(parent, name, flags, size, modified)
+                added += 1
+                if recurse:
+                    stack.append((row, os.path.join(parent_path, name)))
+        return added
+    
+    def _remove(self, row: int) -> int:
+        """Tombstone a row and everything under it; returns the rows removed"""
+        dead = {row}
+        if self.flags[row] & FLAG_DIR and self._children(row):
+            # Rows always come after their directory's (walked or added),
+            # so one forward pass finds every descendant
+            parents = self.parents
+            for child in range(row + 1, len(parents)):
+                if parents[child] in dead:
+                    dead.add(child)
+        dead -= self.removed
+        self.removed |= dead
+        for gone in dead:
+            self._child_rows.pop(gone, None)
+            if self.trigrams is not None:
+                self.trigrams.remove(gone)
+        return len(dead)
+    
+    # Persistence
+    
+    def save(self, path: Path):
+        """Write the index atomically (to a temp file, then replace)"""
+        self._freeze()
+        names = self._names_blob.encode('utf-8', 'surrogateescape')
+        folded = self._folded_blob.encode('utf-8', 'surrogateescape')
+        root = str(self.root).encode('utf-8', 'surrogateescape')
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(self), len(names), len(folded), len(root), self.built_at))
+            for chunk in (root, bytes(self.parents), bytes(self.flags), bytes(self.sizes),
+                          bytes(self.mtimes), bytes(self._name_offsets), bytes(self._folded_offsets),
+                          names, folded):
+                f.write(chunk)
+                f.write(b'\0' * (_pad8(len(chunk)) - len(chunk)))
+        os.replace(tmp, path)
+        if self.trigrams is not None:
+            self.trigrams.save(trigram_path_for(path), stamp=self.built_at)
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional['TreeIndex']:
+        """
+        Memory-map an index file
+        
+        Returns:
+            TreeIndex, or None if the file is missing or not a valid index
+        """
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        
+        try:
+            magic, count, names_len, folded_len, root_len, built_at = INDEX_HEADER.unpack_from(mm, 0)
+        except struct.error:
+            mm.close()
+            return None
+        if magic != INDEX_MAGIC:
+            mm.close()
+            return None
+        
+        view = memoryview(mm)
+        offset = INDEX_HEADER.size
+        
+        def take(length):
+            nonlocal offset
+            chunk = view[offset:offset + length]
+            offset += _pad8(length)
+            return chunk
+        
+        index = cls(Path(bytes(take(root_len)).decode('utf-8', 'surrogateescape')))
+        index.parents = take(count * 4).cast('i')
+        index.flags = take(count)
+        index.sizes = take(count * 8).cast('q')
+        index.mtimes = take(count * 8).cast('d')
+        index._name_offsets = take((count + 1) * 4).cast('I')
+        index._folded_offsets = take((count + 1) * 4).cast('I')
+        index._raw_names = take(names_len)
+        index._raw_folded = take(folded_len)
+        index.built_at = built_at
+        index._mmap = mm
+        index.trigrams = TrigramIndex.load(trigram_path_for(path), count, stamp=built_at)
+        return index
+    
+    def close(self):
+        """Release the memory map (the index must not be used afterwards)"""
+        if self._mmap is None:
+            return
+        if self.trigrams is not None:
+            self.trigrams.close()
+        self.parents = self.flags = self.sizes = self.mtimes = None
+        self._name_offsets = self._folded_offsets = None
+        self._raw_names = self._raw_folded = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # A view is still alive somewhere; let GC unmap it
+        self._mmap = None
+    
+    # Searching
+    
+    def candidates(self, query: str) -> List[int]:
+        """
+        Rows whose name matches ``query`` (lowercased), in row order
+        
+        A leading ``'`` means exact substring match (as in fzf), answered
+        from the trigram posting lists when available; otherwise the query
+        characters must appear in order.
+        """
+        self._freeze()
+        haystack = self._folded_blob
+        starts = self._folded_offsets
+        
+        if query.startswith("'"):
+            needle = query[1:]
+            if not needle:
+                return []
+            if self.trigrams is not None:
+                rows = self.trigrams.lookup(needle, self.folded_name)
+                if rows is not None:
+                    return [row for row in rows if row > 0]  # Tombstones already dropped
+            rows = []
+            pos = haystack.find(needle)
+            while pos >= 0:
+                row = bisect_right(starts, pos) - 1
+                rows.append(row)
+                # Skip to the next name so each row is reported once
+                pos = haystack.find(needle, starts[row + 1])
+            rows.extend(self._added_matching(lambda folded: needle in folded))
+            return self._live(rows)
+        
+        gap = '[^\0]*?'
+        pattern = re.compile(gap.join(re.escape(char) for char in query) + '[^\0]*')
+        rows = [bisect_right(starts, m.start()) - 1 for m in pattern.finditer(haystack)]
+        rows.extend(self._added_matching(pattern.search))
+        return self._live(rows)
+    
+    def _added_matching(self, match) -> List[int]:
+        """Rows appended by apply_changes() whose lowercased name match() accepts"""
+        first = len(self._folded_offsets) - 1
+        return [first + i for i, folded in enumerate(self._added_folded) if match(folded)]
+    
+    def _live(self, rows: List[int]) -> List[int]:
+        """rows without the root and tombstoned rows"""
+        removed = self.removed
+        return [row for row in rows if row > 0 and row not in removed]
+    
+    def search(self, query: str, limit: int = SEARCH_RESULT_LIMIT,
+               budget_ms: float = SEARCH_BUDGET_MS) -> Listing:
+        """
+        Search every name under the root
+        
+        Args:
+            query: Search string (prefix with ' for exact substring)
+            limit: Maximum number of results
+            budget_ms: Time allowed for ranking
+        
+        Returns:
+            Listing rooted at the index root whose names are relative paths
+        """
+        query = query.lower()
+        results = Listing(self.root)
+        if not query:
+            return results
+        
+        candidates = self.candidates(query)
+        ranked = self.rank(query.lstrip("'"), candidates, budget_ms)
+        
+        for row in ranked[:limit]:
+            results.append(self.relative_path(row), self.flags[row], self.sizes[row], self.mtimes[row])
+        return results
+    
+    def rank(self, query: str, candidates: List[int], budget_ms: float) -> List[int]:
+        """Order candidates by fuzzy score of their name, within a time budget"""
+        deadline = time.perf_counter() + budget_ms / 1000
+        scored = []
+        for n, row in enumerate(candidates):
+            if (n & 63) == 0 and time.perf_counter() > deadline:
+                break
+            folded = self.folded_name(row)
+            score = fuzzy_score(folded, query, folded_bonuses(self.name(row), folded)) or 0
+            scored.append((-score, len(folded), n, row))
+        scored.sort()
+        
+        ranked = [row for _, _, _, row in scored]
+        ranked.extend(candidates[len(scored):])
+        return ranked
+
+
+def _offsets(names: List[str]) -> array:
+    """Char offset of each name in a NUL-joined blob, plus the end offset"""
+    offsets = array('I', [0])
+    total = 0
+    for name in names:
+        total += len(name) + 1
+        offsets.append(total)
+    return offsets
+
+
+def _list_dir(path: str) -> list:
+    """Worker task: (name, flags, size, mtime, recurse) for one directory"""
+    entries = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                flags, size, modified = probe_dir_entry(entry, True, None)
+                try:
+                    # Never follow directory symlinks (cycles, duplicates)
+                    recurse = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    recurse = False
+                entries.append((entry.name, flags, size, modified, recurse))
+    except OSError:
+        pass  # Unreadable directory: index it as empty
+    return entries
+
+
+class TreeIndexer:
+    """
+    Builds a TreeIndex on background threads
+    
+    A coordinator thread hands one directory per task to a thread pool
+    (scandir/stat release the GIL, so the walk overlaps I/O), assigns row
+    numbers as listings come back and saves the finished index to disk.
+    """
+    
+    def __init__(self, root: Path, index_file: Optional[Path] = None,
+                 workers: int = INDEX_WORKERS):
+        self.root = Path(root)
+        self.index_file = index_file or index_path_for(self.root)
+        self.workers = workers
+        self.index: Optional[TreeIndex] = None
+        self.error: Optional[Exception] = None
+        self.dirs_scanned = 0
+        self.elapsed_ms = 0.0
+        self.done = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"index:{root}", daemon=True)
+    
+    def start(self) -> 'TreeIndexer':
+        self._thread.start()
+        return self
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+    
+    def build(self) -> Optional[TreeIndex]:
+        """Walk the root and return the index (None if cancelled)"""
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+        start = time.perf_counter()
+        index = TreeIndex(self.root)
+        index.append(-1, str(self.root), FLAG_DIR, 0, 0.0)
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='index') as pool:
+            pending = {pool.submit(_list_dir, str(self.root)): (0, str(self.root))}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                if self._cancel.is_set():
+                    for future in pending:
+                        future.cancel()
+                    return None
+                for future in finished:
+                    parent, parent_path = pending.pop(future)
+                    self.dirs_scanned += 1
+                    for name, flags, size, modified, recurse in future.result():
+                        row = index.append(parent, name, flags, size, modified)
+                        if recurse:
+                            child_path = os.path.join(parent_path, name)
+                            pending[pool.submit(_list_dir, child_path)] = (row, child_path)
+        
+        index.built_at = time.time()
+        index.build_trigrams()
+        self.elapsed_ms = (time.perf_counter() - start) * 1000
+        return index
+    
+    def _run(self):
+        try:
+            index = self.build()
+            self.index = index
+            if index is not None:
+                index.save(self.index_file)
+        except OSError as e:
+            # e.g. the old index file is still mapped (Windows); the
+            # in-memory index is usable either way
+            self.error = e
+        finally:
+            self.done = True
@@ -0,0 +1,16 @@
+"""
+Per-user file locations for Lightning Explorer
+Kept apart from the indexer so startup code can find its files cheaply
+"""
+import os
+import sys
+from pathlib import Path
+
+
+def index_dir() -> Path:
+    """Per-user cache directory for index files"""
+    if sys.platform == 'win32':
+        base = Path(os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local'))
+    else:
+        base = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'))
+    return base / 'lightning_explorer'
@@ -0,0 +1,121 @@
+"""
+Performance instrumentation for Lightning Explorer
+Timing spans and counters for the hot paths, kept in a ring buffer
+"""
+import functools
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+PERF_RING_SIZE = 4096  # Spans kept for dump(); older ones are dropped
+PERF_OVERLAY_SPANS = ('scan', 'search', 'redraw', 'hint_key', 'preview')
+PERF_OVERLAY_COUNTERS = ('entries', 'syscalls', 'redraws')
+
+
+class _Span:
+    """Context manager recording one span on exit"""
+    
+    __slots__ = ('recorder', 'name', 'start')
+    
+    def __init__(self, recorder: 'PerfRecorder', name: str):
+        self.recorder = recorder
+        self.name = name
+        self.start = 0
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *exc):
+        self.recorder.record(self.name, self.start)
+        return False
+
+
+class PerfRecorder:
+    """
+    Hot-path spans and counters
+    
+    A span is (name, start, duration, thread) in perf_counter_ns() units,
+    appended to a fixed-size ring so recording costs the same however long
+    the app runs. ``last`` keeps the latest duration per name for the
+    status bar overlay; dump() writes the ring as a Chrome trace
+    (chrome://tracing, Perfetto) for offline profiling.
+    
+    Recording is cheap enough to leave on (one clock read and a deque
+    append per span); set ``enabled`` to False to skip it entirely.
+    """
+    
+    def __init__(self, size: int = PERF_RING_SIZE):
+        self.enabled = True
+        self.spans = deque(maxlen=size)  # deque.append is thread-safe
+        self.last: Dict[str, int] = {}  # Span name -> latest duration (ns)
+        self.counters: Dict[str, int] = {}
+    
+    def record(self, name: str, start_ns: int, end_ns: Optional[int] = None):
+        """Record a span that started at start_ns (ends now by default)"""
+        if not self.enabled:
+            return
+        if end_ns is None:
+            end_ns = time.perf_counter_ns()
+        duration = end_ns - start_ns
+        self.spans.append((name, start_ns, duration, threading.get_ident()))
+        self.last[name] = duration
+    
+    def span(self, name: str) -> _Span:
+        """``with perf.span('name'):`` times the block"""
+        return _Span(self, name)
+    
+    def timed(self, name: str) -> Callable:
+        """Decorator recording a span around every call"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, start)
+            return wrapper
+        return decorate
+    
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+    
+    def overlay(self) -> str:
+        """Latest span latencies and running counters, for the status bar"""
+        parts = [f"{name} {self.last[name] / 1e6:.1f}ms"
+                 for name in PERF_OVERLAY_SPANS if name in self.last]
+        parts.extend(f"{self.counters.get(name, 0)} {name}" for name in PERF_OVERLAY_COUNTERS)
+        return "⏱ " + ", ".join(parts)
+    
+    def dump(self, path: Path) -> int:
+        """
+        Write the ring buffer as a Chrome trace JSON file
+        
+        Returns:
+            Number of spans written
+        """
+        import json  # Only needed here, not at startup
+        spans = list(self.spans)
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': start / 1000, 'dur': duration / 1000}
+                  for name, start, duration, tid in spans]
+        trace = {'traceEvents': events, 'otherData': {'counters': dict(self.counters)}}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(trace))
+        return len(spans)
+    
+    def clear(self):
+        self.spans.clear()
+        self.last.clear()
+        self.counters.clear()
+
+
+# Shared by every module, so one overlay and one dump cover the whole app
+perf = PerfRecorder()
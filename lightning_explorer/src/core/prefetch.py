@@ -0,0 +1,150 @@
+"""
+Prefetcher for Lightning Explorer
+Scans likely next directories in idle time so entering them is a cache hit
+"""
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.file_scanner import Listing, ListingCache, directory_mtime
+
+
+PREFETCH_LIMIT = 8           # Directories queued per idle period
+PREFETCH_MAX_ENTRIES = 20000  # Give up on (don't cache) directories bigger than this
+PREFETCH_NICE = 10           # Worker thread niceness where supported (Linux)
+
+
+class Prefetcher:
+    """
+    Background scanner that fills a ListingCache ahead of navigation
+    
+    A single low-priority worker thread scans queued directories one at a
+    time, so at most one directory's worth of I/O competes with the
+    foreground. Finished listings are handed back through a queue and put
+    into the cache by poll(), on the thread that owns the cache.
+    """
+    
+    def __init__(self, cache: ListingCache, with_stat: bool = True):
+        self.cache = cache
+        self.with_stat = with_stat
+        self.visits: Dict[Path, int] = {}  # Directory -> times entered
+        self.sort_mode = 'name'  # Order listings are cached in (the scanner's)
+        self._pending = []  # Paths still to scan, next first
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._cancel = threading.Event()  # Aborts the scan in flight
+        self._results = queue.Queue()
+        self._in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+    
+    def note_visit(self, path: Path):
+        """Record that the user entered path (ranks it higher next time)"""
+        self.visits[path] = self.visits.get(path, 0) + 1
+    
+    def rank(self, candidates: Iterable[Path], limit: int = PREFETCH_LIMIT) -> List[Path]:
+        """
+        Order candidates by how often they were entered before
+        
+        Ties keep the given order (e.g. hint matches, then visible rows).
+        Directories already cached are skipped.
+        """
+        seen = set()
+        paths = []
+        for path in candidates:
+            if path not in seen and path not in self.cache:
+                seen.add(path)
+                paths.append(path)
+        paths.sort(key=lambda path: -self.visits.get(path, 0))
+        return paths[:limit]
+    
+    def request(self, paths: List[Path], sort_mode: str = 'name'):
+        """
+        Replace the pending queue with paths (most likely first)
+        
+        Listings are sorted by sort_mode, the scanner's, so entering a
+        prefetched directory needs no re-sort.
+        """
+        with self._lock:
+            self._pending = list(paths)
+            self.sort_mode = sort_mode
+        self._cancel.clear()
+        if paths:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+            self._wakeup.set()
+    
+    def cancel(self):
+        """Drop pending work and abort the scan in flight (e.g. on navigation)"""
+        with self._lock:
+            self._pending = []
+        self._cancel.set()
+    
+    @property
+    def busy(self) -> bool:
+        """True while work is queued, running, or waiting for poll()"""
+        return bool(self._pending) or self._in_flight > 0 or not self._results.empty()
+    
+    def poll(self) -> int:
+        """
+        Move finished listings into the cache (call from the owning thread)
+        
+        Returns:
+            Number of listings cached
+        """
+        cached = 0
+        while True:
+            try:
+                path, listing, mtime_ns, started_at = self._results.get_nowait()
+            except queue.Empty:
+                return cached
+            if path not in self.cache:  # A foreground scan may have been faster
+                self.cache.put(path, listing, self.with_stat, mtime_ns, started_at)
+                cached += path in self.cache
+    
+    def _next(self) -> Optional[Path]:
+        with self._lock:
+            if self._pending:
+                self._in_flight += 1
+                return self._pending.pop(0)
+        return None
+    
+    def _run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREFETCH_NICE)
+        except (AttributeError, OSError):
+            pass  # Per-thread priority is a Linux-only nicety
+        
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while True:
+                path = self._next()
+                if path is None:
+                    break
+                try:
+                    result = self._scan(path)
+                    if result is not None:
+                        self._results.put(result)
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+    
+    def _scan(self, path: Path) -> Optional[tuple]:
+        """Scan and sort one directory; None if cancelled, too big or unreadable"""
+        started_at = time.time()
+        listing = Listing(path)
+        try:
+            mtime_ns = directory_mtime(path)
+            with os.scandir(path) as it:
+                for entry in it:
+                    if self._cancel.is_set() or len(listing.names) >= PREFETCH_MAX_ENTRIES:
+                        return None
+                    listing.append_dir_entry(entry, self.with_stat)
+        except OSError:
+            return None
+        listing.sort(self.sort_mode)
+        return path, listing, mtime_ns, started_at
@@ -0,0 +1,265 @@
+"""
+File preview for Lightning Explorer
+Head of text files and image dimensions, read on a worker thread and cached
+"""
+import mmap
+import os
+import queue
+import stat
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from core.file_scanner import format_size
+from core.perf import perf
+
+
+PREVIEW_MAX_BYTES = 64 * 1024   # Head of the file read for a preview
+PREVIEW_MAX_LINES = 200
+PREVIEW_LINE_CHARS = 240        # Longer lines are cut (minified files)
+PREVIEW_BINARY_PROBE = 8192     # A NUL byte in this prefix marks a binary file
+PREVIEW_HEX_BYTES = 256         # Shown as a hex dump for binary files
+
+# Preview cache bounds (whichever is reached first evicts)
+PREVIEW_CACHE_BYTES = 16 * 1024 * 1024
+PREVIEW_CACHE_ENTRIES = 256
+
+# SOF markers carry the frame size; the other C-range markers do not
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class Preview:
+    """What the preview pane shows for one file: a summary line and a body"""
+    
+    __slots__ = ('path', 'modified', 'kind', 'title', 'text')
+    
+    def __init__(self, path: Path, modified: float, kind: str, title: str, text: str = ''):
+        self.path = path
+        self.modified = modified  # File mtime when read (0.0 if it could not be)
+        self.kind = kind  # 'text', 'image', 'binary', 'empty', 'other' or 'error'
+        self.title = title
+        self.text = text
+    
+    def memory_size(self) -> int:
+        return sys.getsizeof(self.text) + sys.getsizeof(self.title) + 64
+    
+    def __repr__(self):
+        return f"Preview({self.path.name}, {self.kind}, {len(self.text)} chars)"
+
+
+def image_info(head: bytes) -> Optional[Tuple[str, int, int]]:
+    """(format, width, height) from an image file's first bytes, or None"""
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and len(head) >= 24:
+        width, height = struct.unpack_from('>II', head, 16)
+        return 'PNG', width, height
+    if head[:6] in (b'GIF87a', b'GIF89a') and len(head) >= 10:
+        width, height = struct.unpack_from('<HH', head, 6)
+        return 'GIF', width, height
+    if head.startswith(b'BM') and len(head) >= 26:
+        width, height = struct.unpack_from('<ii', head, 18)
+        return 'BMP', width, abs(height)  # Negative height: stored top-down
+    if head.startswith(b'RIFF') and head[8:12] == b'WEBP' and len(head) >= 30:
+        chunk = head[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack_from('<HH', head, 26)
+            return 'WebP', width & 0x3FFF, height & 0x3FFF
+        if chunk == b'VP8L':
+            bits = int.from_bytes(head[21:25], 'little')
+            return 'WebP', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X':
+            return ('WebP', int.from_bytes(head[24:27], 'little') + 1,
+                    int.from_bytes(head[27:30], 'little') + 1)
+    if head.startswith(b'\xff\xd8'):
+        # Walk the segments up to the frame header (within the head we read)
+        pos = 2
+        while pos + 9 <= len(head) and head[pos] == 0xFF:
+            marker = head[pos + 1]
+            if marker == 0xFF:
+                pos += 1  # Fill byte
+            elif marker in _JPEG_SOF:
+                height, width = struct.unpack_from('>HH', head, pos + 5)
+                return 'JPEG', width, height
+            elif 0xD0 <= marker <= 0xD9 or marker == 0x01:
+                pos += 2  # Markers without a length
+            else:
+                pos += 2 + struct.unpack_from('>H', head, pos + 2)[0]
+    return None
+
+
+def hex_dump(data: bytes) -> str:
+    """Classic 16-bytes-per-line hex and ASCII dump"""
+    lines = []
+    for offset in range(0, len(data), 16):
+        chunk = data[offset:offset + 16]
+        hexed = ' '.join(f"{b:02x}" for b in chunk)
+        text = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
+        lines.append(f"{offset:08x}  {hexed:<47}  {text}")
+    return '\n'.join(lines)
+
+
+@perf.timed('preview')
+def read_preview(path: Path, max_bytes: int = PREVIEW_MAX_BYTES) -> Preview:
+    """
+    Build the preview of one file
+    
+    Only the first max_bytes are mapped, so a preview costs the same for
+    a log file of any size. Special files (FIFOs, devices) are never
+    opened: reading them could block or have side effects.
+    """
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        return Preview(path, 0.0, 'error', f"Cannot read: {e.strerror or e}")
+    modified = st.st_mtime
+    size = format_size(st.st_size)
+    if stat.S_ISDIR(st.st_mode):
+        return Preview(path, modified, 'other', "Folder")
+    if not stat.S_ISREG(st.st_mode):
+        return Preview(path, modified, 'other', "Special file")
+    if not st.st_size:
+        return Preview(path, modified, 'empty', "Empty file")
+    
+    try:
+        with open(path, 'rb') as f:
+            length = min(st.st_size, max_bytes)
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mm:
+                head = mm[:length]
+    except (OSError, ValueError) as e:  # ValueError: file shrank to nothing
+        return Preview(path, 0.0, 'error', f"Cannot read: {getattr(e, 'strerror', None) or e}")
+    
+    image = image_info(head)
+    if image is not None:
+        kind, width, height = image
+        return Preview(path, modified, 'image', f"{kind} image, {width} × {height}, {size}")
+    if b'\0' in head[:PREVIEW_BINARY_PROBE]:
+        return Preview(path, modified, 'binary', f"Binary file, {size}",
+                       hex_dump(head[:PREVIEW_HEX_BYTES]))
+    
+    lines = head.decode('utf-8', 'replace').splitlines()
+    truncated = st.st_size > length or len(lines) > PREVIEW_MAX_LINES
+    if st.st_size > length and len(lines) > 1:
+        lines.pop()  # Probably cut mid-line (or mid-character)
+    lines = [line.expandtabs(4)[:PREVIEW_LINE_CHARS] for line in lines[:PREVIEW_MAX_LINES]]
+    shown = f"first {len(lines)} lines" if truncated else f"{len(lines)} lines"
+    title = f"Text file, {size}, {shown}"
+    return Preview(path, modified, 'text', title, '\n'.join(lines))
+
+
+class PreviewCache:
+    """
+    Recent previews by (path, mtime), least recently used evicted first
+    
+    Keyed on the modification time the listing already holds, so a lookup
+    costs no syscall; a rewritten file has a new mtime and simply misses.
+    """
+    
+    def __init__(self, max_bytes: int = PREVIEW_CACHE_BYTES,
+                 max_entries: int = PREVIEW_CACHE_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # (path, mtime) -> (preview, bytes)
+        self._entries = OrderedDict()
+    
+    def get(self, path: Path, modified: float) -> Optional[Preview]:
+        entry = self._entries.get((path, modified))
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((path, modified))
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, path: Path, modified: float, preview: Preview):
+        key = (path, modified)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        size = preview.memory_size()
+        self._entries[key] = (preview, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+    
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+class PreviewLoader:
+    """
+    Reads previews on a worker thread, one file at a time
+    
+    Only the latest request matters: asking for another file while one is
+    being read replaces the pending request, so flicking through hints
+    never queues up reads. Results come back through a queue and go into
+    the cache in poll(), on the thread that owns the cache.
+    """
+    
+    def __init__(self, cache: Optional[PreviewCache] = None):
+        self.cache = cache or PreviewCache()
+        self.wanted: Optional[Path] = None  # Latest request not yet answered
+        self._pending: Optional[Path] = None  # Next path for the worker
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._results = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+    
+    def request(self, path: Path, modified: float = 0.0) -> Optional[Preview]:
+        """
+        Preview of path straight from the cache, else queue it for the worker
+        
+        Args:
+            path: File to preview
+            modified: Its mtime as listed (0.0 if unknown: always read)
+        
+        Returns:
+            The cached preview, or None (poll() until it arrives)
+        """
+        if modified:
+            preview = self.cache.get(path, modified)
+            if preview is not None:
+                self.wanted = None
+                return preview
+        self.wanted = path
+        with self._lock:
+            self._pending = path
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="preview", daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+        return None
+    
+    def poll(self) -> Optional[Preview]:
+        """Cache finished previews; return the one for the latest request, if in"""
+        found = None
+        while True:
+            try:
+                preview = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if preview.modified:  # Errors are retried next time
+                self.cache.put(preview.path, preview.modified, preview)
+            if preview.path == self.wanted:
+                found = preview
+        if found is not None:
+            self.wanted = None
+        return found
+    
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                path, self._pending = self._pending, None
+            if path is not None:
+                self._results.put(read_preview(path))
@@ -0,0 +1,113 @@
+"""
+Startup snapshot for Lightning Explorer
+The start directory's last listing, saved on exit so the next launch paints at once
+"""
+import os
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import Optional, Tuple
+
+from core.file_scanner import (FLAG_SIZED, LISTING_CACHE_RACY_SECONDS, SORT_MODES,
+                               Listing, directory_mtime)
+from core.paths import index_dir
+
+
+SNAPSHOT_MAGIC = b'LESNAP01'
+SNAPSHOT_HEADER = struct.Struct('<qIIIBB')  # mtime_ns, rows, root/names bytes, sort mode, with_stat
+SNAPSHOT_MAX_ROWS = 100000  # Bigger directories are scanned as usual
+
+
+def snapshot_path() -> Path:
+    return index_dir() / 'snapshot.bin'
+
+
+def pack_listing(listing: Listing, with_stat: bool,
+                 max_rows: int = SNAPSHOT_MAX_ROWS) -> Optional[bytes]:
+    """
+    A complete listing as bytes, rows in display order
+    
+    None for listings over max_rows and for a directory whose mtime is
+    too recent to be trusted, as with the ListingCache. Folder aggregates
+    are dropped; they may be stale by the time the bytes are used.
+    """
+    rows = listing.order
+    if len(rows) > max_rows:
+        return None
+    mtime_ns = directory_mtime(listing.root)
+    if mtime_ns is None or mtime_ns / 1e9 > time.time() - LISTING_CACHE_RACY_SECONDS:
+        return None
+    
+    flags = array('B', (listing.flags[row] & ~FLAG_SIZED for row in rows))
+    sizes = array('q', (0 if listing.flags[row] & FLAG_SIZED else listing.sizes[row]
+                        for row in rows))
+    mtimes = array('d', (listing.mtimes[row] for row in rows))
+    root = str(listing.root).encode('utf-8', 'surrogateescape')
+    names = '\0'.join(listing.names[row] for row in rows).encode('utf-8', 'surrogateescape')
+    header = SNAPSHOT_HEADER.pack(mtime_ns, len(rows), len(root), len(names),
+                                  SORT_MODES.index(listing.sort_mode), with_stat)
+    return b''.join((SNAPSHOT_MAGIC, header, root, names,
+                     flags.tobytes(), sizes.tobytes(), mtimes.tobytes()))
+
+
+def unpack_listing(data: bytes, directory: Path,
+                   sort_mode: str = 'name') -> Optional[Tuple[Listing, bool, int]]:
+    """
+    Rebuild a pack_listing() result, if directory is unchanged since
+    
+    Returns:
+        (listing sorted by sort_mode, with_stat, directory mtime_ns), or
+        None when data is not a usable listing of directory
+    """
+    start = len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER.size
+    if not data.startswith(SNAPSHOT_MAGIC) or len(data) < start:
+        return None
+    mtime_ns, rows, root_len, names_len, mode, with_stat = SNAPSHOT_HEADER.unpack_from(
+        data, len(SNAPSHOT_MAGIC))
+    if len(data) != start + root_len + names_len + rows * 17 or mode >= len(SORT_MODES):
+        return None  # Truncated or from another format
+    root = data[start:start + root_len].decode('utf-8', 'surrogateescape')
+    if root != str(directory) or directory_mtime(directory) != mtime_ns:
+        return None  # Another directory, or it changed since
+    
+    pos = start + root_len
+    listing = Listing(directory)
+    if rows:
+        listing.names = data[pos:pos + names_len].decode('utf-8', 'surrogateescape').split('\0')
+    pos += names_len
+    listing.flags.frombytes(data[pos:pos + rows])
+    pos += rows
+    listing.sizes.frombytes(data[pos:pos + rows * 8])
+    pos += rows * 8
+    listing.mtimes.frombytes(data[pos:pos + rows * 8])
+    listing.order = array('I', range(rows))
+    listing.sort_mode = SORT_MODES[mode]
+    if listing.sort_mode != sort_mode:
+        listing.sort(sort_mode)
+    return listing, bool(with_stat), mtime_ns
+
+
+def save_snapshot(listing: Listing, with_stat: bool, path: Optional[Path] = None) -> bool:
+    """Write a listing for the next launch (False if pack_listing() declined)"""
+    data = pack_listing(listing, with_stat)
+    if data is None:
+        return False
+    path = path or snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def load_snapshot(directory: Path, sort_mode: str = 'name',
+                  path: Optional[Path] = None) -> Optional[Tuple[Listing, bool, int]]:
+    """The saved listing of directory, if any and unchanged (see unpack_listing)"""
+    try:
+        with open(path or snapshot_path(), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    return unpack_listing(data, directory, sort_mode)
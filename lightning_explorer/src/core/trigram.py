@@ -0,0 +1,205 @@
+"""
+Trigram index for Lightning Explorer
+Posting lists of rows per 3-character substring for sub-linear substring search
+"""
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+TRIGRAM_MAGIC = b'LETRI001'
+# magic, number of trigrams, keys blob length, total postings, owner stamp
+TRIGRAM_HEADER = struct.Struct('<8sQQQd')
+
+
+def trigrams(text: str) -> set:
+    """Distinct 3-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Maps every trigram to the sorted rows whose (lowercased) name contains it
+    
+    A substring query of 3+ characters is answered by intersecting the
+    posting lists of its trigrams, smallest first, then verifying the few
+    surviving rows. Rows are added in increasing order, so appends keep
+    the lists sorted; removals are tombstones filtered out at query time.
+    """
+    
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.removed = set()
+        self.rows = 0  # Rows indexed so far (row numbers 0..rows-1)
+        self._mmap: Optional[mmap.mmap] = None
+    
+    @classmethod
+    def build(cls, names: Iterable[str]) -> 'TrigramIndex':
+        """Index lowercased names for rows 0, 1, ... (lists come out sorted)"""
+        index = cls()
+        postings = index.postings
+        row = -1
+        for row, folded in enumerate(names):
+            for tri in trigrams(folded):
+                posting = postings.get(tri)
+                if posting is None:
+                    posting = postings[tri] = array('I')
+                posting.append(row)
+        index.rows = row + 1
+        return index
+    
+    def add(self, row: int, folded: str):
+        """Index a new row (row numbers must be increasing)"""
+        postings = self.postings
+        for tri in trigrams(folded):
+            posting = postings.get(tri)
+            if posting is None:
+                posting = postings[tri] = array('I')
+            elif not isinstance(posting, array):
+                copy = array('I')
+                copy.frombytes(posting.cast('B'))  # Copy-on-write off the mmap
+                posting = postings[tri] = copy
+            posting.append(row)
+        self.removed.discard(row)
+        self.rows = max(self.rows, row + 1)
+    
+    def remove(self, row: int):
+        """Drop a row from query results"""
+        self.removed.add(row)
+    
+    def candidates(self, needle: str) -> Optional[List[int]]:
+        """
+        Rows that contain every trigram of needle (a superset of the matches)
+        
+        Returns:
+            Sorted rows, or None if needle is too short to use the index
+        """
+        if len(needle) < 3:
+            return None
+        
+        lists = []
+        for tri in trigrams(needle):
+            posting = self.postings.get(tri)
+            if posting is None:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+        
+        result = list(lists[0])
+        for posting in lists[1:]:
+            if not result:
+                break
+            result = _intersect(result, posting)
+        
+        if self.removed:
+            result = [row for row in result if row not in self.removed]
+        return result
+    
+    def lookup(self, needle: str, folded_name: Callable[[int], str]) -> Optional[List[int]]:
+        """
+        Rows whose name contains needle, verified against the actual names
+        
+        Args:
+            needle: Lowercased substring to find
+            folded_name: Returns the lowercased name of a row
+        
+        Returns:
+            Sorted matching rows, or None if needle is shorter than 3 chars
+        """
+        rows = self.candidates(needle)
+        if rows is None:
+            return None
+        # Trigrams can match out of order ("abcd" vs "bcdxabc") - verify
+        return [row for row in rows if needle in folded_name(row)]
+    
+    # Persistence (sidecar file next to a TreeIndex)
+    
+    def save(self, path: Path, stamp: float = 0.0):
+        """Write to path; stamp ties the file to its owner (e.g. built_at)"""
+        keys = list(self.postings)
+        blob = '\0'.join(keys).encode('utf-8', 'surrogateescape')
+        offsets = array('Q', [0])
+        postings = array('I')
+        for key in keys:
+            posting = self.postings[key]
+            if self.removed:
+                posting = [row for row in posting if row not in self.removed]
+            postings.extend(posting)
+            offsets.append(len(postings))
+        
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(TRIGRAM_HEADER.pack(TRIGRAM_MAGIC, len(keys), len(blob), len(postings), stamp))
+            f.write(blob)
+            f.write(b'\0' * ((-len(blob)) % 8))
+            f.write(bytes(offsets))
+            f.write(bytes(postings))
+        os.replace(tmp, path)
+    
+    @classmethod
+    def load(cls, path: Path, rows: int, stamp: Optional[float] = None) -> Optional['TrigramIndex']:
+        """
+        Memory-map a saved index; posting lists stay zero-copy until modified
+        
+        Returns:
+            TrigramIndex, or None if missing, invalid or saved with another stamp
+        """
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, count, blob_len, total, saved_stamp = TRIGRAM_HEADER.unpack_from(mm, 0)
+        except struct.error:
+            mm.close()
+            return None
+        if magic != TRIGRAM_MAGIC or (stamp is not None and saved_stamp != stamp):
+            mm.close()
+            return None
+        
+        view = memoryview(mm)
+        offset = TRIGRAM_HEADER.size
+        keys = bytes(view[offset:offset + blob_len]).decode('utf-8', 'surrogateescape').split('\0') if count else []
+        offset += blob_len + (-blob_len) % 8
+        offsets = view[offset:offset + (count + 1) * 8].cast('Q')
+        offset += (count + 1) * 8
+        postings = view[offset:offset + total * 4].cast('I')
+        
+        index = cls()
+        index.postings = {key: postings[offsets[i]:offsets[i + 1]] for i, key in enumerate(keys)}
+        index.rows = rows
+        index._mmap = mm
+        return index
+    
+    def close(self):
+        if self._mmap is None:
+            return
+        self.postings = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Views still referenced; GC will unmap
+        self._mmap = None
+
+
+def _intersect(small: List[int], big) -> List[int]:
+    """Intersect sorted row lists (binary search into the bigger one)"""
+    if len(big) <= 4 * len(small):
+        big_set = set(big)
+        return [row for row in small if row in big_set]
+    
+    result = []
+    lo = 0
+    n = len(big)
+    for row in small:
+        lo = bisect_left(big, row, lo)
+        if lo == n:
+            break
+        if big[lo] == row:
+            result.append(row)
+    return result
@@ -0,0 +1,243 @@
+"""
+Directory watcher for Lightning Explorer
+Live change notification (inotify on Linux, polling elsewhere)
+"""
+import abc
+import ctypes
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Set
+
+from core.file_scanner import probe_dir_entry
+
+
+# More changed names than this between two drains -> rescan instead
+WATCH_MAX_CHANGES = 4096
+
+# Polling fallback: seconds between snapshots, stretched so that taking
+# snapshots of a huge directory never uses more than ~1/POLL_DUTY of a core
+POLL_INTERVAL = 1.0
+POLL_DUTY = 10
+
+# inotify(7) event bits
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+# Events that invalidate the whole listing rather than one name
+RESCAN_MASK = IN_DELETE_SELF | IN_MOVE_SELF | IN_Q_OVERFLOW | IN_IGNORED
+
+INOTIFY_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len (then the name)
+INOTIFY_READ_SIZE = 64 * 1024
+INOTIFY_WAKEUP = 0.5  # seconds between checks for stop()
+
+
+class DirectoryWatcher(abc.ABC):
+    """
+    Collects the names that changed in one directory
+    
+    A worker thread records changed names into a set, so a burst of events
+    for the same file (create, many writes, close) collapses into a single
+    entry. The owning thread calls drain() - e.g. from an after() loop -
+    and re-probes just those names. Subclasses provide the worker (_run).
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._changed: Set[str] = set()
+        self._rescan = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"watch:{path}", daemon=True)
+    
+    def start(self) -> 'DirectoryWatcher':
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop watching (the worker exits at its next wakeup)"""
+        self._stop.set()
+    
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+    
+    def drain(self) -> Optional[Set[str]]:
+        """
+        Take the changes recorded since the last call
+        
+        Returns:
+            Set of changed names (empty if nothing happened), or None if the
+            listing must be rescanned (too many changes, lost events, or
+            the directory itself was moved or deleted)
+        """
+        with self._lock:
+            if self._rescan:
+                self._rescan = False
+                self._changed = set()
+                return None
+            changed = self._changed
+            self._changed = set()
+        return changed
+    
+    def _record(self, names):
+        with self._lock:
+            if self._rescan:
+                return
+            self._changed.update(names)
+            if len(self._changed) > WATCH_MAX_CHANGES:
+                self._request_rescan()
+    
+    def _request_rescan(self):
+        """Flag a rescan (caller holds the lock)"""
+        self._rescan = True
+        self._changed = set()
+    
+    @abc.abstractmethod
+    def _run(self):
+        """Worker thread body: record changes until stop()"""
+
+
+class InotifyWatcher(DirectoryWatcher):
+    """Linux inotify watch on a single directory (not recursive)"""
+    
+    def __init__(self, path: Path, libc: ctypes.CDLL):
+        super().__init__(path)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f'inotify_add_watch failed for {path}')
+    
+    def _run(self):
+        fd = self._fd
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], INOTIFY_WAKEUP)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(fd, INOTIFY_READ_SIZE)
+                except BlockingIOError:
+                    continue
+                self._parse(data)
+        except OSError:
+            with self._lock:
+                self._request_rescan()
+        finally:
+            os.close(fd)
+    
+    def _parse(self, data: bytes):
+        names = set()
+        rescan = False
+        offset = 0
+        header = INOTIFY_EVENT.size
+        while offset + header <= len(data):
+            _, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += header
+            if mask & RESCAN_MASK:
+                rescan = True
+            elif length:
+                name = data[offset:offset + length].rstrip(b'\0')
+                names.add(os.fsdecode(name))
+            offset += length
+        
+        if rescan:
+            with self._lock:
+                self._request_rescan()
+        elif names:
+            self._record(names)
+
+
+class PollingWatcher(DirectoryWatcher):
+    """Portable fallback: diff periodic snapshots of the directory"""
+    
+    def __init__(self, path: Path, interval: float = POLL_INTERVAL):
+        super().__init__(path)
+        self.interval = interval
+    
+    def _snapshot(self) -> Optional[dict]:
+        try:
+            with os.scandir(self.path) as it:
+                return {entry.name: probe_dir_entry(entry, True, None) for entry in it}
+        except OSError:
+            return None
+    
+    def _run(self):
+        previous = self._snapshot()
+        while True:
+            start = time.perf_counter()
+            current = self._snapshot()
+            elapsed = time.perf_counter() - start
+            if current is None or previous is None:
+                if current is not previous:
+                    with self._lock:
+                        self._request_rescan()
+            else:
+                changed = set(current.keys() ^ previous.keys())
+                changed.update(name for name, info in current.items()
+                               if name in previous and previous[name] != info)
+                if changed:
+                    self._record(changed)
+            previous = current
+            if self._stop.wait(max(self.interval, elapsed * POLL_DUTY)):
+                return
+
+
+_libc = None
+
+
+def _inotify_libc() -> Optional[ctypes.CDLL]:
+    """libc with inotify support, or None (non-Linux, or symbols missing)"""
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith('linux'):
+            try:
+                try:
+                    libc = ctypes.CDLL('libc.so.6', use_errno=True)
+                except OSError:
+                    # Not glibc: look the C library up (slower, spawns helpers)
+                    from ctypes.util import find_library
+                    libc = ctypes.CDLL(find_library('c'), use_errno=True)
+                libc.inotify_init1  # Raises AttributeError if unavailable
+                _libc = libc
+            except (OSError, AttributeError):
+                pass
+    return _libc or None
+
+
+def watch_directory(path: Path) -> DirectoryWatcher:
+    """
+    Start watching a directory with the best available backend
+    
+    Uses inotify where available; falls back to polling when it is not
+    (other platforms, or the per-user inotify watch limit is exhausted).
+    """
+    libc = _inotify_libc()
+    if libc is not None:
+        try:
+            return InotifyWatcher(path, libc).start()
+        except OSError as e:
+            # stderr: the CLI and daemon keep stdout for their output
+            print(f"⚠️ inotify unavailable for {path} ({e}), polling instead", file=sys.stderr)
+    return PollingWatcher(path).start()
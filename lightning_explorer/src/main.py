@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 """
 Lightning Explorer - Fast keyboard-driven file explorer
-Entry point
+Entry point (with arguments, runs headless; see cli.py)
 """
+import sys
+import time
+
+STARTED_NS = time.perf_counter_ns()  # Startup time is measured from here
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from cli import main
+        sys.exit(main())
     from ui.main_window import main
-    main()
+    main(STARTED_NS)
@@ -0,0 +1,96 @@
+"""
+Hint label allocation for Lightning Explorer
+Vimium-style prefix-free labels and a prefix tree to resolve typed hints
+"""
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+
+# 'r' is reserved: typing it first opens the actions menu (r + hint)
+HINT_CHARS = 'abcdefghijklmnopqstuvwxyz'
+
+
+class HintTrie:
+    """Prefix tree node: children by character, label set on leaves"""
+    
+    __slots__ = ('children', 'label')
+    
+    def __init__(self):
+        self.children = {}
+        self.label: Optional[str] = None
+    
+    def insert(self, label: str):
+        node = self
+        for char in label:
+            node = node.children.setdefault(char, HintTrie())
+        node.label = label
+    
+    def child(self, char: str) -> Optional['HintTrie']:
+        """Follow one typed character (None if no hint continues that way)"""
+        return self.children.get(char)
+    
+    def find(self, prefix: str) -> Optional['HintTrie']:
+        """Walk a typed prefix in O(len(prefix)); None if nothing matches"""
+        node = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+    
+    @property
+    def is_leaf(self) -> bool:
+        return self.label is not None
+    
+    def labels(self) -> Iterator[str]:
+        """All complete labels at or below this node"""
+        if self.label is not None:
+            yield self.label
+        for node in self.children.values():
+            yield from node.labels()
+
+
+@lru_cache(maxsize=64)
+def hint_labels(count: int) -> Tuple[str, ...]:
+    """
+    Generate ``count`` prefix-free hint labels, shortest first
+    
+    Like Vimium: start from single characters and keep expanding a label
+    into a whole row of longer ones until there are enough. Labels are
+    expanded from the end of the alphabet, so the top rows keep the short,
+    alphabetical ones (a, b, c, ...) and later rows get e.g. za, zb, ...
+    Results are cached per count.
+    
+    Args:
+        count: Number of labels needed
+    
+    Returns:
+        Tuple of labels, sorted by length then alphabetically
+    """
+    if count <= 0:
+        return ()
+    
+    shortest = list(HINT_CHARS)
+    longer = []
+    while len(shortest) + len(longer) < count:
+        if not shortest:
+            # Every label of this length has been expanded, go one deeper
+            shortest, longer = longer, []
+        prefix = shortest.pop()
+        longer[0:0] = [prefix + char for char in HINT_CHARS]
+    
+    return tuple(sorted(shortest + longer, key=lambda label: (len(label), label))[:count])
+
+
+@lru_cache(maxsize=64)
+def hint_trie(count: int) -> HintTrie:
+    """Prefix tree over hint_labels(count) (cached, treat as read-only)"""
+    root = HintTrie()
+    for label in hint_labels(count):
+        root.insert(label)
+    return root
+
+
+def generate_hints(count):
+    """Generate hint labels like: a, b, c, ..., za, zb, ..."""
+    return list(hint_labels(count))
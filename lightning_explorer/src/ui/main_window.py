@@ -3,52 +3,94 @@ Main window for Lightning Explorer
 Vimium-style hint-based file explorer
 """
 import tkinter as tk
-from tkinter import ttk, messagebox
 import os
-import subprocess
 import sys
 from pathlib import Path
-import itertools
 import string
-import shutil
+import threading
+import time
+from array import array
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.file_scanner import FileScanner, FileEntry
+# Only what the first paint needs is imported here; everything else
+# (file operations, indexes, watching, prefetch, dialogs...) on first use
+from core.file_scanner import FLAG_DIR, FLAG_FILE, SORT_MODES, FileScanner, FileEntry, Listing
+from core.perf import perf
+from ui.hints import hint_labels, hint_trie
 
+# Background scan tuning
+SCAN_POLL_MS = 30              # after() interval while a scan streams in
+SCAN_FIRST_PAINT_WAIT = 0.015  # seconds to wait for small dirs to finish
+SCAN_REDRAW_INTERVAL = 0.25    # seconds between partial redraws
 
-# Generate 2-letter hint labels (aa, ab, ac, ... zz)
-def generate_hints(count):
-    """Generate hint labels like: aa, ab, ac, ba, bb, ..."""
-    letters = string.ascii_lowercase
-    hints = []
-    for combo in itertools.product(letters, repeat=2):
-        hints.append(''.join(combo))
-        if len(hints) >= count:
-            break
-    return hints
+# Virtualized file list: only the rows on screen (plus overscan) are rendered
+VIEW_OVERSCAN = 3              # extra rows rendered below the visible area
+VIEW_FALLBACK_ROWS = 30        # visible rows to assume before the widget is mapped
 
+# Search keystrokes within one frame are coalesced into a single filter + redraw
+SEARCH_FRAME_MS = 16
+
+# Global (recursive) search: optional fixed root, else the current directory
+INDEX_ROOT_ENV = 'LIGHTNING_EXPLORER_INDEX_ROOT'
+INDEX_POLL_MS = 250
+
+# Live updates: watcher events are coalesced and applied at most this often
+WATCH_POLL_MS = 100
+
+# Idle prefetch: after this long without a redraw or keystroke, scan the
+# directories the user is likely to enter next into the listing cache
+PREFETCH_IDLE_MS = 400
+PREFETCH_POLL_MS = 50
+
+# Progress refresh for background copies/moves
+FILE_OP_POLL_MS = 200
+
+# Folder sizes: measured when sorting by size (SHIFT-S), or for every
+# directory entered when this is set to 1
+DIR_SIZES_ENV = 'LIGHTNING_EXPLORER_DIR_SIZES'
+DIR_SIZE_POLL_MS = 100
+
+# Duplicate finder progress refresh
+DUPLICATE_POLL_MS = 200
+
+# Content search (SHIFT-T): each query walks the tree, so wait for a pause
+# in typing and ignore queries too short to be selective
+GREP_DEBOUNCE_MS = 250
+GREP_MIN_QUERY = 2
+GREP_POLL_MS = 50
+
+# Performance overlay (SHIFT-P): span latencies in the status bar, refreshed
+# while shown; set to 1 to start with it on. F12 dumps the span ring buffer.
+PERF_ENV = 'LIGHTNING_EXPLORER_PERF'
+PERF_OVERLAY_MS = 500
+
+# Preview pane (SHIFT-I): a file's hint previews it, the same hint again
+# opens it; set to 1 to start with the pane shown
+PREVIEW_ENV = 'LIGHTNING_EXPLORER_PREVIEW'
+PREVIEW_POLL_MS = 15
+PREVIEW_WIDTH = 60  # Characters
+
+# Startup: time from launch to the first painted listing is checked against
+# this budget. The start directory's listing is saved on exit and, while the
+# directory is unchanged, shown straight away next time (set to 0 to disable).
+STARTUP_BUDGET_MS = 500
+SNAPSHOT_ENV = 'LIGHTNING_EXPLORER_SNAPSHOT'
+
+# Resident daemon (`main.py daemon`): when one is running, listings and the
+# global index come from it, already warm (set to 0 to ignore it). A listing
+# is asked for alongside the local scan and whichever finishes first is shown.
+DAEMON_ENV = 'LIGHTNING_EXPLORER_DAEMON'
+DAEMON_POLL_MS = 10
 
 class LightningExplorer(tk.Tk):
     """Main application window with Vimium-style navigation"""
     
-    def __init__(self):
+    def __init__(self, started_ns=None):
         super().__init__()
-        
-        # Application state
-        self.scanner = FileScanner()
-        self.current_files = []
-        self.filtered_files = []
-        self.file_hints = {}  # Maps hint labels to files
-        self.search_mode = False
-        self.search_query = ""
-        self.hint_buffer = ""  # Typed hint characters
-        
-        # Clipboard state for copy/cut/paste
-        self.clipboard_file = None
-        self.clipboard_operation = None  # 'copy' or 'cut'
-        self.right_clicked_file = None  # Track which file was right-clicked
+        self.started_ns = started_ns or time.perf_counter_ns()
+        self.init_state()
         
         # Setup UI
         self.title("Lightning Explorer")
@@ -58,15 +100,100 @@ class LightningExplorer(tk.Tk):
         # Create UI components
         self.create_widgets()
         
+        # First screenful before anything else: the saved listing if the
+        # directory is unchanged, else the daemon's, else whatever the scan
+        # lists in one frame
+        self.restore_snapshot()
+        self.refresh_files()
+        self.update_idletasks()  # Maps and paints the window
+        self.note_first_paint()
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        if os.environ.get(DAEMON_ENV) != '0':
+            self.connect_daemon()
+        
         # Bind keyboard shortcuts
         self.bind_keys()
         
-        # Initial scan
-        self.refresh_files()
+        # Map a configured root's index straight away (no walk on startup)
+        if self.index_root:
+            self.load_global_index(self.index_root)
+        
+        if os.environ.get(PREVIEW_ENV) == '1':
+            self.toggle_preview()
+        
+        if self.perf_overlay:
+            self.poll_perf_overlay()
         
         # Focus on file list
         self.file_listbox.focus_set()
     
+    def init_state(self):
+        """
+        Set up everything but the widgets (and touch no Tk call), so a
+        window can be modelled without a display - see bench.render_stub
+        """
+        # Application state
+        self.scanner = FileScanner()
+        self.start_path = self.scanner.current_path  # Snapshotted on exit
+        self.daemon = None  # DaemonClient, connected after the first paint
+        self.current_files = []
+        self.filtered_files = []
+        self.file_hints = {}  # Maps hint labels to row positions in filtered_files
+        self.hint_trie = hint_trie(0)  # Prefix tree over the labels on screen
+        self.hint_node = self.hint_trie  # Trie cursor for the typed hint prefix
+        self.hint_lines = {}  # Maps hint labels to their line in the file list
+        self.search_mode = False
+        self.search_query = ""
+        self.search_pending = None  # after() id of the coalesced search update
+        self.hint_buffer = ""  # Typed hint characters
+        self.scan_job = None  # Background scan currently streaming in
+        self.scan_painted_at = None  # perf_counter() of the last partial redraw
+        self.view_top = 0  # First display row rendered in the file list
+        self.view_height = 0  # Widget height the last render was sized for
+        self.watcher = None  # DirectoryWatcher for the current directory
+        self.prefetcher = None  # Prefetcher, created when first idle
+        self.prefetch_pending = None  # after() id of the idle prefetch timer
+        self.dir_sizes = None  # DirSizeCache of folder totals, kept across directories
+        self.size_job = None  # DirSizeJob measuring the current directory's folders
+        self.auto_dir_sizes = os.environ.get(DIR_SIZES_ENV) == '1'
+        
+        # Recursive filename index for global search (SHIFT-G)
+        self.global_search = False
+        self.global_index = None  # TreeIndex being searched
+        self.indexer = None  # TreeIndexer rebuilding it in the background
+        index_root = os.environ.get(INDEX_ROOT_ENV)
+        self.index_root = Path(index_root).resolve() if index_root else None
+        
+        # Content search (SHIFT-T)
+        self.content_search = False
+        self.grep_job = None  # GrepJob for the current query
+        self.grep_lines = None  # First matching line of each listed row
+        
+        # Duplicate finder (SHIFT-F)
+        self.duplicate_job = None  # DuplicateJob still running
+        self.duplicate_view = None  # Finished DuplicateJob whose groups are listed
+        self.duplicate_groups = None  # Group number of each listed row
+        self.hash_cache = None  # HashCache, loaded by the first job
+        
+        # Performance overlay (SHIFT-P)
+        self.perf_overlay = os.environ.get(PERF_ENV) == '1'
+        
+        # Preview pane (SHIFT-I)
+        self.preview_shown = False
+        self.preview_pane = None  # Text widget, built when first shown
+        self.preview_loader = None  # PreviewLoader with its LRU cache
+        self.preview_path = None  # File shown (or being read) in the pane
+        self.preview_pending = None  # after() id of the preview poll
+        
+        # Clipboard state for copy/cut/paste
+        self.clipboard_files = []  # Paths to paste
+        self.clipboard_operation = None  # 'copy' or 'cut'
+        self.selection = set()  # Paths selected for batch operations
+        self.select_mode = False  # Hints toggle selection instead of opening
+        self.right_clicked_file = None  # Track which file was right-clicked
+        self.file_ops = None  # OperationQueue of background copies/moves, once used
+        self.file_ops_polling = False
+    
     def create_widgets(self):
         """Create and layout UI widgets"""
         
@@ -133,21 +260,31 @@ class LightningExplorer(tk.Tk):
             bd=0,
             highlightthickness=1,
             highlightbackground='#333333',
-            yscrollcommand=self.scrollbar.set,
             wrap=tk.NONE,
             cursor='arrow',
             state=tk.DISABLED  # Make read-only initially
         )
         self.file_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.scrollbar.config(command=self.file_listbox.yview)
+        # The Text widget only ever holds the rendered window, so the
+        # scrollbar drives our virtual view instead of the widget
+        self.scrollbar.config(command=self.on_scrollbar)
+        self.file_listbox.bind('<Configure>', self.on_list_resize)
+        self.file_listbox.bind('<MouseWheel>', self.on_mouse_wheel)
+        self.file_listbox.bind('<Button-4>', self.on_mouse_wheel)
+        self.file_listbox.bind('<Button-5>', self.on_mouse_wheel)
         
         # Configure tags for colored hints
         self.file_listbox.tag_configure('hint', foreground='#ffff00', background='#3a3a00', font=('Consolas', 13, 'bold'))
         self.file_listbox.tag_configure('folder', foreground='#ffffff')
         self.file_listbox.tag_configure('file', foreground='#b3b3b3')
+        self.file_listbox.tag_configure('selected', background='#004a5e')
+        self.file_listbox.tag_configure('group', background='#1c1c28')  # Every other duplicate group
+        # Rows whose hint no longer matches the typed prefix (highest priority)
+        self.file_listbox.tag_configure('dim', foreground='#4a4a4a', background='#1e1e1e')
         
-        # Create context menu
-        self.create_context_menu()
+        # Context menu (built on first use)
+        self.context_menu = None
+        self.file_listbox.bind('<Button-3>', self.show_context_menu)
         
         # Typing buffer display (shows last 4 keystrokes)
         self.typing_frame = tk.Frame(self, bg='#3a3a00', height=60)
@@ -228,11 +365,9 @@ class LightningExplorer(tk.Tk):
         self.context_menu.add_command(label="Copy", command=self.context_copy)
         self.context_menu.add_command(label="Cut", command=self.context_cut)
         self.context_menu.add_command(label="Paste", command=self.context_paste)
+        self.context_menu.add_command(label="Delete", command=self.context_delete)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="Copy Full Path", command=self.context_copy_path)
-        
-        # Bind right-click to file list
-        self.file_listbox.bind('<Button-3>', self.show_context_menu)
     
     def bind_keys(self):
         """Bind keyboard shortcuts"""
@@ -250,71 +385,408 @@ class LightningExplorer(tk.Tk):
         self.file_listbox.bind('<D>', self.page_down)  # SHIFT-D
         self.file_listbox.bind('<U>', self.page_up)    # SHIFT-U
         self.file_listbox.bind('<O>', self.reveal_current_dir_in_explorer)  # SHIFT-O
+        self.file_listbox.bind('<G>', self.toggle_global_search)  # SHIFT-G
+        self.file_listbox.bind('<X>', self.cancel_file_ops)  # SHIFT-X
+        self.file_listbox.bind('<S>', self.cycle_sort_mode)  # SHIFT-S
+        self.file_listbox.bind('<F>', self.find_duplicates)  # SHIFT-F
+        self.file_listbox.bind('<T>', self.toggle_content_search)  # SHIFT-T
+        self.file_listbox.bind('<I>', self.toggle_preview)  # SHIFT-I
+        
+        # Multi-selection
+        self.file_listbox.bind('<V>', self.toggle_select_mode)  # SHIFT-V
+        self.file_listbox.bind('<A>', self.select_all)  # SHIFT-A
+        self.file_listbox.bind('<C>', self.clear_selection)  # SHIFT-C
+        self.file_listbox.bind('<Delete>', lambda e: self.context_delete(from_menu=False))
         
         # Search
         self.file_listbox.bind('<slash>', self.enter_search_mode)
         
         # Refresh
-        self.file_listbox.bind('<F5>', lambda e: self.refresh_files())
+        self.file_listbox.bind('<F5>', lambda e: self.refresh_files(use_cache=False))
+        
+        # Performance overlay and trace dump
+        self.file_listbox.bind('<P>', self.toggle_perf_overlay)  # SHIFT-P
+        self.file_listbox.bind('<F12>', self.dump_perf_trace)
         
         # Help
         self.file_listbox.bind('<?>', self.show_help)
     
-    def refresh_files(self):
-        """Scan and display current directory"""
-        self.current_files = self.scanner.scan()
+    def restore_snapshot(self):
+        """Seed the listing cache with the start directory's saved listing"""
+        if os.environ.get(SNAPSHOT_ENV) == '0':
+            return
+        from core.snapshot import load_snapshot
+        restored = load_snapshot(self.start_path, self.scanner.sort_mode)
+        if restored is not None:
+            listing, with_stat, mtime_ns = restored
+            self.scanner.cache.put(self.start_path, listing, with_stat, mtime_ns, time.time())
+    
+    def note_first_paint(self):
+        """Record time to first paint and warn when over budget"""
+        now = time.perf_counter_ns()
+        perf.record('startup', self.started_ns, now)
+        elapsed = (now - self.started_ns) / 1e6
+        if elapsed > STARTUP_BUDGET_MS:
+            print(f"⚠️ Startup time: {elapsed:.0f}ms (budget {STARTUP_BUDGET_MS}ms)", file=sys.stderr)
+    
+    def on_close(self):
+        """Save the start directory's listing for the next launch, then quit"""
+        if os.environ.get(SNAPSHOT_ENV) != '0':
+            listing = self.scanner.cache.get(self.start_path)
+            if listing is not None:
+                from core.snapshot import save_snapshot
+                try:
+                    save_snapshot(listing, with_stat=True)
+                except OSError as e:
+                    print(f"⚠️ Could not save startup snapshot: {e}", file=sys.stderr)
+        self.destroy()
+    
+    def refresh_files(self, use_cache=True):
+        """Scan and display current directory (on a background thread)"""
+        self.global_search = False  # Back to browsing a single directory
+        self.content_search = False
+        self.cancel_grep()
+        self.close_duplicates()
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()  # Its guesses were for the previous directory
+            self.prefetcher.note_visit(self.scanner.current_path)
+        self.cancel_dir_sizes()
+        
+        # Starting a new scan cancels one still running for the old directory;
+        # an unchanged, recently visited directory comes back already done
+        self.scan_job = self.scanner.scan_async(use_cache=use_cache)
+        self.current_files = self.scan_job.listing
         self.filtered_files = self.current_files
         self.selected_index = 0
+        self.view_top = 0
+        self.scan_painted_at = None
+        
+        # Most directories finish within a frame - wait that long so they
+        # paint once, fully sorted, instead of flashing partial results
+        self.scan_job.wait(SCAN_FIRST_PAINT_WAIT)
+        if use_cache and not self.scan_job.done:
+            self.fetch_from_daemon(self.scan_job)
+        self.poll_scan(self.scan_job)
+        self.after_idle(self.watch_current_dir)  # Once the listing has painted
+    
+    def connect_daemon(self):
+        """(Re)connect to a running daemon on a worker thread, as it may be slow to answer"""
+        def connect():
+            from core.daemon import DaemonClient
+            self.daemon = DaemonClient.connect()
+        self.daemon = None
+        threading.Thread(target=connect, name="daemon-connect", daemon=True).start()
+    
+    def fetch_from_daemon(self, job):
+        """Ask the daemon for the listing job is scanning; the first to finish is shown"""
+        daemon = self.daemon
+        if daemon is None or daemon.pending:
+            return  # Not connected (yet), or still answering an earlier request
+        if not daemon.connected:
+            self.connect_daemon()  # Dropped: reopening could block, so not on this thread
+            return
+        if not daemon.send_listing(job.path, with_stat=True):
+            return
+        from core.daemon import DAEMON_REPLY_TIMEOUT
+        asked_at = time.time()
+        deadline = time.perf_counter() + DAEMON_REPLY_TIMEOUT
+        self.after(DAEMON_POLL_MS, lambda: self.poll_daemon_listing(daemon, job, deadline, asked_at))
+    
+    def poll_daemon_listing(self, daemon, job, deadline, asked_at):
+        """Wait for the daemon's listing without blocking (after() loop)"""
+        ready, fetched = daemon.listing_reply(job.path, self.scanner.sort_mode)
+        if not ready:
+            if time.perf_counter() < deadline:
+                self.after(DAEMON_POLL_MS,
+                           lambda: self.poll_daemon_listing(daemon, job, deadline, asked_at))
+            else:
+                daemon.close()  # Too slow: a late reply would answer the next request
+            return
+        if fetched is None:
+            return
+        listing, with_stat, mtime_ns = fetched
+        if job is not self.scan_job or job.done:
+            # The local scan won (or we moved on); keep the listing for a revisit
+            if job.path not in self.scanner.cache:
+                self.scanner.cache.put(job.path, listing, with_stat, mtime_ns, asked_at)
+            return
+        filtering = self.filtered_files is not self.current_files
+        self.scan_job = self.scanner.adopt_listing(listing, with_stat, mtime_ns, asked_at)
+        self.current_files = self.scan_job.listing
+        if not filtering:
+            self.filtered_files = self.current_files
+        self.poll_scan(self.scan_job)
+    
+    def rescan_files(self):
+        """Rescan in the background, keeping the current view until it finishes"""
+        filtering = self.filtered_files is not self.current_files
+        self.scan_job = self.scanner.scan_async(use_cache=False)
+        self.current_files = self.scan_job.listing
+        if not filtering:
+            self.filtered_files = self.current_files
+        self.scan_painted_at = time.perf_counter()  # No early partial paint
+        self.poll_scan(self.scan_job)
+    
+    def watch_current_dir(self):
+        """(Re)start the directory watcher if the current directory changed"""
+        path = self.scanner.current_path
+        if self.watcher is not None:
+            if self.watcher.path == path and not self.watcher.stopped:
+                return
+            self.watcher.stop()
+        from core.watcher import watch_directory
+        self.watcher = watch_directory(path)
+        self.after(WATCH_POLL_MS, lambda: self.poll_watcher(self.watcher))
+    
+    def poll_watcher(self, watcher):
+        """Apply coalesced filesystem changes to the listing (after() loop)"""
+        if watcher is not self.watcher:
+            watcher.stop()
+            return  # Superseded: we moved to another directory
+        self.after(WATCH_POLL_MS, lambda: self.poll_watcher(watcher))
+        if self.scan_job is not None or self.active_file_ops():
+            # Changes keep accumulating until the scan is in, or the batch
+            # operation is done (then one refresh covers all of it)
+            return
+        
+        changes = watcher.drain()
+        if changes is None:
+            self.patch_global_index(None)
+            self.rescan_files()  # Too many changes, or events were lost
+            return
+        if not changes:
+            return
+        self.patch_global_index(changes)
+        
+        added, removed, updated = self.scanner.apply_changes(changes)
+        if not (added or removed or updated):
+            return
+        if self.global_search or self.content_search or self.duplicate_view:
+            return  # The list shows search results, not this directory
+        if self.filtered_files is not self.current_files:
+            self.filtered_files = self.scanner.search(self.search_query)
+        if added or removed:
+            self.clear_hint_buffer()  # Rows below the change moved
         self.update_display()
     
-    def update_display(self):
-        """Update the file list display with hint labels"""
-        # Update path
-        self.path_label.config(text=str(self.scanner.current_path))
+    def patch_global_index(self, names):
+        """Apply watched changes in the current directory to the global index"""
+        index = self.global_index
+        if index is None:
+            return
+        patched = index.apply_changes(self.scanner.current_path, names)
+        if patched is None:
+            # Too much to patch (a big folder moved in): walk the tree again
+            if self.indexer is None:
+                from core.indexer import TreeIndexer
+                self.indexer = TreeIndexer(index.root).start()
+                indexer = self.indexer
+                self.after(INDEX_POLL_MS, lambda: self.poll_indexer(indexer))
+        elif any(patched) and self.global_search:
+            self.apply_search()
+    
+    def poll_scan(self, job):
+        """Fold streamed scan results into the view (after() polling loop)"""
+        if job is not self.scan_job or job.cancelled:
+            return  # Superseded by a newer scan
         
-        # Clear listbox and hint mapping
-        self.file_listbox.config(state=tk.NORMAL)
-        self.file_listbox.delete('1.0', tk.END)
-        self.file_hints.clear()
+        added = job.poll()
         
-        # Generate hint labels for files
-        hints = generate_hints(len(self.filtered_files) + 1)  # +1 for ".."
-        hint_index = 0
-        
-        # Add parent directory entry if not at root
-        if self.scanner.current_path.parent != self.scanner.current_path:
-            hint = hints[hint_index]
-            # Insert with colored hint
-            self.file_listbox.insert(tk.END, f"[{hint}]", 'hint')
-            self.file_listbox.insert(tk.END, f" 📁 ..\n", 'folder')
-            self.file_hints[hint] = None  # None means parent directory
-            hint_index += 1
-        
-        # Add files with hint labels
-        for file in self.filtered_files:
-            hint = hints[hint_index]
-            icon = "📁" if file.is_dir else "📄"
-            tag = 'folder' if file.is_dir else 'file'
-            
-            # Insert with colored hint
-            self.file_listbox.insert(tk.END, f"[{hint}]", 'hint')
-            self.file_listbox.insert(tk.END, f" {icon} {file.name:<45} {file.size_str:>10}\n", tag)
-            self.file_hints[hint] = file
-            hint_index += 1
+        if job.done:
+            self.scan_job = None
+            if self.scan_painted_at is not None:
+                # Final sort reorders rows, so partial hints are stale
+                self.clear_hint_buffer()
+            self.show_dir_sizes()
+            if (self.filtered_files is not self.current_files and not self.global_search
+                    and not self.content_search and not self.duplicate_view):
+                # A rescan under an active filter: re-run it on the new rows
+                self.filtered_files = self.scanner.search(self.search_query)
+            self.update_display()
+            stats = job.stats
+            source = "from cache" if stats.cached else "scanned"
+            self.status_label.config(
+                text=f"{self.status_label.cget('text')} | {source} in {stats.total_ms:.0f}ms"
+            )
+            return
         
-        # Make read-only
-        self.file_listbox.config(state=tk.DISABLED)
+        # Show the first screenful immediately, then throttle redraws
+        now = time.perf_counter()
+        if added and (self.scan_painted_at is None or
+                      now - self.scan_painted_at >= SCAN_REDRAW_INTERVAL):
+            self.scan_painted_at = now
+            self.update_display()
+            self.status_label.config(text=f"Scanning... {len(job.listing)} items so far")
         
-        # Update status
+        self.after(SCAN_POLL_MS, lambda: self.poll_scan(job))
+    
+    @perf.timed('redraw')
+    def update_display(self):
+        """Update the path, the visible file rows and the status bar"""
+        # Update path
+        self.path_label.config(text=str(self.scanner.current_path))
+        
+        self.render_rows()
+        self.status_label.config(text=self.status_text())
+        self.schedule_prefetch()
+    
+    def status_text(self):
+        """Status bar line: counts, filter, global search and file operations"""
         file_count = len(self.filtered_files)
-        dir_count = sum(1 for f in self.filtered_files if f.is_dir)
+        dir_count = self.filtered_files.dir_count()
         file_file_count = file_count - dir_count
         
         status = f"{file_count} items ({dir_count} folders, {file_file_count} files)"
         if self.search_query:
             status += f" | Filtered by: '{self.search_query}'"
-        self.status_label.config(text=status)
+        if self.global_search:
+            status += f" | Global: {self.global_index.root if self.global_index else 'indexing'}"
+            if self.indexer is not None:
+                status += " (indexing...)"
+        if self.content_search:
+            status += f" | Contents: {self.grep_job.summary() if self.grep_job else 'type to search'}"
+        if self.duplicate_job is not None:
+            status += f" | {self.duplicate_job.summary()} - SHIFT-F cancels"
+        elif self.duplicate_view is not None:
+            status += f" | {self.duplicate_view.summary()}"
+        if self.select_mode or self.selection:
+            status += f" | {'SELECT: ' if self.select_mode else ''}{len(self.selection)} selected"
+        if self.scanner.sort_mode != 'name':
+            status += f" | Sort: {self.scanner.sort_mode}"
+        if self.size_job is not None:
+            status += f" (measuring folders: {self.size_job.dirs_scanned} scanned)"
+        active = self.active_file_ops()
+        if active:
+            status += f" | {active[0].summary()}"
+            if len(active) > 1:
+                status += f" (+{len(active) - 1} queued)"
+            status += " - SHIFT-X cancels"
+        if self.perf_overlay:
+            status += f" | {perf.overlay()}"
+        return status
+    
+    def has_parent_row(self):
+        """True when the list starts with a ".." row"""
+        return self.scanner.current_path.parent != self.scanner.current_path
+    
+    def total_rows(self):
+        """Number of display rows, including ".." when shown"""
+        return len(self.filtered_files) + (1 if self.has_parent_row() else 0)
+    
+    def visible_row_count(self):
+        """How many rows fit in the file list widget"""
+        try:
+            linespace = self.file_listbox.tk.call('font', 'metrics', self.file_listbox.cget('font'), '-linespace')
+            height = self.file_listbox.winfo_height()
+        except tk.TclError:
+            return VIEW_FALLBACK_ROWS
+        if height <= 1 or not linespace:
+            return VIEW_FALLBACK_ROWS  # Not mapped yet
+        return max(1, int(height / int(linespace)))
+    
+    def render_rows(self):
+        """
+        Render only the rows currently in view and assign hints to them
+        
+        The Text widget never holds more than the visible rows plus a small
+        overscan, so redraw cost is bounded by the window height rather
+        than by the directory size.
+        """
+        visible = self.visible_row_count()
+        total = self.total_rows()
+        self.view_top = max(0, min(self.view_top, total - visible))
+        end = min(total, self.view_top + visible + VIEW_OVERSCAN)
+        
+        # Hints are handed out to rendered rows only, shortest labels first
+        self.file_hints.clear()
+        self.hint_lines.clear()
+        hints = hint_labels(end - self.view_top)
+        self.hint_trie = hint_trie(len(hints))
+        self.hint_node = self.hint_trie
+        if self.hint_buffer:
+            self.clear_hint_buffer()  # Typed prefix referred to the old rows
+        offset = 1 if self.has_parent_row() else 0
+        files = self.filtered_files
+        selection = self.selection
+        groups = self.duplicate_groups
+        lines = self.grep_lines
+        
+        # Build one insert call: text, tag, text, tag, ...
+        chunks = []
+        for line, (hint, row) in enumerate(zip(hints, range(self.view_top, end)), start=1):
+            self.hint_lines[hint] = line
+            chunks.append(f"[{hint}]")
+            chunks.append('hint')
+            if row < offset:
+                chunks.append(" 📁 ..\n")
+                chunks.append('folder')
+                self.file_hints[hint] = None  # None means parent directory
+                continue
+            
+            i = row - offset
+            is_dir = files.is_dir(i)
+            icon = "📁" if is_dir else "📄"
+            tag = 'folder' if is_dir else 'file'
+            mark = " "
+            if selection and files.path(i) in selection:
+                mark = "*"
+                tag = (tag, 'selected')
+            elif groups is not None and groups[files.row(i)] & 1:
+                tag = (tag, 'group')
+            if lines is None:
+                chunks.append(f"{mark}{icon} {files.name(i):<45} {files.size_str(i):>10}\n")
+            else:
+                chunks.append(f"{mark}{icon} {files.name(i):<45} {lines[files.row(i)]}\n")
+            chunks.append(tag)
+            self.file_hints[hint] = i
+        
+        self.file_listbox.config(state=tk.NORMAL)
+        self.file_listbox.delete('1.0', tk.END)
+        if chunks:
+            self.file_listbox.insert(tk.END, *chunks)
+        self.file_listbox.config(state=tk.DISABLED)
+        
+        # Scrollbar reflects the position within the full list
+        if total:
+            self.scrollbar.set(self.view_top / total, min(1.0, (self.view_top + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        perf.count('redraws')
     
+    def scroll_rows(self, delta):
+        """Move the view by delta rows and re-render if it moved"""
+        old_top = self.view_top
+        self.view_top = max(0, self.view_top + delta)
+        self.render_rows()
+        if self.view_top != old_top:
+            self.clear_hint_buffer()  # Hints now point at different rows
+    
+    def on_scrollbar(self, *args):
+        """Scrollbar command: 'moveto fraction' or 'scroll n units|pages'"""
+        if args[0] == 'moveto':
+            target = int(float(args[1]) * self.total_rows())
+            self.scroll_rows(target - self.view_top)
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= max(1, self.visible_row_count() - 2)
+            self.scroll_rows(amount)
+    
+    def on_mouse_wheel(self, event):
+        """Scroll the virtual view with the mouse wheel"""
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_rows(-3)
+        else:
+            self.scroll_rows(3)
+        return "break"
+    
+    def on_list_resize(self, event):
+        """Re-render when the list height changes (more or fewer rows fit)"""
+        if event.height != self.view_height:
+            self.view_height = event.height
+            self.render_rows()
+    
+    @perf.timed('hint_key')
     def on_hint_key(self, event):
         """Handle hint key press"""
         if self.search_mode:
@@ -330,39 +802,288 @@ class LightningExplorer(tk.Tk):
         display_text = self.hint_buffer[-4:] if len(self.hint_buffer) > 4 else self.hint_buffer
         self.typing_display.config(text=display_text)
         
-        # Check if this is a context menu mode (starts with 'r')
-        if self.hint_buffer.startswith('r') and len(self.hint_buffer) == 3:
-            # User typed 'r' + hint (e.g., 'rab') -> open context menu
-            hint = self.hint_buffer[1:]  # Extract the hint part (remove 'r')
-            if hint in self.file_hints:
-                self.right_clicked_file = self.file_hints[hint]
+        # Context menu mode: 'r' + hint (e.g., 'rab') opens the actions menu.
+        # 'r' is never a hint character, so the trie cursor stays at the root.
+        if self.hint_buffer == 'r':
+            return "break"
+        
+        # One child lookup per keystroke (labels are prefix-free)
+        node = self.hint_node.child(key)
+        if node is None:
+            # No matches - reset
+            self.clear_hint_buffer()
+        elif node.is_leaf:
+            if self.hint_buffer.startswith('r'):
+                self.right_clicked_file = self.hint_target(node.label)
                 self.clear_hint_buffer()
                 self.show_keyboard_context_menu()
-                return "break"
-            else:
-                # Invalid hint, reset
+            elif self.select_mode:
                 self.clear_hint_buffer()
-                return "break"
-        
-        # Check for matches (only if not in 'r' mode)
-        if not self.hint_buffer.startswith('r'):
-            matching_hints = [h for h in self.file_hints.keys() if h.startswith(self.hint_buffer)]
-            
-            if len(matching_hints) == 1 and matching_hints[0] == self.hint_buffer:
+                self.toggle_selected(node.label)
+            elif self.preview_shown and self.preview_hint(node.label):
+                pass  # Previewed; typing the hint again opens the file
+            else:
                 # Exact match - activate the file
-                self.activate_hint(matching_hints[0])
-            elif len(matching_hints) == 0:
-                # No matches - reset
-                self.clear_hint_buffer()
+                self.activate_hint(node.label)
+        else:
+            # Ambiguous prefix - wait for more keys, dim rows that can't match
+            self.hint_node = node
+            self.dim_unmatched_hints(node)
+            self.schedule_prefetch()  # The prefix narrows down the next move
         
         return "break"
     
+    def schedule_prefetch(self):
+        """(Re)start the idle timer; prefetch once the user pauses"""
+        if self.prefetch_pending is not None:
+            self.after_cancel(self.prefetch_pending)
+        self.prefetch_pending = self.after(PREFETCH_IDLE_MS, self.start_prefetch)
+    
+    def start_prefetch(self):
+        """Queue the likeliest next directories on the background prefetcher"""
+        self.prefetch_pending = None
+        if self.scan_job is not None:
+            return  # Never compete with the foreground scan (it reschedules us)
+        if self.prefetcher is None:
+            from core.prefetch import Prefetcher
+            self.prefetcher = Prefetcher(self.scanner.cache)
+            self.prefetcher.note_visit(self.scanner.current_path)
+        paths = self.prefetcher.rank(self.prefetch_candidates())
+        if not paths:
+            return
+        polling = self.prefetcher.busy
+        self.prefetcher.request(paths, self.scanner.sort_mode)
+        if not polling:
+            self.after(PREFETCH_POLL_MS, self.poll_prefetch)
+    
+    def poll_prefetch(self):
+        """Hand finished prefetch scans to the listing cache (after() loop)"""
+        self.prefetcher.poll()
+        if self.prefetcher.busy:
+            self.after(PREFETCH_POLL_MS, self.poll_prefetch)
+    
+    def prefetch_candidates(self):
+        """Directories on screen, those matching a typed hint prefix first"""
+        labels = []
+        if self.hint_node is not self.hint_trie:
+            labels.extend(self.hint_node.labels())
+        labels.extend(self.file_hints)  # Rendered rows, top to bottom
+        
+        files = self.filtered_files
+        paths = []
+        for label in labels:
+            index = self.file_hints.get(label)
+            if index is None:
+                paths.append(self.scanner.current_path.parent)
+            elif files.is_dir(index):
+                paths.append(files.path(index))
+        return paths
+    
+    def show_dir_sizes(self):
+        """
+        Fill in folder totals already known, then measure the folders
+        
+        Totals from earlier walks show immediately; a DirSizeJob revalidates
+        them (cheaply, unchanged directories come from the cache) when sizes
+        are wanted: sorting by size, or LIGHTNING_EXPLORER_DIR_SIZES=1.
+        """
+        from core.dir_sizes import DirSizeCache, DirSizeJob
+        self.cancel_dir_sizes()
+        if self.dir_sizes is None:
+            self.dir_sizes = DirSizeCache()
+        files = self.current_files
+        dirs = []
+        for row, name in enumerate(files.names):
+            if files.flags[row] & FLAG_DIR:
+                path = files.root / name
+                known = self.dir_sizes.total(path)
+                if known is not None:
+                    files.set_dir_size(row, known[0])
+                dirs.append(path)
+        self.apply_sort()
+        
+        if dirs and (self.scanner.sort_mode == 'size' or self.auto_dir_sizes):
+            job = DirSizeJob(dirs, self.dir_sizes).start()
+            self.size_job = job
+            self.after(DIR_SIZE_POLL_MS, lambda: self.poll_dir_sizes(job))
+    
+    def cancel_dir_sizes(self):
+        if self.size_job is not None:
+            self.size_job.cancel()
+            self.size_job = None
+    
+    def poll_dir_sizes(self, job):
+        """Put folder totals into their rows as they complete (after() loop)"""
+        if job is not self.size_job:
+            return  # Cancelled / superseded
+        if self.scan_job is not None:
+            # Rows are being replaced; the finished scan starts a new job
+            self.after(DIR_SIZE_POLL_MS, lambda: self.poll_dir_sizes(job))
+            return
+        
+        results = job.poll()
+        if results:
+            files = self.current_files
+            for path, total, _ in results:
+                row = self.scanner.row_of(path.name)
+                if row is not None and files.flags[row] & FLAG_DIR:
+                    files.set_dir_size(row, total)
+                    if files.sort_mode == 'size':
+                        files.place(row)
+            if files.sort_mode == 'size':
+                self.clear_hint_buffer()  # Rows moved
+            self.update_display()
+        
+        if job.done:
+            self.size_job = None
+            self.update_display()
+            self.status_label.config(
+                text=f"{self.status_label.cget('text')} | folders sized in {job.elapsed_ms:.0f}ms"
+            )
+            return
+        self.after(DIR_SIZE_POLL_MS, lambda: self.poll_dir_sizes(job))
+    
+    def apply_sort(self):
+        """Re-sort the listing if it is not in the chosen order"""
+        files = self.current_files
+        if files.sort_mode != self.scanner.sort_mode:
+            files.sort(self.scanner.sort_mode)
+    
+    def cycle_sort_mode(self, event=None):
+        """
+        Switch to the next sort mode (SHIFT-S)
+        
+        Name, natural (file2 before file10), extension, newest first, and
+        largest first - which also measures folders in the background.
+        """
+        mode = SORT_MODES[(SORT_MODES.index(self.scanner.sort_mode) + 1) % len(SORT_MODES)]
+        self.scanner.sort_mode = mode  # New listings come back sorted this way
+        if mode != 'size' and not self.auto_dir_sizes:
+            self.cancel_dir_sizes()
+        if self.scan_job is None:  # Else the finished scan sorts (and measures)
+            if mode == 'size':
+                self.show_dir_sizes()
+            else:
+                self.apply_sort()
+        self.view_top = 0
+        self.clear_hint_buffer()
+        self.update_display()
+        return "break"
+    
+    def find_duplicates(self, event=None):
+        """
+        List files with identical contents under the current directory (SHIFT-F)
+        
+        Pressed again it cancels a running search, or closes the results.
+        """
+        if self.duplicate_job is not None:
+            self.duplicate_job.cancel()
+            self.duplicate_job = None
+            self.update_display()
+        elif self.duplicate_view is not None:
+            self.close_duplicates()
+            self.filtered_files = self.current_files
+            self.view_top = 0
+            self.clear_hint_buffer()
+            self.update_display()
+        else:
+            from core.duplicates import DuplicateJob
+            job = DuplicateJob(self.scanner.current_path, self.hash_cache).start()
+            self.duplicate_job = job
+            self.update_display()
+            self.after(DUPLICATE_POLL_MS, lambda: self.poll_duplicates(job))
+        return "break"
+    
+    def poll_duplicates(self, job):
+        """Show progress, then the duplicate groups once found (after() loop)"""
+        if job is not self.duplicate_job:
+            return  # Cancelled, or we navigated away
+        if not job.done:
+            self.status_label.config(text=self.status_text())
+            self.after(DUPLICATE_POLL_MS, lambda: self.poll_duplicates(job))
+            return
+        
+        self.duplicate_job = None
+        self.hash_cache = job.cache  # Keeps hashes for the next search
+        self.global_search = False
+        self.duplicate_view = job
+        self.filtered_files, self.duplicate_groups = job.listing()
+        self.view_top = 0
+        self.clear_hint_buffer()
+        self.update_display()
+    
+    def close_duplicates(self):
+        """Leave the duplicate results (cancelling a search still running)"""
+        if self.duplicate_job is not None:
+            self.duplicate_job.cancel()
+            self.duplicate_job = None
+        self.duplicate_view = None
+        self.duplicate_groups = None
+    
+    def prune_duplicates(self):
+        """Drop listed duplicates that were deleted or moved since"""
+        files = self.filtered_files
+        gone = {row for row in files.order if not os.path.lexists(files.root / files.names[row])}
+        if gone:
+            groups = self.duplicate_groups
+            self.duplicate_groups = array('I', (groups[row] for row in range(len(groups)) if row not in gone))
+            files.drop_rows(gone)
+            self.clear_hint_buffer()
+            self.update_display()
+    
+    def toggle_selected(self, hint):
+        """Add or remove the row behind a hint from the selection"""
+        file = self.hint_target(hint)
+        if file is None:
+            return  # ".." can't be selected
+        self.selection ^= {file.path}
+        self.update_display()
+    
+    def toggle_select_mode(self, event=None):
+        """Switch hints between opening rows and toggling their selection"""
+        self.select_mode = not self.select_mode
+        self.clear_hint_buffer()
+        self.update_display()
+        return "break"
+    
+    def select_all(self, event=None):
+        """Select every row of the current view (e.g. all search results)"""
+        files = self.filtered_files
+        self.selection.update(files.path(i) for i in range(len(files)))
+        self.update_display()
+        return "break"
+    
+    def clear_selection(self, event=None):
+        self.selection.clear()
+        self.update_display()
+        return "break"
+    
+    def action_targets(self, from_menu=True):
+        """
+        Paths an action applies to: the selection, else the row the context
+        menu was opened on. right_clicked_file outlives a dismissed menu, so
+        actions started elsewhere (keys) use the selection only.
+        """
+        if self.selection:
+            return sorted(self.selection)
+        if from_menu and self.right_clicked_file is not None:
+            return [self.right_clicked_file.path]
+        return []
+    
+    def dim_unmatched_hints(self, node):
+        """Dim every rendered row whose hint is not under ``node`` (no redraw)"""
+        listbox = self.file_listbox
+        listbox.tag_add('dim', '1.0', tk.END)
+        for label in node.labels():
+            line = self.hint_lines[label]
+            listbox.tag_remove('dim', f"{line}.0", f"{line}.end")
+    
     def activate_hint(self, hint):
         """Activate the file/folder with given hint"""
         if hint not in self.file_hints:
             return
         
-        file = self.file_hints[hint]
+        file = self.hint_target(hint)
         self.clear_hint_buffer()
         
         if file is None:
@@ -378,17 +1099,28 @@ class LightningExplorer(tk.Tk):
                 if sys.platform == 'win32':
                     os.startfile(file.path)
                 else:
+                    import subprocess
                     subprocess.call(['xdg-open', str(file.path)])
                     
                 # Show feedback
                 self.status_label.config(text=f"Opened: {file.name}")
                 self.after(2000, lambda: self.update_display())
             except Exception as e:
+                from tkinter import messagebox
                 messagebox.showerror("Error", f"Could not open file:\n{e}")
     
+    def hint_target(self, hint):
+        """Return the FileEntry for a hint, or None for the ".." entry"""
+        index = self.file_hints[hint]
+        if index is None:
+            return None
+        return self.filtered_files[index]
+    
     def clear_hint_buffer(self, event=None):
         """Clear the hint buffer"""
         self.hint_buffer = ""
+        self.hint_node = self.hint_trie
+        self.file_listbox.tag_remove('dim', '1.0', tk.END)
         self.hint_label.config(text="")
         self.typing_display.config(text="")
         return "break"
@@ -401,30 +1133,12 @@ class LightningExplorer(tk.Tk):
     
     def page_down(self, event=None):
         """Scroll down one page"""
-        # Scroll down approximately one page
-        try:
-            # Get visible height in lines
-            visible_height = int(self.file_listbox.winfo_height() / self.file_listbox.tk.call('font', 'metrics', self.file_listbox.cget('font'), '-linespace'))
-            lines_to_scroll = max(1, visible_height - 2)  # Leave some overlap
-            self.file_listbox.yview_scroll(lines_to_scroll, 'units')
-        except:
-            # Fallback: scroll by fixed amount
-            self.file_listbox.yview_scroll(10, 'units')
-        
+        self.scroll_rows(max(1, self.visible_row_count() - 2))  # Leave some overlap
         return "break"
     
     def page_up(self, event=None):
         """Scroll up one page"""
-        # Scroll up approximately one page
-        try:
-            # Get visible height in lines
-            visible_height = int(self.file_listbox.winfo_height() / self.file_listbox.tk.call('font', 'metrics', self.file_listbox.cget('font'), '-linespace'))
-            lines_to_scroll = max(1, visible_height - 2)  # Leave some overlap
-            self.file_listbox.yview_scroll(-lines_to_scroll, 'units')
-        except:
-            # Fallback: scroll by fixed amount
-            self.file_listbox.yview_scroll(-10, 'units')
-        
+        self.scroll_rows(-max(1, self.visible_row_count() - 2))  # Leave some overlap
         return "break"
     
     def enter_search_mode(self, event=None):
@@ -441,16 +1155,216 @@ class LightningExplorer(tk.Tk):
         return "break"
     
     def on_search_change(self, event=None):
-        """Handle search input changes"""
-        self.search_query = self.search_entry.get()
-        self.filtered_files = self.scanner.search(self.search_query)
+        """Handle search input changes (at most one search per frame)"""
+        query = self.search_entry.get()
+        if query == self.search_query:
+            return  # e.g. Shift or arrow keys - nothing to filter
+        
+        self.search_query = query
+        if self.content_search:
+            # Restart the wait on every keystroke (debounce, not throttle)
+            if self.search_pending is not None:
+                self.after_cancel(self.search_pending)
+            self.search_pending = self.after(GREP_DEBOUNCE_MS, self.apply_search)
+        elif self.search_pending is None:
+            self.search_pending = self.after(SEARCH_FRAME_MS, self.apply_search)
+    
+    def apply_search(self):
+        """Filter with the latest query and redraw"""
+        self.search_pending = None
+        self.close_duplicates()  # Search filters the directory again
+        self.cancel_grep()
+        if self.content_search:
+            self.filtered_files = self.start_grep(self.search_query)
+        elif self.global_search and self.global_index is not None:
+            # Names in the results are paths relative to the index root
+            self.filtered_files = self.global_index.search(self.search_query)
+        elif self.global_search:
+            self.filtered_files = Listing(self.scanner.current_path)  # Nothing until indexed
+        else:
+            self.filtered_files = self.scanner.search(self.search_query)
+        self.view_top = 0
         self.clear_hint_buffer()  # Clear hints when search changes
         self.update_display()
+    
+    def toggle_global_search(self, event=None):
+        """Switch search between the current directory and the whole tree"""
+        self.global_search = not self.global_search
+        if self.global_search:
+            self.content_search = False
+            root = self.index_root or self.scanner.current_path
+            if self.global_index is None or self.global_index.root != root:
+                self.load_global_index(root)
+            self.enter_search_mode()
+        self.apply_search()
+        return "break"
+    
+    def toggle_content_search(self, event=None):
+        """Switch search between file names and file contents (SHIFT-T)"""
+        self.content_search = not self.content_search
+        if self.content_search:
+            self.global_search = False
+            self.enter_search_mode()
+        self.apply_search()
+        return "break"
+    
+    def start_grep(self, query):
+        """
+        Search file contents under the current directory
+        
+        Returns:
+            Listing that fills in as matches stream back (see poll_grep)
+        """
+        listing = Listing(self.scanner.current_path)
+        self.grep_lines = []
+        if len(query) >= GREP_MIN_QUERY:
+            from core.grep import GrepJob  # Pulls in multiprocessing, so not at startup
+            job = GrepJob(self.scanner.current_path, query).start()
+            self.grep_job = job
+            self.after(GREP_POLL_MS, lambda: self.poll_grep(job, listing))
+        return listing
+    
+    def poll_grep(self, job, listing):
+        """Append matches as they arrive (after() loop)"""
+        if job is not self.grep_job or job.cancelled and not job.truncated:
+            return  # Query changed, or search mode left
+        
+        found = job.poll()
+        if found:
+            shown = len(listing)
+            for name, size, modified, line_no, line in found:
+                listing.append(name, FLAG_FILE, size, modified)
+                self.grep_lines.append(f"{line_no}: {line}")
+            if shown < self.view_top + self.visible_row_count() + VIEW_OVERSCAN:
+                # New rows land on screen and need hints; rows below the
+                # view are only counted, so typed hints stay valid
+                self.render_rows()
+        self.status_label.config(text=self.status_text())
+        if not job.done:
+            self.after(GREP_POLL_MS, lambda: self.poll_grep(job, listing))
+    
+    def cancel_grep(self):
+        """Stop the content search in flight and drop its match lines"""
+        if self.grep_job is not None:
+            self.grep_job.cancel()
+            self.grep_job = None
+        self.grep_lines = None
+    
+    def load_global_index(self, root):
+        """Map the saved index for root, rebuilding it in the background if stale"""
+        if self.indexer is not None:
+            self.indexer.cancel()
+            self.indexer = None
+        if self.global_index is not None:
+            self.global_index.close()
+        
+        from core.indexer import INDEX_MAX_AGE, TreeIndex, TreeIndexer, index_path_for
+        self.global_index = TreeIndex.load(index_path_for(root))
+        stale = self.global_index is None or time.time() - self.global_index.built_at > INDEX_MAX_AGE
+        if self.daemon is not None and self.daemon.connected:
+            # The daemon keeps the index fresh from now on, for later windows
+            # too; it is asked (and polled) without blocking this thread
+            self.indexer = self.daemon.build_index(root, stale)
+        elif stale:
+            self.indexer = TreeIndexer(root).start()
+        if self.indexer is not None:
+            indexer = self.indexer
+            self.after(DAEMON_POLL_MS, lambda: self.poll_indexer(indexer))
+    
+    def poll_indexer(self, indexer):
+        """Swap in a freshly built index once the background walk finishes"""
+        if indexer is not self.indexer:
+            return  # Cancelled / superseded
+        if not indexer.done:
+            # A RemoteIndexer holds the daemon connection while it waits for
+            # an answer, so collect that soon; the walk itself is slow
+            delay = DAEMON_POLL_MS if getattr(indexer, 'asking', False) else INDEX_POLL_MS
+            self.after(delay, lambda: self.poll_indexer(indexer))
+            return
+        
+        self.indexer = None
+        if indexer.index is not None:
+            if self.global_index is not None:
+                self.global_index.close()
+            self.global_index = indexer.index
+        if self.global_search:
+            self.apply_search()
+    
+    def toggle_preview(self, event=None):
+        """Show or hide the preview pane beside the file list"""
+        if self.preview_pane is None:
+            from core.preview import PreviewLoader  # Not needed until first shown
+            self.preview_loader = PreviewLoader()
+            self.preview_pane = tk.Text(
+                self.list_frame,
+                bg='#181818',
+                fg='#d0d0d0',
+                font=('Consolas', 10),
+                width=PREVIEW_WIDTH,
+                relief=tk.FLAT,
+                bd=0,
+                highlightthickness=1,
+                highlightbackground='#333333',
+                wrap=tk.NONE,
+                padx=8,
+                state=tk.DISABLED
+            )
+            self.preview_pane.tag_configure('title', foreground='#00b4d8', font=('Consolas', 11, 'bold'))
+            self.preview_pane.tag_configure('muted', foreground='#6a6a6a')
+            self.render_preview("Preview", "Type a file's hint to preview it")
+        self.preview_shown = not self.preview_shown
+        if self.preview_shown:
+            self.preview_pane.pack(side=tk.RIGHT, fill=tk.Y, before=self.scrollbar)
+        else:
+            self.preview_pane.pack_forget()
+        return "break"
+    
+    def preview_hint(self, hint):
+        """
+        Preview the file under hint
+        
+        Returns:
+            False for folders, "..", and the file already previewed (the
+            caller then opens it as usual)
+        """
+        file = self.hint_target(hint)
+        if file is None or file.is_dir or file.path == self.preview_path:
+            return False
+        self.clear_hint_buffer()
+        self.preview_path = file.path
+        preview = self.preview_loader.request(file.path, file.modified)
+        if preview is not None:
+            self.show_preview(preview)  # Cached: no thread round trip
+        elif self.preview_pending is None:
+            # The old preview stays up until the new one is read (no flash);
+            # a poll already running picks up the new request instead
+            self.preview_pending = self.after(PREVIEW_POLL_MS, self.poll_preview)
+        return True
+    
+    def poll_preview(self):
+        """Show the requested preview once the worker has read it (after() loop)"""
+        self.preview_pending = None
+        preview = self.preview_loader.poll()
+        if preview is not None:
+            self.show_preview(preview)
+        elif self.preview_loader.wanted is not None:
+            self.preview_pending = self.after(PREVIEW_POLL_MS, self.poll_preview)
+    
+    def show_preview(self, preview):
+        self.render_preview(preview.path.name, preview.title, preview.text)
+    
+    def render_preview(self, name, title, text=""):
+        pane = self.preview_pane
+        pane.config(state=tk.NORMAL)
+        pane.delete('1.0', tk.END)
+        pane.insert(tk.END, f"{name}\n", 'title', f"{title}\n\n", 'muted', text)
+        pane.config(state=tk.DISABLED)
 
     def reveal_current_dir_in_explorer(self, event=None):
         """Open the current directory in the OS file explorer"""
         try:
             current_dir = self.scanner.current_path
+            import subprocess
             if sys.platform == 'win32':
                 os.startfile(current_dir)
             elif sys.platform == 'darwin':
@@ -460,9 +1374,38 @@ class LightningExplorer(tk.Tk):
             self.status_label.config(text=f"Revealed in Explorer: {current_dir}")
             self.after(2000, lambda: self.update_display())
         except Exception as e:
+            from tkinter import messagebox
             messagebox.showerror("Error", f"Could not open file explorer:\n{e}")
         return "break"
     
+    def toggle_perf_overlay(self, event=None):
+        """Show or hide span latencies and counters in the status bar (SHIFT-P)"""
+        self.perf_overlay = not self.perf_overlay
+        if self.perf_overlay:
+            self.poll_perf_overlay()
+        else:
+            self.status_label.config(text=self.status_text())
+        return "break"
+    
+    def poll_perf_overlay(self):
+        """Keep the overlay current while it is shown"""
+        if not self.perf_overlay:
+            return
+        self.status_label.config(text=self.status_text())
+        self.after(PERF_OVERLAY_MS, self.poll_perf_overlay)
+    
+    def dump_perf_trace(self, event=None):
+        """Write recent spans as a Chrome trace next to the indexes (F12)"""
+        from core.paths import index_dir
+        path = index_dir() / f"perf-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        try:
+            count = perf.dump(path)
+        except OSError as e:
+            self.status_label.config(text=f"⚠️ Could not write trace: {e}")
+            return "break"
+        self.status_label.config(text=f"Wrote {count} spans to {path}")
+        return "break"
+    
     
     def show_help(self, event=None):
         """Show help dialog"""
@@ -470,32 +1413,49 @@ class LightningExplorer(tk.Tk):
 Lightning Explorer - Vimium-Style Navigation
 
 HINT-BASED NAVIGATION:
-  Each file has a 2-letter hint like [aa], [ab], [kl]
+  Each visible file has a short hint like [a], [b], [za]
+  (one letter where possible, longer only when the screen needs it)
   
   Type hint to open:
-    - Type 'ab' → Opens/navigates to that file
+    - Type 'za' → Opens/navigates to that file
   
   Type 'r' + hint for actions menu:
-    - Type 'rab' → Opens keyboard menu with options:
+    - Type 'rza' → Opens keyboard menu with options:
       [o] Open    [c] Copy    [x] Cut
-      [v] Paste   [p] Copy Full Path
+      [v] Paste   [d] Delete  [p] Copy Full Path
+    - With a selection, copy/cut/delete act on all selected rows
   
 NAVIGATION:
   SHIFT-H or Backspace - Go to parent directory
   SHIFT-D              - Page down (scroll down)
   SHIFT-U              - Page up (scroll up)
   SHIFT-O              - Reveal current directory in File Explorer
+  SHIFT-X              - Cancel running copies/moves/deletes
+  SHIFT-S              - Next sort: name, natural, extension, date,
+                         size (measures folder totals)
+  SHIFT-F              - Find duplicate files under this directory
+  SHIFT-V              - Select mode: hints toggle selection
+  SHIFT-A / SHIFT-C    - Select all rows shown / clear selection
+  Delete               - Delete selection (r + hint, [d] also works)
   Esc                  - Clear current hint input
-  [aa],[ab]            - Type hint to open file/folder
-  r[aa],r[ab]          - Type 'r' + hint for actions
+  [a],[za]             - Type hint to open file/folder
+  r[a],r[za]           - Type 'r' + hint for actions
   
 SEARCH:
   /          - Enter search mode
   Type text  - Filter files in real-time
+  SHIFT-G    - Toggle global search (every file under the index root)
+  'text      - Exact substring match (trigram-indexed in global search)
+  SHIFT-T    - Toggle content search (files under this directory
+               containing the text; case-insensitive if all lowercase)
   Esc        - Exit search mode
   
 OTHER:
-  F5         - Refresh current directory
+  F5         - Rescan current directory (changes also show up live)
+  SHIFT-I    - Toggle preview pane: a file's hint previews it (text
+               head, image size), the same hint again opens it
+  SHIFT-P    - Toggle performance overlay (latest latencies, counters)
+  F12        - Dump recent timing spans (Chrome trace JSON)
   ?          - Show this help
   Right-click - Mouse context menu (if you prefer)
 
@@ -504,6 +1464,7 @@ TIP: Everything is keyboard accessible!
      Type 'r' then hint → actions menu
      No mouse needed!
         """
+        from tkinter import messagebox
         messagebox.showinfo("Lightning Explorer Help", help_text)
         return "break"
     
@@ -513,9 +1474,9 @@ TIP: Everything is keyboard accessible!
         line_index = self.file_listbox.index(f"@{event.x},{event.y}")
         line_num = int(float(line_index))
         
-        # Map line number to file
-        has_parent = self.scanner.current_path.parent != self.scanner.current_path
-        file_index = line_num - 1
+        # Map line number (within the rendered window) to file
+        has_parent = self.has_parent_row()
+        file_index = self.view_top + line_num - 1
         if has_parent:
             file_index -= 1
         
@@ -528,7 +1489,9 @@ TIP: Everything is keyboard accessible!
             self.right_clicked_file = None
         
         # Update paste menu state
-        if self.clipboard_file:
+        if self.context_menu is None:
+            self.create_context_menu()
+        if self.clipboard_files:
             self.context_menu.entryconfig("Paste", state=tk.NORMAL)
         else:
             self.context_menu.entryconfig("Paste", state=tk.DISABLED)
@@ -543,10 +1506,14 @@ TIP: Everything is keyboard accessible!
         """Show keyboard-accessible context menu overlay"""
         if not self.right_clicked_file:
             return
+        if self.selection:
+            subject = f"{len(self.selection)} selected"
+        else:
+            subject = self.right_clicked_file.name
         
         # Create overlay window
         overlay = tk.Toplevel(self)
-        overlay.title(f"Actions: {self.right_clicked_file.name}")
+        overlay.title(f"Actions: {subject}")
         overlay.geometry("400x250")
         overlay.configure(bg='#1e1e1e')
         overlay.transient(self)
@@ -561,7 +1528,7 @@ TIP: Everything is keyboard accessible!
         # Title
         title_label = tk.Label(
             overlay,
-            text=f"File: {self.right_clicked_file.name}",
+            text=f"File: {subject}",
             bg='#1e1e1e',
             fg='#00b4d8',
             font=('Consolas', 12, 'bold'),
@@ -578,11 +1545,12 @@ TIP: Everything is keyboard accessible!
             ('[o] Open', 'o', self.context_open),
             ('[c] Copy', 'c', self.context_copy),
             ('[x] Cut', 'x', self.context_cut),
+            ('[d] Delete', 'd', self.context_delete),
             ('[p] Copy Full Path', 'p', self.context_copy_path),
         ]
         
         # Add paste if clipboard has content
-        if self.clipboard_file:
+        if self.clipboard_files:
             options.append(('[v] Paste', 'v', self.context_paste))
         
         # Create option labels
@@ -651,68 +1619,116 @@ TIP: Everything is keyboard accessible!
                 if sys.platform == 'win32':
                     os.startfile(self.right_clicked_file.path)
                 else:
+                    import subprocess
                     subprocess.call(['xdg-open', str(self.right_clicked_file.path)])
             except Exception as e:
+                from tkinter import messagebox
                 messagebox.showerror("Error", f"Could not open file:\n{e}")
     
     def context_copy(self):
-        """Copy file to clipboard"""
-        if not self.right_clicked_file:
-            return
-        
-        self.clipboard_file = self.right_clicked_file
-        self.clipboard_operation = 'copy'
-        self.status_label.config(text=f"Copied: {self.right_clicked_file.name}")
-        self.after(2000, lambda: self.update_display())
+        """Copy file(s) to clipboard"""
+        self.set_clipboard('copy', "Copied")
     
     def context_cut(self):
-        """Cut file to clipboard"""
-        if not self.right_clicked_file:
+        """Cut file(s) to clipboard"""
+        self.set_clipboard('cut', "Cut")
+    
+    def set_clipboard(self, operation, verb):
+        """Put the action targets on the clipboard (the selection is consumed)"""
+        targets = self.action_targets()
+        if not targets:
             return
         
-        self.clipboard_file = self.right_clicked_file
-        self.clipboard_operation = 'cut'
-        self.status_label.config(text=f"Cut: {self.right_clicked_file.name}")
+        self.clipboard_files = targets
+        self.clipboard_operation = operation
+        self.selection.clear()
+        what = targets[0].name if len(targets) == 1 else f"{len(targets)} items"
+        self.update_display()
+        self.status_label.config(text=f"{verb}: {what}")
         self.after(2000, lambda: self.update_display())
     
     def context_paste(self):
-        """Paste file from clipboard"""
-        if not self.clipboard_file:
+        """Paste clipboard files (one batch, copied/moved on a background thread)"""
+        if not self.clipboard_files:
             return
         
-        source_path = self.clipboard_file.path
+        sources = self.clipboard_files
         dest_dir = self.scanner.current_path
-        dest_path = dest_dir / self.clipboard_file.name
         
-        try:
-            # Check if destination already exists
-            if dest_path.exists():
-                # Ask for confirmation to overwrite
-                response = messagebox.askyesno(
-                    "File Exists",
-                    f"{dest_path.name} already exists.\nOverwrite?"
-                )
-                if not response:
-                    return
-            
-            # Perform copy or move
-            if self.clipboard_operation == 'copy':
-                if source_path.is_dir():
-                    shutil.copytree(source_path, dest_path, dirs_exist_ok=True)
-                else:
-                    shutil.copy2(source_path, dest_path)
-                self.status_label.config(text=f"Copied: {self.clipboard_file.name}")
-            elif self.clipboard_operation == 'cut':
-                shutil.move(str(source_path), str(dest_path))
-                self.status_label.config(text=f"Moved: {self.clipboard_file.name}")
-                self.clipboard_file = None  # Clear clipboard after cut
-                self.clipboard_operation = None
-            
-            # Refresh the display
-            self.refresh_files()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not paste file:\n{e}")
+        # Check all destinations at once (from the listing, no stat per file)
+        existing = self.current_files.names if self.scan_job is None else None
+        from core.file_ops import FileOperation, find_conflicts
+        conflicts = find_conflicts(sources, dest_dir, existing)
+        if conflicts:
+            # Ask for confirmation to overwrite
+            names = "\n".join(path.name for path in conflicts[:10])
+            if len(conflicts) > 10:
+                names += f"\n... and {len(conflicts) - 10} more"
+            from tkinter import messagebox
+            response = messagebox.askyesno(
+                "File Exists",
+                f"{len(conflicts)} item(s) already exist:\n{names}\nOverwrite?"
+            )
+            if not response:
+                return
+        
+        # Queue the copy or move; one refresh shows the result when it is done
+        kind = 'move' if self.clipboard_operation == 'cut' else 'copy'
+        self.submit_file_op(FileOperation(kind, sources, dest_dir))
+        if kind == 'move':
+            self.clipboard_files = []  # Clear clipboard after cut
+            self.clipboard_operation = None
+    
+    def context_delete(self, from_menu=True):
+        """Permanently delete the selection (or the chosen file) after confirming"""
+        targets = self.action_targets(from_menu)
+        if not targets:
+            return
+        what = targets[0].name if len(targets) == 1 else f"{len(targets)} items"
+        from tkinter import messagebox
+        if not messagebox.askyesno("Delete", f"Permanently delete {what}?"):
+            return
+        self.selection.clear()
+        from core.file_ops import FileOperation
+        self.submit_file_op(FileOperation('delete', targets))
+    
+    def submit_file_op(self, job):
+        """Queue a file operation and show its progress"""
+        if self.file_ops is None:
+            from core.file_ops import OperationQueue
+            self.file_ops = OperationQueue()
+        self.file_ops.submit(job)
+        self.update_display()
+        if not self.file_ops_polling:
+            self.poll_file_ops()
+    
+    def active_file_ops(self):
+        """File operations queued or running (none before the first is submitted)"""
+        return self.file_ops.active() if self.file_ops is not None else []
+    
+    def poll_file_ops(self):
+        """Show copy/move progress in the status bar (after() loop)"""
+        active = self.file_ops.active()  # Before reaping, so no finish is missed
+        for job in self.file_ops.take_finished():
+            if job.errors:
+                errors = "\n".join(job.errors[:10])
+                from tkinter import messagebox
+                messagebox.showerror("Error", f"{job.summary()}:\n{errors}")
+            self.status_label.config(text=job.summary())
+            if self.duplicate_view is not None:
+                self.prune_duplicates()
+        
+        self.file_ops_polling = bool(active)
+        if active:
+            self.status_label.config(text=self.status_text())
+            self.after(FILE_OP_POLL_MS, self.poll_file_ops)
+    
+    def cancel_file_ops(self, event=None):
+        """Cancel queued and running copies/moves"""
+        if self.active_file_ops():
+            self.file_ops.cancel_all()
+            self.status_label.config(text="Cancelling file operations...")
+        return "break"
     
     def context_copy_path(self):
         """Copy full file path to clipboard"""
@@ -726,12 +1742,13 @@ TIP: Everything is keyboard accessible!
             self.status_label.config(text=f"Path copied: {self.right_clicked_file.path}")
             self.after(2000, lambda: self.update_display())
         except Exception as e:
+            from tkinter import messagebox
             messagebox.showerror("Error", f"Could not copy path:\n{e}")
 
 
-def main():
-    """Entry point for Lightning Explorer"""
-    app = LightningExplorer()
+def main(started_ns=None):
+    """Entry point for Lightning Explorer (started_ns: launch time, for the startup budget)"""
+    app = LightningExplorer(started_ns)
     app.mainloop()
 
 
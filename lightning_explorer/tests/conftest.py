@@ -0,0 +1,7 @@
+"""
+Shared test setup: the app imports its modules from src/ (as main.py does)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
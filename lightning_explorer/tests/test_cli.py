@@ -0,0 +1,37 @@
+"""
+Tests for the headless command line (cli.py)
+"""
+import json
+
+import pytest
+
+from cli import main, name_matcher
+
+
+# 'İ'.lower() is two characters long, so positions shift after folding
+UNICODE_NAME = 'İab'
+
+
+def test_name_matcher_handles_names_that_change_length_when_lowered():
+    score = name_matcher('ab')
+    assert len(UNICODE_NAME.lower()) != len(UNICODE_NAME)
+    assert score(UNICODE_NAME) is not None
+    assert score('xyz') is None
+
+
+def test_name_matcher_exact_substring():
+    score = name_matcher("'AB")
+    assert score('xaby') == 0
+    assert score('a_b') is None
+
+
+@pytest.mark.parametrize('recursive', [False, True])
+def test_search_unicode_name(tmp_path, capsys, recursive):
+    (tmp_path / UNICODE_NAME).touch()
+    (tmp_path / 'other').touch()
+    argv = ['search', 'ab', str(tmp_path)] + (['-r'] if recursive else [])
+    
+    assert main(argv) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record['name'] for record in records] == [UNICODE_NAME]
+    assert isinstance(records[0]['score'], int)
@@ -0,0 +1,160 @@
+"""
+Tests for the resident daemon and its non-blocking client (core/daemon.py)
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from core.daemon import DaemonClient, ExplorerDaemon
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason="Unix socket address")
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    server = ExplorerDaemon()
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    for _ in range(200):
+        client = DaemonClient.connect()
+        if client is not None:
+            break
+        time.sleep(0.01)
+    else:
+        pytest.fail("daemon did not start")
+    yield client
+    client.close()
+    server.stop()
+    thread.join(5)
+
+
+def settle(*paths):
+    """Backdate mtimes past the racy window, so listings can be cached"""
+    past = time.time() - 60
+    for path in paths:
+        os.utime(path, (past, past))
+
+
+def wait_for_listing(client, path):
+    for _ in range(500):
+        ready, fetched = client.listing_reply(path)
+        if ready:
+            return fetched
+        time.sleep(0.01)
+    pytest.fail("no reply")
+
+
+def test_listing_is_sent_without_waiting(daemon, tmp_path):
+    root = tmp_path / 'tree'
+    (root / 'sub').mkdir(parents=True)
+    (root / 'b.txt').write_text('b')
+    settle(root)
+    
+    assert daemon.send_listing(root)
+    assert daemon.pending
+    listing, with_stat, mtime_ns = wait_for_listing(daemon, root)
+    
+    assert not daemon.pending
+    assert [entry.name for entry in listing] == ['sub', 'b.txt']
+    assert with_stat and mtime_ns == os.stat(root).st_mtime_ns
+
+
+def test_second_request_waits_for_the_first_reply(daemon, tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    first.mkdir()
+    second.mkdir()
+    (second / 'only.txt').touch()
+    settle(first, second)
+    
+    assert daemon.send_listing(first)
+    assert not daemon.send_listing(second)  # Refused, not dropping first's reply
+    assert wait_for_listing(daemon, first)[0].root == first
+    assert daemon.send_listing(second)
+    listing, _, _ = wait_for_listing(daemon, second)
+    assert [entry.name for entry in listing] == ['only.txt']
+
+
+def test_send_never_reopens_a_dropped_connection(daemon, tmp_path):
+    daemon.close()
+    assert not daemon.send_listing(tmp_path)
+    assert not daemon.connected
+    assert daemon.request('status', timeout=5) is not None  # Blocking callers reopen
+    assert daemon.connected
+
+
+def test_abandoned_request_is_not_read_as_the_next_reply(daemon, tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    first.mkdir()
+    second.mkdir()
+    settle(first, second)
+    
+    assert daemon.send_listing(first)
+    status = daemon.request('status', timeout=5)  # Drops the connection with first's reply
+    assert status['pid'] == os.getpid()
+
+
+def test_slow_directory_does_not_hold_up_other_windows(daemon, tmp_path, monkeypatch):
+    slow, fast = tmp_path / 'slow', tmp_path / 'fast'
+    slow.mkdir()
+    fast.mkdir()
+    settle(slow, fast)
+    release = threading.Event()
+    scandir = os.scandir
+    
+    def stalling_scandir(path):
+        if str(path) == str(slow):
+            release.wait(5)
+        return scandir(path)
+    
+    monkeypatch.setattr(os, 'scandir', stalling_scandir)
+    other = DaemonClient.connect()
+    try:
+        assert other.send_listing(slow)
+        time.sleep(0.05)  # The daemon is now stuck listing slow
+        assert daemon.request('list', str(fast), True, timeout=1) is not None
+        assert not other.reply()[0]
+    finally:
+        release.set()
+        other.close()
+
+
+def test_remote_indexer_polls_without_blocking(daemon, tmp_path):
+    root = tmp_path / 'tree'
+    (root / 'sub').mkdir(parents=True)
+    (root / 'sub' / 'file.txt').touch()
+    indexer = daemon.build_index(root)
+    
+    for _ in range(500):
+        if indexer.done:
+            break
+        time.sleep(0.01)
+    else:
+        pytest.fail("index never finished")
+    assert not daemon.pending
+    assert indexer.index is not None
+    assert indexer.index.root == root
+    indexer.index.close()
+
+
+def test_remote_indexer_falls_back_to_a_local_walk(daemon, tmp_path):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    (root / 'file.txt').touch()
+    daemon.close()  # Daemon gone
+    indexer = daemon.build_index(root, stale=True)
+    
+    for _ in range(500):
+        if indexer.done:
+            break
+        time.sleep(0.01)
+    assert indexer.index is not None
+    indexer.index.close()
+
+
+def test_blocking_request(daemon):
+    status = daemon.request('status', timeout=5)
+    assert status['pid'] == os.getpid()
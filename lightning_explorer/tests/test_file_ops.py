@@ -0,0 +1,79 @@
+"""
+Tests for background file operations (core/file_ops.py)
+"""
+import errno
+import os
+
+from core.file_ops import FileOperation
+
+
+def make_folder(path):
+    (path / 'sub').mkdir(parents=True)
+    (path / 'file.txt').write_text('data')
+    (path / 'sub' / 'inner.txt').write_text('inner')
+    return path
+
+
+def test_move_into_own_subfolder_is_refused(tmp_path):
+    folder = make_folder(tmp_path / 'X')
+    job = FileOperation('move', [folder], folder / 'sub')
+    job.run()
+    
+    assert job.state == 'failed'
+    assert 'into itself' in job.errors[0]
+    assert (folder / 'file.txt').read_text() == 'data'
+    assert (folder / 'sub' / 'inner.txt').read_text() == 'inner'
+    assert not (folder / 'sub' / 'X').exists()
+
+
+def test_copy_into_own_folder_is_refused(tmp_path):
+    folder = make_folder(tmp_path / 'X')
+    job = FileOperation('copy', [folder], folder)
+    job.run()
+    
+    assert job.state == 'failed'
+    assert sorted(os.listdir(folder)) == ['file.txt', 'sub']
+
+
+def test_move_renames_within_a_filesystem(tmp_path):
+    folder = make_folder(tmp_path / 'X')
+    dest = tmp_path / 'dest'
+    dest.mkdir()
+    job = FileOperation('move', [folder], dest)
+    job.run()
+    
+    assert job.state == 'done'
+    assert not folder.exists()
+    assert (dest / 'X' / 'sub' / 'inner.txt').read_text() == 'inner'
+
+
+def test_move_merges_into_existing_folder(tmp_path):
+    folder = make_folder(tmp_path / 'X')
+    dest = tmp_path / 'dest'
+    (dest / 'X').mkdir(parents=True)
+    (dest / 'X' / 'kept.txt').write_text('kept')
+    job = FileOperation('move', [folder], dest)
+    job.run()
+    
+    assert job.state == 'done'
+    assert not folder.exists()
+    assert sorted(os.listdir(dest / 'X')) == ['file.txt', 'kept.txt', 'sub']
+
+
+def test_move_reports_rename_errors_instead_of_copying(tmp_path, monkeypatch):
+    folder = make_folder(tmp_path / 'X')
+    dest = tmp_path / 'dest'
+    dest.mkdir()
+    
+    def refuse(source, target):
+        raise OSError(errno.EACCES, 'Permission denied', str(source))
+    
+    monkeypatch.setattr(os, 'replace', refuse)
+    monkeypatch.setattr(os, 'rename', refuse)
+    job = FileOperation('move', [folder], dest)
+    job.run()
+    
+    assert job.state == 'failed'
+    assert 'Permission denied' in job.errors[0]
+    assert (folder / 'file.txt').exists()
+    assert not (dest / 'X').exists()
@@ -0,0 +1,186 @@
+"""
+Tests for the scanner, its background scan jobs and the listing cache
+(core/file_scanner.py)
+"""
+import errno
+import os
+import time
+
+import pytest
+
+from core import file_scanner
+from core.file_scanner import LISTING_CACHE_RACY_SECONDS, FileScanner, ListingCache
+from core.fuzzy import FuzzyIndex
+
+
+NAMES = ['main_window.py', 'file_scanner.py', 'README.md', 'notes.txt', 'mwin.cfg', 'Makefile']
+
+
+def settle(path, age=60):
+    """Backdate a directory's mtime past the racy window"""
+    past = time.time() - age
+    os.utime(path, (past, past))
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for name in NAMES:
+        (tmp_path / name).touch()
+    (tmp_path / 'subdir').mkdir()
+    settle(tmp_path)
+    return tmp_path
+
+
+def run_job(scanner, **kwargs):
+    job = scanner.scan_async(**kwargs)
+    assert job.wait(5)
+    job.poll()
+    assert job.done
+    return job
+
+
+# Listing cache
+
+def test_recently_changed_directory_is_not_cached(folder):
+    scanner = FileScanner()
+    now = time.time()
+    os.utime(folder, (now, now))
+    scanner.scan(folder)
+    assert folder not in scanner.cache  # mtime inside LISTING_CACHE_RACY_SECONDS
+
+
+def test_settled_directory_is_cached_until_it_changes(folder):
+    scanner = FileScanner()
+    listing = scanner.scan(folder)
+    assert folder in scanner.cache
+    assert scanner.scan(folder) is listing
+    assert scanner.last_stats.cached
+    
+    (folder / 'new.txt').touch()
+    settle(folder, age=30)  # Changed, but no longer racy
+    rescanned = scanner.scan(folder)
+    assert rescanned is not listing
+    assert 'new.txt' in rescanned.names
+
+
+def test_cache_put_rejects_racy_mtime(folder):
+    cache = ListingCache()
+    listing = FileScanner().scan(folder, use_cache=False)
+    scanned_at = time.time()
+    racy_ns = int((scanned_at - LISTING_CACHE_RACY_SECONDS / 2) * 1e9)
+    cache.put(folder, listing, True, racy_ns, scanned_at)
+    assert folder not in cache
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    dirs = []
+    for i in range(3):
+        path = tmp_path / str(i)
+        path.mkdir()
+        settle(path)
+        dirs.append(path)
+    cache = ListingCache(max_entries=2)
+    scanner = FileScanner()
+    scanner.cache = cache
+    for path in dirs[:2]:
+        scanner.scan(path)
+    scanner.scan(dirs[0])  # Touch: dirs[1] is now the oldest
+    scanner.scan(dirs[2])
+    assert dirs[0] in cache and dirs[2] in cache and dirs[1] not in cache
+
+
+# Background scans
+
+def test_scan_job_matches_scan(folder):
+    scanner = FileScanner()
+    job = run_job(scanner, path=folder, use_cache=False)
+    assert list(job.listing.names) == list(FileScanner().scan(folder, use_cache=False).names)
+    assert job.error is None
+    assert folder in scanner.cache
+
+
+def test_scan_job_failing_part_way_is_not_cached(folder, monkeypatch):
+    real_scandir = os.scandir
+    
+    class FailingScandir:
+        """Yields two entries, then fails like a flaky filesystem"""
+        
+        def __init__(self, path):
+            self.it = real_scandir(path)
+        
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc):
+            self.it.close()
+        
+        def __iter__(self):
+            for n, entry in enumerate(self.it):
+                if n == 2:
+                    raise OSError(errno.EIO, "I/O error")
+                yield entry
+    
+    monkeypatch.setattr(file_scanner.os, 'scandir', FailingScandir)
+    scanner = FileScanner()
+    job = run_job(scanner, path=folder, use_cache=False)
+    
+    assert isinstance(job.error, OSError)
+    assert len(job.listing) == 2  # What was listed is still shown
+    assert folder not in scanner.cache
+
+
+# Search
+
+def test_search_ranks_boundary_matches_first(folder):
+    scanner = FileScanner()
+    scanner.scan(folder)
+    names = [entry.name for entry in scanner.search('mwin')]
+    assert names[0] == 'mwin.cfg'
+    assert 'main_window.py' in names
+    assert 'notes.txt' not in names
+
+
+def test_exact_substring_search(folder):
+    scanner = FileScanner()
+    scanner.scan(folder)
+    assert [entry.name for entry in scanner.search("'scan")] == ['file_scanner.py']
+
+
+@pytest.mark.parametrize('typed', [['m', 'ma', 'mak'], ['n', 'no', 'n'], ['f', 'fi', 'fil', 'fi']])
+def test_narrowed_search_matches_a_fresh_search(folder, typed):
+    scanner = FileScanner()
+    scanner.scan(folder)
+    for query in typed:
+        narrowed = [entry.name for entry in scanner.search(query)]
+        fresh = FileScanner()
+        fresh.scan(folder)
+        assert narrowed == [entry.name for entry in fresh.search(query)], query
+
+
+def test_narrowing_is_dropped_when_the_listing_changes(folder):
+    scanner = FileScanner()
+    scanner.scan(folder)
+    assert [entry.name for entry in scanner.search('zz')] == []
+    (folder / 'zz_top.txt').touch()
+    scanner.apply_changes(['zz_top.txt'])
+    assert [entry.name for entry in scanner.search('zzt')] == ['zz_top.txt']
+
+
+def test_extended_query_only_retests_previous_matches(folder, monkeypatch):
+    calls = []
+    real_candidates = FuzzyIndex.candidates
+    
+    def spy(self, query, within=None):
+        calls.append((query, None if within is None else list(within)))
+        return real_candidates(self, query, within)
+    
+    monkeypatch.setattr(FuzzyIndex, 'candidates', spy)
+    scanner = FileScanner()
+    scanner.scan(folder)
+    first = scanner.search('ma')
+    scanner.search('mak')
+    scanner.search('m')  # Shorter: starts over
+    
+    assert calls[0] == ('ma', None)
+    assert calls[1][0] == 'mak' and len(calls[1][1]) == len(first)
+    assert calls[2] == ('m', None)
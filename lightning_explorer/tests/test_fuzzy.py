@@ -0,0 +1,65 @@
+"""
+Tests for the fuzzy matcher (core/fuzzy.py)
+"""
+from core.fuzzy import FuzzyIndex, folded_bonuses, fuzzy_score, position_bonuses
+
+
+def score(name, query):
+    return fuzzy_score(name.lower(), query, position_bonuses(name))
+
+
+def index_of(names):
+    return FuzzyIndex(names, [name.lower() for name in names])
+
+
+def test_subsequence_or_none():
+    assert score('main_window.py', 'mwin') is not None
+    assert score('main_window.py', 'niwm') is None
+    assert score('abc', 'abcd') is None
+
+
+def test_boundaries_and_runs_score_higher():
+    assert score('main_window.py', 'win') > score('rewind.py', 'win')
+    assert score('MainWindow', 'mw') > score('mawwindow', 'mw')  # camelCase boundary
+    assert score('abc_xyz', 'abc') > score('axbxc', 'abc')  # Consecutive run
+
+
+def test_folded_bonuses_when_lower_changes_length():
+    name = 'İab'  # lower() is 4 characters
+    folded = name.lower()
+    assert len(folded_bonuses(name, folded)) == len(folded)
+    assert fuzzy_score(folded, 'ab', folded_bonuses(name, folded)) is not None
+    assert folded_bonuses('MainWindow', 'mainwindow') == position_bonuses('MainWindow')
+
+
+def test_candidates_full_scan_and_narrowed_agree():
+    names = ['report.txt', 'rePort_old', 'notes', 'a\nrep', 'Ｒep', 'prefix']
+    index = index_of(names)
+    for query in ('rep', 're', 'p', 'ep', 'x'):
+        everything = range(len(names))
+        assert index.candidates(query) == index.candidates(query, within=everything), query
+
+
+def test_multiline_names_do_not_match_across_rows():
+    index = index_of(['ab', 'c\nd', 'xyz'])
+    assert index.candidates('bc') == []  # Not 'ab' + 'c' joined across rows
+    assert index.candidates('cd') == [1]
+
+
+def test_exact_substring_candidates():
+    index = index_of(['a_b', 'ab', 'xaby'])
+    assert index.candidates("'ab") == [1, 2]
+
+
+def test_rank_orders_best_first_and_keeps_unscored_tail():
+    names = ['xxmxxwxx', 'mwin', 'main_window.py']
+    index = index_of(names)
+    candidates = index.candidates('mw')
+    ranked, scored = index.rank('mw', candidates)
+    assert scored == len(candidates)
+    assert ranked[0] == 1
+    assert sorted(ranked) == candidates
+    
+    unranked, scored = index.rank('mw', candidates, budget_ms=-1)  # Budget already spent
+    assert scored == 0
+    assert unranked == candidates
@@ -0,0 +1,42 @@
+"""
+Tests for content search (core/grep.py); the batch function runs in-process
+"""
+from core import grep
+from core.grep import _grep_batch
+
+
+def test_reports_first_matching_line(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'alpha\nbeta\n  Needle here  \nneedle again\n')
+    found, errors = _grep_batch([str(path)], b'needle', ignore_case=True)
+    assert errors == 0
+    assert [(line_no, text) for _, _, _, line_no, text in found] == [(3, 'Needle here')]
+
+
+def test_case_sensitive_and_misses(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'Needle\nneedle\n')
+    found, _ = _grep_batch([str(path)], b'needle', ignore_case=False)
+    assert [record[3] for record in found] == [2]
+    found, _ = _grep_batch([str(path)], b'absent', ignore_case=False)
+    assert found == []
+
+
+def test_skips_binary_and_empty_files_and_counts_errors(tmp_path):
+    binary = tmp_path / 'blob.bin'
+    binary.write_bytes(b'needle\0')
+    empty = tmp_path / 'empty.txt'
+    empty.touch()
+    found, errors = _grep_batch([str(binary), str(empty), str(tmp_path / 'missing')],
+                                b'needle', ignore_case=False)
+    assert found == []
+    assert errors == 1
+
+
+def test_line_numbers_across_count_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(grep, 'GREP_COUNT_CHUNK', 7)  # Chunk edges fall mid-line
+    path = tmp_path / 'long.txt'
+    path.write_bytes(b''.join(b'line %d\n' % i for i in range(1, 500)) + b'the needle\n')
+    found, _ = _grep_batch([str(path)], b'needle', ignore_case=False)
+    assert found[0][3] == 500
+    assert found[0][4] == 'the needle'
@@ -0,0 +1,57 @@
+"""
+Tests for hint labels and the hint prefix tree (ui/hints.py)
+"""
+import pytest
+
+from ui.hints import HINT_CHARS, hint_labels, hint_trie
+
+
+def is_prefix_free(labels):
+    ordered = sorted(labels)
+    return all(not b.startswith(a) for a, b in zip(ordered, ordered[1:]))
+
+
+@pytest.mark.parametrize('count', [0, 1, 25, 26, 100, 676, 677, 5000, 20000])
+def test_labels_are_distinct_and_prefix_free(count):
+    labels = hint_labels(count)
+    assert len(labels) == count
+    assert len(set(labels)) == count
+    assert is_prefix_free(labels)
+    assert all(set(label) <= set(HINT_CHARS) for label in labels)
+
+
+def test_r_is_reserved_for_actions():
+    assert not any('r' in label for label in hint_labels(1000))
+
+
+def test_top_rows_get_the_shortest_labels():
+    labels = hint_labels(100)
+    lengths = [len(label) for label in labels]
+    assert lengths == sorted(lengths)
+    assert labels[:3] == ('a', 'b', 'c')
+    assert max(lengths) == 2
+
+
+def test_label_length_grows_logarithmically():
+    assert max(len(label) for label in hint_labels(len(HINT_CHARS) ** 2)) == 2
+    assert max(len(label) for label in hint_labels(len(HINT_CHARS) ** 2 + 1)) == 3
+
+
+def test_trie_resolves_every_label():
+    labels = hint_labels(800)
+    trie = hint_trie(800)
+    for label in labels:
+        node = trie.find(label)
+        assert node is not None and node.is_leaf and node.label == label
+    assert sorted(trie.labels()) == sorted(labels)
+
+
+def test_trie_cursor_narrows_one_key_at_a_time():
+    trie = hint_trie(800)
+    node = trie.child('z')
+    assert node is not None and not node.is_leaf  # Ambiguous: wait for more keys
+    below = set(node.labels())
+    assert below and all(label.startswith('z') for label in below)
+    assert trie.child('r') is None  # No label starts with the actions key
+    assert trie.find('aa').is_leaf  # 800 labels: none is a single letter
+    assert trie.find('zzzz') is None
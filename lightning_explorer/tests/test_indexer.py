@@ -0,0 +1,107 @@
+"""
+Tests for the recursive filename index (core/indexer.py)
+"""
+from core.indexer import TreeIndex, TreeIndexer
+
+
+def make_tree(root):
+    (root / 'src' / 'core').mkdir(parents=True)
+    (root / 'docs').mkdir()
+    for path in ('src/main_window.py', 'src/core/file_scanner.py', 'docs/README.md', 'top.txt'):
+        (root / path).touch()
+
+
+def build(root, tmp_path):
+    indexer = TreeIndexer(root, index_file=tmp_path / 'tree.lei', workers=2)
+    index = indexer.build()
+    index.save(indexer.index_file)
+    return index, indexer.index_file
+
+
+def names(listing):
+    return sorted(entry.name for entry in listing)
+
+
+def test_substring_search_uses_trigrams(tmp_path):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    make_tree(root)
+    index, _ = build(root, tmp_path)
+    
+    assert index.trigrams is not None
+    assert names(index.search("'scan")) == ['src/core/file_scanner.py']
+    assert names(index.search("'py")) == ['src/core/file_scanner.py', 'src/main_window.py']
+
+
+def test_loaded_index_answers_the_same(tmp_path):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    make_tree(root)
+    built, path = build(root, tmp_path)
+    
+    loaded = TreeIndex.load(path)
+    try:
+        assert loaded.trigrams is not None
+        for query in ("'scan", "'readme", 'mwin', 'tt'):
+            assert names(loaded.search(query)) == names(built.search(query))
+    finally:
+        loaded.close()
+
+
+def test_apply_changes_patches_a_loaded_index(tmp_path):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    make_tree(root)
+    _, path = build(root, tmp_path)
+    
+    index = TreeIndex.load(path)
+    try:
+        (root / 'src' / 'notes_scanner.txt').touch()
+        (root / 'src' / 'main_window.py').unlink()
+        assert index.apply_changes(root / 'src', ['notes_scanner.txt', 'main_window.py']) == (1, 1)
+        
+        assert names(index.search("'scan")) == ['src/core/file_scanner.py', 'src/notes_scanner.txt']
+        assert names(index.search('mwin')) == []
+        assert names(index.search('notes')) == ['src/notes_scanner.txt']
+    finally:
+        index.close()
+
+
+def test_removed_folder_takes_its_contents_along(tmp_path):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    make_tree(root)
+    index, _ = build(root, tmp_path)
+    
+    import shutil
+    shutil.rmtree(root / 'src')
+    assert index.apply_changes(root, ['src']) == (0, 4)
+    assert names(index.search("'py")) == []
+    assert index.dir_row(root / 'src' / 'core') is None
+
+
+def test_new_folder_is_walked(tmp_path):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    make_tree(root)
+    index, _ = build(root, tmp_path)
+    
+    (root / 'docs' / 'guide' / 'deep').mkdir(parents=True)
+    (root / 'docs' / 'guide' / 'deep' / 'howto.md').touch()
+    assert index.apply_changes(root / 'docs', None) == (3, 0)  # Resync the folder
+    assert names(index.search("'howto")) == ['docs/guide/deep/howto.md']
+    assert index.apply_changes(root / 'docs', None) == (0, 0)  # Nothing new
+
+
+def test_changes_outside_the_index_or_too_big(tmp_path, monkeypatch):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    make_tree(root)
+    index, _ = build(root, tmp_path)
+    assert index.apply_changes(tmp_path, ['tree']) == (0, 0)
+    
+    import core.indexer
+    monkeypatch.setattr(core.indexer, 'INDEX_PATCH_MAX_ROWS', 2)
+    for n in range(5):
+        (root / f'new{n}.txt').touch()
+    assert index.apply_changes(root, None) is None  # Re-index instead
@@ -0,0 +1,50 @@
+"""
+Tests for the idle-time prefetcher (core/prefetch.py)
+"""
+import os
+import time
+
+from core.file_scanner import ListingCache
+from core.prefetch import Prefetcher
+
+
+def make_dir(path, sizes):
+    path.mkdir()
+    for name, size in sizes.items():
+        (path / name).write_bytes(b'x' * size)
+    past = time.time() - 60
+    os.utime(path, (past, past))  # Past the racy window, so it can be cached
+    return path
+
+
+def prefetch(prefetcher, paths, sort_mode='name'):
+    prefetcher.request(paths, sort_mode)
+    deadline = time.monotonic() + 5
+    while prefetcher.busy and time.monotonic() < deadline:
+        prefetcher.poll()
+        time.sleep(0.01)
+    prefetcher.poll()
+
+
+def test_listings_are_cached_in_the_scanner_sort_mode(tmp_path):
+    folder = make_dir(tmp_path / 'a', {'small.txt': 1, 'big.txt': 300, 'mid.txt': 20})
+    cache = ListingCache()
+    prefetch(Prefetcher(cache), [folder], sort_mode='size')
+    
+    listing = cache.get(folder)
+    assert listing is not None
+    assert listing.sort_mode == 'size'
+    assert [entry.name for entry in listing] == ['big.txt', 'mid.txt', 'small.txt']
+
+
+def test_rank_prefers_visited_and_skips_cached(tmp_path):
+    a = make_dir(tmp_path / 'a', {})
+    b = make_dir(tmp_path / 'b', {})
+    c = make_dir(tmp_path / 'c', {})
+    cache = ListingCache()
+    prefetcher = Prefetcher(cache)
+    prefetcher.note_visit(c)
+    assert prefetcher.rank([a, b, c]) == [c, a, b]
+    
+    prefetch(prefetcher, [a])
+    assert prefetcher.rank([a, b, c]) == [c, b]
@@ -0,0 +1,125 @@
+"""
+Tests for file previews (core/preview.py) and the pane's poll loop
+"""
+import struct
+import time
+from pathlib import Path
+
+from core.preview import Preview, PreviewCache, PreviewLoader, image_info, read_preview
+
+
+def test_text_preview(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('one\n\ttwo\nthree\n')
+    preview = read_preview(path)
+    assert preview.kind == 'text'
+    assert preview.text == 'one\n    two\nthree'
+    assert '3 lines' in preview.title
+
+
+def test_long_text_is_cut_to_the_head(tmp_path):
+    path = tmp_path / 'big.log'
+    path.write_text(''.join(f"line {i}\n" for i in range(100000)))
+    preview = read_preview(path, max_bytes=1000)
+    assert preview.kind == 'text'
+    assert preview.text.startswith('line 0\nline 1\n')
+    assert 'first' in preview.title
+
+
+def test_binary_empty_and_missing(tmp_path):
+    binary = tmp_path / 'blob.bin'
+    binary.write_bytes(b'\0\1\2abc')
+    assert read_preview(binary).kind == 'binary'
+    empty = tmp_path / 'empty'
+    empty.touch()
+    assert read_preview(empty).kind == 'empty'
+    missing = read_preview(tmp_path / 'missing')
+    assert missing.kind == 'error' and missing.modified == 0.0
+
+
+def test_png_dimensions():
+    head = b'\x89PNG\r\n\x1a\n' + struct.pack('>I4sII', 13, b'IHDR', 640, 480)
+    assert image_info(head) == ('PNG', 640, 480)
+    assert image_info(b'plain text') is None
+
+
+def test_cache_is_keyed_on_mtime_and_bounded():
+    cache = PreviewCache(max_entries=2)
+    a, b, c = Path('a'), Path('b'), Path('c')
+    for path in (a, b):
+        cache.put(path, 1.0, Preview(path, 1.0, 'text', 'title'))
+    assert cache.get(a, 1.0) is not None
+    assert cache.get(a, 2.0) is None  # Rewritten since: a miss
+    cache.put(c, 1.0, Preview(c, 1.0, 'text', 'title'))
+    assert cache.get(b, 1.0) is None  # Least recently used
+    assert len(cache) == 2
+
+
+def wait_for_preview(loader):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        preview = loader.poll()
+        if preview is not None:
+            return preview
+        time.sleep(0.01)
+    raise AssertionError("preview never arrived")
+
+
+def test_loader_reads_once_then_serves_from_cache(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('hello')
+    modified = path.stat().st_mtime
+    loader = PreviewLoader()
+    
+    assert loader.request(path, modified) is None
+    assert wait_for_preview(loader).text == 'hello'
+    assert loader.wanted is None
+    assert loader.request(path, modified).text == 'hello'  # Cached
+
+
+def test_flicking_through_hints_keeps_one_poll_loop(tmp_path):
+    from ui.main_window import LightningExplorer
+    
+    class Entry:
+        is_dir = False
+        
+        def __init__(self, path):
+            self.path = path
+            self.modified = 0.0  # Unknown: always read
+    
+    class PaneStub:
+        preview_hint = LightningExplorer.preview_hint
+        poll_preview = LightningExplorer.poll_preview
+        
+        def __init__(self):
+            self.preview_loader = PreviewLoader()
+            self.preview_path = None
+            self.preview_pending = None
+            self.scheduled = []
+            self.shown = []
+        
+        def hint_target(self, hint):
+            return Entry(tmp_path / hint)
+        
+        def clear_hint_buffer(self):
+            pass
+        
+        def show_preview(self, preview):
+            self.shown.append(preview.path.name)
+        
+        def after(self, ms, callback):
+            self.scheduled.append(callback)
+            return len(self.scheduled)
+    
+    for name in ('aa', 'ab', 'ac'):
+        (tmp_path / name).write_text(name)
+    pane = PaneStub()
+    for name in ('aa', 'ab', 'ac'):
+        assert pane.preview_hint(name)
+    assert len(pane.scheduled) == 1  # One loop, however many requests
+    
+    deadline = time.monotonic() + 5
+    while pane.preview_pending is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+        pane.scheduled[-1]()
+    assert pane.shown == ['ac']
@@ -0,0 +1,66 @@
+"""
+Tests for the startup snapshot (core/snapshot.py)
+"""
+import os
+import time
+
+from core.file_scanner import FileScanner
+from core.snapshot import SNAPSHOT_MAGIC, load_snapshot, pack_listing, save_snapshot, unpack_listing
+
+
+def settled_folder(path, names):
+    path.mkdir()
+    for name, size in names.items():
+        (path / name).write_bytes(b'x' * size)
+    (path / 'subdir').mkdir()
+    past = time.time() - 60
+    os.utime(path, (past, past))
+    return path
+
+
+def rows(listing):
+    return [(entry.name, entry.is_dir, entry.size) for entry in listing]
+
+
+def test_round_trip_keeps_rows_and_order(tmp_path):
+    folder = settled_folder(tmp_path / 'f', {'b.txt': 3, 'a.txt': 10})
+    listing = FileScanner().scan(folder)
+    snapshot = tmp_path / 'snapshot.bin'
+    assert save_snapshot(listing, with_stat=True, path=snapshot)
+    
+    restored, with_stat, mtime_ns = load_snapshot(folder, path=snapshot)
+    assert rows(restored) == rows(listing)
+    assert with_stat and mtime_ns == os.stat(folder).st_mtime_ns
+
+
+def test_restored_listing_is_resorted_on_request(tmp_path):
+    folder = settled_folder(tmp_path / 'f', {'small': 1, 'large': 50})
+    data = pack_listing(FileScanner().scan(folder), True)
+    restored, _, _ = unpack_listing(data, folder, sort_mode='size')
+    assert restored.sort_mode == 'size'
+    assert [entry.name for entry in restored if not entry.is_dir] == ['large', 'small']
+
+
+def test_changed_or_other_directory_is_rejected(tmp_path):
+    folder = settled_folder(tmp_path / 'f', {'a': 1})
+    other = settled_folder(tmp_path / 'g', {'a': 1})
+    data = pack_listing(FileScanner().scan(folder), True)
+    assert unpack_listing(data, other) is None
+    
+    (folder / 'new').touch()
+    assert unpack_listing(data, folder) is None
+
+
+def test_racy_directory_is_not_packed(tmp_path):
+    folder = tmp_path / 'fresh'
+    folder.mkdir()
+    assert pack_listing(FileScanner().scan(folder), True) is None
+
+
+def test_truncated_or_foreign_data_is_rejected(tmp_path):
+    folder = settled_folder(tmp_path / 'f', {'a': 1})
+    data = pack_listing(FileScanner().scan(folder), True)
+    assert unpack_listing(data[:-1], folder) is None
+    assert unpack_listing(b'not a snapshot', folder) is None
+    assert unpack_listing(SNAPSHOT_MAGIC, folder) is None
+    assert load_snapshot(folder, path=tmp_path / 'missing.bin') is None
@@ -0,0 +1,81 @@
+"""
+Tests for the trigram substring index (core/trigram.py)
+"""
+from core.trigram import TrigramIndex, trigrams
+
+
+NAMES = ['report_2024.txt', 'main_window.py', 'notes.md', 'bcdxabc', 'abcd']
+
+
+def build():
+    return TrigramIndex.build(NAMES)
+
+
+def test_trigrams():
+    assert trigrams('abcd') == {'abc', 'bcd'}
+    assert trigrams('ab') == set()
+
+
+def test_candidates_are_sorted_supersets():
+    index = build()
+    assert index.rows == len(NAMES)
+    assert index.candidates('abcd') == [3, 4]  # 'bcdxabc' has both trigrams
+    assert index.candidates('zzz') == []
+    assert index.candidates('ab') is None  # Too short for the index
+
+
+def test_lookup_verifies_candidates():
+    index = build()
+    assert index.lookup('abcd', NAMES.__getitem__) == [4]
+    assert index.lookup('port', NAMES.__getitem__) == [0]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = tmp_path / 'names.tri'
+    build().save(path, stamp=12.5)
+    
+    loaded = TrigramIndex.load(path, len(NAMES), stamp=12.5)
+    try:
+        assert loaded.lookup('abcd', NAMES.__getitem__) == [4]
+        assert loaded.lookup('.md', NAMES.__getitem__) == [2]
+    finally:
+        loaded.close()
+    assert TrigramIndex.load(path, len(NAMES), stamp=99.0) is None  # Another owner
+
+
+def test_empty_index():
+    index = TrigramIndex.build([])
+    assert index.rows == 0
+    assert index.candidates('abc') == []
+
+
+def test_added_rows_are_found_and_removed_rows_are_not():
+    index = build()
+    index.add(5, 'abcdef')
+    assert index.rows == 6
+    assert index.candidates('abcd') == [3, 4, 5]
+    
+    index.remove(4)
+    assert index.candidates('abcd') == [3, 5]
+    index.add(6, 'abcd')  # Rows keep increasing, so the lists stay sorted
+    assert index.candidates('abcd') == [3, 5, 6]
+
+
+def test_add_copies_mapped_posting_lists(tmp_path):
+    path = tmp_path / 'names.tri'
+    build().save(path)
+    loaded = TrigramIndex.load(path, len(NAMES))
+    names = NAMES + ['my_report.doc']
+    try:
+        loaded.add(5, names[5])
+        loaded.remove(0)
+        assert loaded.lookup('report', names.__getitem__) == [5]
+        
+        loaded.save(tmp_path / 'again.tri')  # Tombstones are left out
+    finally:
+        loaded.close()
+    again = TrigramIndex.load(tmp_path / 'again.tri', len(names))
+    try:
+        assert again.candidates('report') == [5]
+    finally:
+        again.close()
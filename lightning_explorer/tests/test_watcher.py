@@ -0,0 +1,72 @@
+"""
+Tests for the directory watchers (core/watcher.py)
+"""
+import time
+
+import pytest
+
+from core import watcher as watcher_module
+from core.watcher import DirectoryWatcher, PollingWatcher, watch_directory
+
+
+def wait_for_changes(watcher, timeout=5.0):
+    """Drain until something is reported (a set of names, or None for a rescan)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        changes = watcher.drain()
+        if changes is None or changes:
+            return changes
+        time.sleep(0.02)
+    pytest.fail("no changes reported")
+
+
+def test_base_class_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        DirectoryWatcher(tmp_path)
+
+
+def test_polling_watcher_reports_changed_names(tmp_path):
+    (tmp_path / 'kept.txt').touch()
+    (tmp_path / 'gone.txt').touch()
+    watcher = PollingWatcher(tmp_path, interval=0.02).start()
+    try:
+        time.sleep(0.05)  # Let it take its first snapshot
+        (tmp_path / 'new.txt').touch()
+        (tmp_path / 'gone.txt').unlink()
+        changes = set()
+        deadline = time.monotonic() + 5
+        while changes != {'new.txt', 'gone.txt'} and time.monotonic() < deadline:
+            changes |= wait_for_changes(watcher)
+        assert changes == {'new.txt', 'gone.txt'}
+    finally:
+        watcher.stop()
+
+
+def test_too_many_changes_ask_for_a_rescan(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher_module, 'WATCH_MAX_CHANGES', 3)
+    watcher = PollingWatcher(tmp_path, interval=0.02).start()
+    try:
+        time.sleep(0.05)
+        for i in range(10):
+            (tmp_path / f"f{i}").touch()
+        time.sleep(0.2)  # Several snapshots, all recorded before one drain
+        assert watcher.drain() is None
+    finally:
+        watcher.stop()
+
+
+def test_best_backend_reports_a_new_file(tmp_path):
+    watcher = watch_directory(tmp_path)
+    try:
+        time.sleep(0.05)
+        (tmp_path / 'created.txt').write_text('x')
+        assert 'created.txt' in wait_for_changes(watcher)
+    finally:
+        watcher.stop()
+
+
+def test_fallback_warning_stays_off_stdout(tmp_path, capsys):
+    missing = tmp_path / 'missing'  # inotify_add_watch fails on it
+    watcher = watch_directory(missing)
+    watcher.stop()
+    assert capsys.readouterr().out == ''